@@ -5,17 +5,23 @@ import time
 import re
 import asyncio
 import random
+import io
 import json
 import requests
 import logging
 from discord import File
 from discord.ui import Button, View
 from discord.ext import commands, tasks
-from mcstatus import JavaServer
-from python_aternos import Client
-from exaroton import Exaroton
 from dotenv import load_dotenv
 from discord.ext.commands import cooldown, BucketType, Context
+from cogs.exaroton_client import get_client, close_client, ExarotonError
+from cogs.exaroton_scraper_playwright import close_scraper
+from cogs.resilience import close_sessions
+from cogs.mc_probe import get_probe, sample_names, ProbeError
+from cogs.datastore import get_store
+from cogs.doc_cache import get_document_cache
+from cogs.persistence import recover
+from cogs.io_executor import get_io
 
 # commit 27ce7b6
 
@@ -43,12 +49,10 @@ EXAROTON_EMAIL = os.getenv("EXAROTON_EMAIL")
 EXAROTON_PASSWORD = os.getenv("EXAROTON_PASSWORD")
 EXAROTON_TOKEN = os.getenv("EXAROTON_TOKEN")
 EXAROTON_SERVER_ID = os.getenv("EXAROTON_SERVER_ID")
-exaroton_client = Exaroton(EXAROTON_TOKEN)
 ANNOUNCEMENT_CHANNEL_ID = 1388591461326655528
 GUILD_ID = 1382041644743786526
 STATUS_CHANNEL_ID = 1390933575121109022
 DEV_LOG_CHANNEL_ID = 1388594474531295242
-SUGGESTIONS_FILE = "suggestions.json"
 STICKY_MESSAGE_ID_FILE = "stickymsg.json"
 MC_SERVER_PORT = int(os.getenv("MC_SERVER_PORT", 50430))
 MC_SERVER_IP = os.getenv("MC_SERVER_IP")
@@ -62,7 +66,6 @@ intents.message_content = True
 intents.presences = True
 intents.members = True
 bot = commands.Bot(command_prefix='!', intents=intents, help_command=None)
-last_status = "offline"
 boot_time = time.time()
 
 @bot.event
@@ -76,80 +79,37 @@ async def on_ready():
             color=0xb0c0ff
         )
         await channel.send(embed=embed)
-    check_server_status.start()
-
-@tasks.loop(hours=6)
-async def check_server_status():
-    global last_status
-    channel = bot.get_channel(CHANNEL_ID)
-    server = JavaServer.lookup(SERVER_ADDRESS)
-
-    try:
-        status = server.status()
-        if last_status == "offline":
-            embed = discord.Embed(title="**Minecraft Server is ONLINE!**", color=0xb0c0ff)
-            embed.add_field(name="Java IP", value="obscura.exaroton.me", inline=False)
-            embed.add_field(name="Players", value=f"{status.players.online}/{status.players.max}", inline=False)
-
-            if status.players.online > 0:
-                players = ', '.join([player.name for player in status.players.sample]) if status.players.sample else "Unknown players"
-                embed.add_field(name="Who's Online", value=players, inline=False)
-
-            embed.set_footer(text="Summon the peeps before Obscura falls asleep.")
-            await channel.send(content=ROLE_TO_TAG, embed=embed)
-            last_status = "online"
-        else:
-            print("Server still online. No alert sent.")
-    except:
-        print("Server is offline or unreachable.")
-        if last_status == "online":
-            embed = discord.Embed(title="**Obscura is OFFLINE or SLEEPING**", color=0xff5555)
-            embed.set_footer(text="Someone needs to manually start it or join to wake it up.")
-            await channel.send(content="<@&1390934094602571857>", embed=embed)
-        last_status = "offline"
 
 @commands.command(name="mcstatus", aliases=["mcserverstatus"])
 async def mcserver_status(self, ctx):
     await ctx.trigger_typing()
 
-    headers = {"Authorization": f"Bearer {EXAROTON_TOKEN}"}
-    url = f"https://api.exaroton.com/v1/servers/{EXAROTON_SERVER_ID}"
-
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-    except Exception as e:
+        info = await get_client().get_server(timeout=10)
+    except ExarotonError as e:
         print(f"[Exaroton API Error] {e}")
         await ctx.send("❌ Failed to fetch server status from Exaroton.")
         return
 
-    motd = data.get("motd", {}).get("clean", ["Unknown MOTD"])[0]
-    status_text = data.get("statusText", "Offline")
-    time_started = data.get("timeStarted")
+    motd = info.motd or "Unknown MOTD"
+    status_text = info.status_text
 
     # Calculate uptime
     uptime_str = "Unavailable"
-    if time_started:
-        try:
-            started_dt = datetime.fromisoformat(time_started.replace("Z", "+00:00"))
-            now = datetime.utcnow()
-            uptime = now - started_dt
-            hours, remainder = divmod(int(uptime.total_seconds()), 3600)
-            minutes, _ = divmod(remainder, 60)
-            uptime_str = f"{hours}h {minutes}m"
-        except Exception as e:
-            print(f"[Uptime Parse Error] {e}")
-
-    # Try JavaServer status check
+    uptime = info.uptime()
+    if uptime:
+        hours, remainder = divmod(int(uptime.total_seconds()), 3600)
+        minutes, _ = divmod(remainder, 60)
+        uptime_str = f"{hours}h {minutes}m"
+
+    # Try mcstatus check
     try:
-        server = JavaServer.lookup(SERVER_ADDRESS)
-        status = server.status(retries=1)
-        online_players = [p.name for p in status.players.sample] if status.players.sample else []
+        status = await get_probe().status(SERVER_ADDRESS, retries=0)
+        online_players = sample_names(status)
         players_str = ", ".join(online_players) if online_players else "Nobody online"
         player_count_str = f"{status.players.online}/{status.players.max}"
-    except Exception as e:
-        print(f"[JavaServer Error] {e}")
+    except ProbeError as e:
+        print(f"[mcstatus Error] {e}")
         players_str = "Unavailable"
         player_count_str = "?"
 
@@ -167,7 +127,7 @@ async def mcserver_status(self, ctx):
 
 
     await ctx.send(embed=embed)
-    print(json.dumps(data, indent=2))
+    print(json.dumps(info.raw, indent=2))
 
 
 @bot.command()
@@ -291,16 +251,11 @@ async def startserver(ctx):
         return
 
     try:
-        atclient = Client()
-        atclient.login(EXAROTON_EMAIL, EXAROTON_PASSWORD)
-        servers = exaroton_client.get_servers()
+        await get_client().start_server()
 
-        if not servers:
-            await ctx.send("No Exaroton servers found for this account.")
-            return
-
-        myserver = servers[0]
-        myserver.start()
+        exaroton_cog = bot.get_cog("ExarotonCog")
+        if exaroton_cog:
+            exaroton_cog.monitor.expect_transition()
 
         embed = discord.Embed(title="Server Startup Initiated!", color=0xffd79f)
         embed.add_field(name="Launching", value="𝑩 has triggered Obscura startup.", inline=False)
@@ -313,11 +268,10 @@ async def startserver(ctx):
 @bot.command(aliases=["offping", "cacaw"])
 @cooldown(1, 300, BucketType.channel)  # once every 5 minutes per channel
 async def pingoffline(ctx):
-    server = JavaServer.lookup(SERVER_ADDRESS)
     try:
-        status = server.status()
+        await get_probe().status(SERVER_ADDRESS)
         await ctx.send("Obscura is currently online — no need to ping the squad.")
-    except:
+    except ProbeError:
         embed = discord.Embed(title="**Heads Up! The Server Seems to Be Offline or Sleeping**", color=0xffd79f)
         embed.set_footer(text="Someone needs to hop in or start it manually.")
         await ctx.send(content="<@&1390934094602571857>", embed=embed)
@@ -785,8 +739,7 @@ async def help(ctx):
 async def daily_server_status():
     channel = bot.get_channel(STATUS_CHANNEL_ID)
     try:
-        server = JavaServer.lookup(f"{MC_SERVER_IP}:{MC_SERVER_PORT}")
-        status = server.status()
+        status = await get_probe().status(f"{MC_SERVER_IP}:{MC_SERVER_PORT}")
         await channel.send(f"🟢 Minecraft server is online with {status.players.online} player(s).")
     except Exception as e:
         await channel.send(f"🔴 Minecraft server is offline or unreachable.\nError: `{e}`")
@@ -807,20 +760,10 @@ async def githelp(ctx):
     await ctx.send(embed=embed)
 
 # --- Suggestion Collection ---
-def load_suggestions():
-    if not os.path.exists(SUGGESTIONS_FILE):
-        return []
-    with open(SUGGESTIONS_FILE, "r") as f:
-        return json.load(f)
-
-def save_suggestions(suggestions):
-    with open(SUGGESTIONS_FILE, "w") as f:
-        json.dump(suggestions, f, indent=2)
-
 @bot.command()
 async def suggest(ctx, action=None, *, arg=None):
     """Submit or manage suggestions for the bot"""
-    suggestions = load_suggestions()
+    store = get_store()
     now = time.time()  # Capture time once
 
     # Cooldown check first
@@ -857,8 +800,7 @@ async def suggest(ctx, action=None, *, arg=None):
             "message": message,
             "timestamp": datetime.datetime.utcnow().isoformat()
         }
-        suggestions.append(suggestion)
-        save_suggestions(suggestions)
+        await store.append("suggestions", suggestion)
 
         # Log to dev channel
         log_channel = bot.get_channel(DEV_LOG_CHANNEL_ID)
@@ -887,6 +829,7 @@ async def suggest(ctx, action=None, *, arg=None):
 
     # View suggestions
     if action == "view":
+        suggestions = await store.values("suggestions")
         filtered = suggestions
         if arg:
             arg = arg.lower()
@@ -963,22 +906,17 @@ async def suggest(ctx, action=None, *, arg=None):
             return
 
         index = int(arg) - 1
-        if 0 <= index < len(suggestions):
-            deleted = suggestions.pop(index)
-            save_suggestions(suggestions)
+        rows = await store.items("suggestions")
+        if 0 <= index < len(rows):
+            key, deleted = rows[index]
+            await store.delete("suggestions", key)
             await ctx.send(f"🗑️ Deleted suggestion #{index + 1} by {deleted['user']}.")
         else:
             await ctx.send("Invalid suggestion index.")
 
 versionfix_cooldown = 0  # Shared cooldown for version fix
-EXAROTON_TOKEN = os.getenv("EXAROTON_TOKEN")
-exaroton = Exaroton(EXAROTON_TOKEN)
-challenge_file = "data/challenges.json"
 if not os.path.exists("data"):
     os.makedirs("data")
-if not os.path.exists(challenge_file):
-    with open(challenge_file, "w") as f:
-        json.dump({}, f)
 
 @bot.command(name="reloadcog", help="Reload a specific cog from /cogs/")
 @commands.is_owner()
@@ -1013,26 +951,22 @@ async def reload_all(ctx):
 @bot.command()
 async def explayers(ctx):
     try:
-        server = exaroton.get_servers()[0]
-        status = server.status()
-        players = status.players
+        players = await get_client().get_players()
         if players:
             await ctx.send(f"🟢 Players online: {', '.join(players)}")
         else:
             await ctx.send("⚫ No players online.")
-    except Exception as e:
+    except ExarotonError as e:
         await ctx.send(f"<:warning:1388586513000042516> Error: {e}")
 
 @bot.command()
 async def exlog(ctx):
     try:
-        server = exaroton.get_servers()[0]
-        log = server.get_log()
-        with open("latest.log", "w") as f:
-            f.write(log)
-        await ctx.send(file=File("latest.log"))
-    except Exception as e:
+        log = await get_client().get_log()
+    except ExarotonError as e:
         await ctx.send(f"<:warning:1388586513000042516> Failed to fetch logs: {e}")
+        return
+    await ctx.send(file=File(io.BytesIO(log.encode("utf-8")), filename="latest.log"))
 
 @bot.group(invoke_without_command=True)
 async def challenge(ctx):
@@ -1040,39 +974,31 @@ async def challenge(ctx):
 
 @challenge.command(name="start")
 async def start_challenge(ctx, *, name: str):
-    with open(challenge_file, "r") as f:
-        data = json.load(f)
-    data[name] = []
-    with open(challenge_file, "w") as f:
-        json.dump(data, f, indent=2)
+    await get_store().put("challenges", name, [])
     await ctx.send(f"<:checkbox:1388586497984430160> Challenge **{name}** started!")
 
 @challenge.command(name="submit")
 async def submit_challenge(ctx, *, proof: str):
-    with open(challenge_file, "r") as f:
-        data = json.load(f)
-    if not data:
+    store = get_store()
+    current = await store.latest("challenges")
+    if current is None:
         await ctx.send("<:warning:1388586513000042516> No active challenges.")
         return
-    latest = list(data.keys())[-1]
-    data[latest].append({
+    latest = current[0]
+    await store.update("challenges", latest, lambda entries: entries + [{
         "user": str(ctx.author),
         "proof": proof,
         "timestamp": datetime.datetime.utcnow().isoformat()
-    })
-    with open(challenge_file, "w") as f:
-        json.dump(data, f, indent=2)
+    }], [])
     await ctx.send(f"<:checkbox:1388586497984430160> Submission added to **{latest}**!")
 
 @challenge.command(name="leaderboard")
 async def challenge_leaderboard(ctx):
-    with open(challenge_file, "r") as f:
-        data = json.load(f)
-    if not data:
+    current = await get_store().latest("challenges")
+    if current is None:
         await ctx.send("<:warning:1388586513000042516> No challenges found.")
         return
-    latest = list(data.keys())[-1]
-    entries = data[latest]
+    latest, entries = current
     leaderboard = {}
     for entry in entries:
         user = entry["user"]
@@ -1191,6 +1117,7 @@ async def log_dev_commands(ctx):
 
 # Main async startup
 async def main():
+    recover()  # finish any multi-file write a crash interrupted, before cogs read data/
     await bot.load_extension("cogs.challonge_cog")
     await bot.load_extension("cogs.exaroton")
     await bot.load_extension("cogs.pinpoint")
@@ -1200,6 +1127,17 @@ async def main():
     await bot.load_extension("cogs.admin")
     await bot.load_extension("cogs.reason")
     await bot.load_extension("cogs.utility")
-    await bot.start(TOKEN)
-
-asyncio.run(main())
+    try:
+        await bot.start(TOKEN)
+    finally:
+        await close_scraper()
+        await close_client()
+        await close_sessions()
+        await get_document_cache().close()
+        get_store().close()
+        get_io().shutdown()
+
+
+# Guarded so spawned worker processes (the !pinmap renderer) can import this module without starting a bot
+if __name__ == "__main__":
+    asyncio.run(main())
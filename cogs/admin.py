@@ -1,7 +1,10 @@
 import discord
 from discord.ext import commands
 from cogs.utils import UtilsCog
-import requests
+from cogs.exaroton_client import get_client, ExarotonError
+from cogs.credit_ledger import get_credit_ledger
+from cogs.resilience import all_upstreams
+from cogs.io_executor import get_io
 import os
 import time
 
@@ -11,13 +14,12 @@ GRAND_USER_ID = [448896936481652777]
 cooldowns = {}
 COOLDOWN_SECONDS = 30
 
-HEADERS = {"Authorization": f"Bearer {EXAROTON_TOKEN}"}
-EXAROTON_BASE = "https://api.exaroton.com/v1/servers"
-
-def get_server_data():
-    url = f"{EXAROTON_BASE}/{EXAROTON_SERVER_ID}"
-    response = requests.get(url, headers=HEADERS)
-    return response.json() if response.status_code == 200 else None
+async def get_server_data():
+    try:
+        return await get_client().get_server()
+    except ExarotonError as e:
+        print(f"[Admin API Error] {e}")
+        return None
 
 class AdminCog(commands.Cog):
     def __init__(self, bot):
@@ -53,12 +55,12 @@ class AdminCog(commands.Cog):
         if await self.handle_cooldown(ctx):
             return
 
-        data = get_server_data()
-        if not data or "host" not in data:
+        data = await get_server_data()
+        if not data:
             await ctx.send("❌ Could not fetch uptime information.")
             return
 
-        uptime = data["host"].get("uptime", 0)
+        uptime = data.host_uptime
         minutes = uptime // 60
         hours = minutes // 60
         await ctx.send(f"Server has been online for **{hours}h {minutes % 60}m**.")
@@ -68,13 +70,14 @@ class AdminCog(commands.Cog):
         if await self.handle_cooldown(ctx):
             return
 
-        data = get_server_data()
-        if not data:
+        ledger = get_credit_ledger()
+        sample = await ledger.get()
+        if not sample:
             await ctx.send("🔥 Couldn't fetch burn rate info.")
             return
 
-        credit_balance = float(data.get("credits", 0))
-        burn_rate = float(data.get("settings", {}).get("creditPerHour", 0))
+        credit_balance = sample.credits
+        burn_rate = ledger.burn_rate() or 0.0
         if burn_rate == 0:
             await ctx.send("🔥 Burn rate is not currently available.")
             return
@@ -88,12 +91,12 @@ class AdminCog(commands.Cog):
         if await self.handle_cooldown(ctx):
             return
 
-        data = get_server_data()
-        if not data or "host" not in data:
+        data = await get_server_data()
+        if not data:
             await ctx.send("❌ Could not fetch session data.")
             return
 
-        uptime = data["host"].get("uptime", 0)
+        uptime = data.host_uptime
         minutes = uptime // 60
         await ctx.send(f"⏱️ Current session length is **{minutes} minutes**.")
 
@@ -103,12 +106,66 @@ class AdminCog(commands.Cog):
             await ctx.send("<:noentry:1388586500756865126> You don't have permission to restart the server.")
             return
 
-        url = f"{EXAROTON_BASE}/{EXAROTON_SERVER_ID}/restart"
-        response = requests.post(url, headers=HEADERS)
-        if response.status_code == 204:
+        try:
+            await get_client().restart_server()
+            exaroton_cog = self.bot.get_cog("ExarotonCog")
+            if exaroton_cog:
+                exaroton_cog.monitor.expect_transition()
             await ctx.send("🔄 Restarting the server...")
-        else:
+        except ExarotonError as e:
+            print(f"[Restart Error] {e}")
             await ctx.send("<:ban:1388586495643877406> Failed to restart the server.")
 
+    @commands.command(name="breakers", aliases=["upstreams"])
+    async def breakers(self, ctx):
+        if not self.dev_check(ctx.author.id):
+            await ctx.send("<:noentry:1388586500756865126> Dev-only command.")
+            return
+
+        upstreams = all_upstreams()
+        if not upstreams:
+            await ctx.send("No upstream calls made yet.")
+            return
+
+        icons = {"closed": "🟢", "half-open": "🟡", "open": "🔴"}
+        embed = discord.Embed(title="🔌 Upstream Circuit Breakers", color=0x462f80)
+        for up in sorted(upstreams, key=lambda u: u.host):
+            state = up.breaker.state
+            line = (
+                f"{icons.get(state, '❔')} **{state}** • trips: {up.breaker.trips}\n"
+                f"calls: {up.calls} • failed: {up.failed} • retried: {up.retried} • rejected: {up.rejected}\n"
+                f"retry budget: {up.retry_tokens:.1f} • in flight cap: {up.policy.concurrency}"
+            )
+            if state == "open":
+                line += f"\nretrying in {up.breaker.retry_in():.0f}s"
+            embed.add_field(name=up.host, value=line, inline=False)
+        await ctx.send(embed=embed)
+
+    @commands.command(name="iostats", aliases=["diskstats"])
+    async def iostats(self, ctx):
+        if not self.dev_check(ctx.author.id):
+            await ctx.send("<:noentry:1388586500756865126> Dev-only command.")
+            return
+
+        stats = get_io().stats()
+        embed = discord.Embed(title="💾 File I/O", color=0x462f80)
+        embed.description = (
+            f"in flight: **{stats['in_flight']}** (peak {stats['peak_in_flight']}) • "
+            f"queued: **{stats['queued']}** • locked files: {stats['locked_paths']}\n"
+            f"queue wait p95: {stats['queue_wait_p95'] * 1000:.1f}ms"
+        )
+        if not stats["ops"]:
+            embed.description += "\nNo I/O yet."
+        for name, op in stats["ops"].items():
+            embed.add_field(
+                name=name,
+                value=(
+                    f"{op['count']} calls • {op['failed']} failed\n"
+                    f"avg {op['avg'] * 1000:.1f}ms • p95 {op['p95'] * 1000:.1f}ms • max {op['max'] * 1000:.1f}ms"
+                ),
+                inline=True
+            )
+        await ctx.send(embed=embed)
+
 async def setup(bot):
     await bot.add_cog(AdminCog(bot))
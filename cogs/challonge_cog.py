@@ -3,24 +3,29 @@ from discord.ext import commands, tasks
 from discord.ui import View, Button
 import aiohttp, os, json
 from cogs.utils import UtilsCog
-import challonge
+from cogs.resilience import request_json, UpstreamError
+from cogs.datastore import get_store
+from cogs.doc_cache import get_document_cache
+from cogs.io_executor import get_io
 
 
 MAP_FILE = "data/tourney_map.json"
 SCORE_FILE = "data/tourney_scores.json"
-ELO_FILE = "data/elo_scores.json"
-MATCH_HISTORY_FILE = "data/match_history.json"
 ARCHIVE_FILE = "data/archived_slugs.json"
 ALERT_CACHE = "data/alerted_matches.json"
 OPTOUT_FILE = "data/match_ping_optouts.json"
 LOG_CHANNEL_ID = 1390938867128860692
 PLAYER_MAP_FILE = "data/player_map.json"
+PENDING_REPORTS_FILE = "data/pending_reports.json"
 
 
 
 class ChallongeCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.store = get_store()
+        self.docs = get_document_cache()
+        self.io = get_io()
         self.api_key = os.getenv("CHALLONGE_API_KEY")
         self.username = os.getenv("CHALLONGE_USERNAME")
         self.base_url = "https://api.challonge.com/v1"
@@ -34,47 +39,27 @@ class ChallongeCog(commands.Cog):
     def auth(self):
         return aiohttp.BasicAuth(self.username, self.api_key)
 
-    def load_json(path):
-        if not os.path.exists(path):
-            return {}
-        with open(path, "r") as f:
-            return json.load(f)
-
-    def save_json(path, data):
-        with open(path, "w") as f:
-            json.dump(data, f, indent=2)
-    
-    def load_player_map():
-        if not os.path.exists(PLAYER_MAP_FILE):
-            return {}
-        with open(PLAYER_MAP_FILE, "r") as f:
-            return json.load(f)
-    
-    def save_player_map(data):
-        os.makedirs(os.path.dirname(PLAYER_MAP_FILE), exist_ok=True)
-        with open(PLAYER_MAP_FILE, "w") as f:
-            json.dump(data, f, indent=2)
-    
-    def get_participants(self, slug):
-        url = f"https://api.challonge.com/v1/tournaments/{slug}/participants.json"
-        params = {"api_key": CHALLONGE_API_KEY}
-        res = requests.get(url, params=params)
-        res.raise_for_status()
-        return res.json()
+    async def get_participants(self, slug):
+        data, status = await self.request("GET", f"tournaments/{slug}/participants")
+        if status != 200:
+            raise RuntimeError(data.get("error") if isinstance(data, dict) else f"Challonge returned {status}")
+        return data
         
     async def request(self, method, endpoint, **kwargs):
         url = f"{self.base_url}/{endpoint}.json"
-        async with aiohttp.ClientSession(auth=self.auth()) as session:
-            async with session.request(method, url, **kwargs) as resp:
-                try:
-                    return await resp.json(), resp.status
-                except:
-                    return {"error": "Invalid response"}, resp.status
+        try:
+            status, data = await request_json(method, url, auth=self.auth(), **kwargs)
+        except UpstreamError as e:
+            # Same shape as a failed response so callers' status checks cover it
+            return {"error": str(e)}, e.status or 503
+        if data is None:
+            return {"error": "Invalid response"}, status
+        return data, status
 
     @commands.command(aliases=["mh"])
     async def match_history(self, ctx, slug: str, member: discord.Member = None):
         uid = str((member or ctx.author).id)
-        history = load_json(MATCH_HISTORY_FILE).get(slug, {}).get(uid, [])
+        history = await self.store.get("match_history", f"{slug}/{uid}", [])
 
         if not history:
             await ctx.send("No match history found.")
@@ -106,38 +91,43 @@ class ChallongeCog(commands.Cog):
     @commands.command()
     async def elo(self, ctx, member: discord.Member = None):
         uid = str((member or ctx.author).id)
-        scores = load_json(ELO_FILE)
-        elo = scores.get(uid, 1000)
+        elo = await self.store.get("elo", uid, 1000)
         await ctx.send(f"📈 ELO for {member.display_name if member else ctx.author.display_name}: **{elo}** <:settings:1388586507664883772>")
 
-    def update_elo(self, winner_id, loser_id, k=32):
-        scores = load_json(ELO_FILE)
-        winner = scores.get(winner_id, 1000)
-        loser = scores.get(loser_id, 1000)
-        expected_win = 1 / (1 + 10 ** ((loser - winner) / 400))
-        expected_lose = 1 - expected_win
-        scores[winner_id] = round(winner + k * (1 - expected_win))
-        scores[loser_id] = round(loser + k * (0 - expected_lose))
-        save_json(ELO_FILE, scores)
-
-    def log_match(self, slug, winner_id, loser_id, match_id):
-        history = load_json(MATCH_HISTORY_FILE)
-        history.setdefault(slug, {}).setdefault(winner_id, []).append({
+    async def update_elo(self, winner_id, loser_id, k=32):
+        # Reads and writes share one transaction, so two reported matches can't interleave
+        before = {}
+
+        def rate(player, opponent, score):
+            def fn(rating):
+                before[player] = rating
+                if opponent not in before:
+                    return rating  # the first pass only reads the loser's rating
+                expected = 1 / (1 + 10 ** ((before[opponent] - rating) / 400))
+                return round(rating + k * (score - expected))
+            return fn
+
+        async with self.store.batch() as batch:
+            batch.update("elo", loser_id, rate(loser_id, winner_id, 0), 1000)
+            batch.update("elo", winner_id, rate(winner_id, loser_id, 1), 1000)
+            batch.update("elo", loser_id, rate(loser_id, winner_id, 0), 1000)
+
+    async def log_match(self, slug, winner_id, loser_id, match_id):
+        await self.store.update("match_history", f"{slug}/{winner_id}", lambda history: history + [{
             "match_id": match_id,
             "opponent": loser_id,
             "result": "Win"
-        })
-        history.setdefault(slug, {}).setdefault(loser_id, []).append({
+        }], [])
+        await self.store.update("match_history", f"{slug}/{loser_id}", lambda history: history + [{
             "match_id": match_id,
             "opponent": winner_id,
             "result": "Loss"
-        })
-        save_json(MATCH_HISTORY_FILE, history)
+        }], [])
 
     @commands.command()
     async def standings(self, ctx):
-        scores = load_json(ELO_FILE)
-        sorted_scores = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+        scores = await self.store.items("elo")
+        sorted_scores = sorted(scores, key=lambda x: x[1], reverse=True)
     
         embed = discord.Embed(title="📊 Global ELO Standings", color=0xffcc00)
         for rank, (uid, elo) in enumerate(sorted_scores[:20], start=1):
@@ -150,9 +140,7 @@ class ChallongeCog(commands.Cog):
     @commands.command()
     @commands.is_owner()
     async def set_elo(self, ctx, member: discord.Member, new_score: int):
-        scores = load_json(ELO_FILE)
-        scores[str(member.id)] = new_score
-        save_json(ELO_FILE, scores)
+        await self.store.put("elo", str(member.id), new_score)
         await ctx.send(f"📌 Set ELO of {member.display_name} to **{new_score}**.")
         
 
@@ -160,10 +148,7 @@ class ChallongeCog(commands.Cog):
     @commands.is_owner()
     async def remove_slug(self, ctx, slug: str):
         """Safely archive and purge a tournament slug (with confirmation)."""
-        tourney_map = load_json(MAP_FILE)
-        match_history = load_json(MATCH_HISTORY_FILE)
-        elo_scores = load_json(ELO_FILE)
-        archive = load_json(ARCHIVE_FILE)
+        tourney_map = await self.io.read_json(MAP_FILE, {})
     
         if slug not in tourney_map:
             await ctx.send(f"❌ `{slug}` isn’t currently tracked.")
@@ -204,23 +189,26 @@ class ChallongeCog(commands.Cog):
         if not view.confirmed:
             return  # User canceled or timed out
     
-        # Archive the slug and its player map
-        archive[slug] = tourney_map[slug]
-        save_json(ARCHIVE_FILE, archive)
-    
-        # Delete from MAP_FILE
-        del tourney_map[slug]
-        save_json(MAP_FILE, tourney_map)
-    
-        # Delete match history
-        if slug in match_history:
-            del match_history[slug]
-            save_json(MATCH_HISTORY_FILE, match_history)
-    
-        # Clean up ELO scores
-        for uid in archive[slug].keys():
-            elo_scores.pop(uid, None)
-        save_json(ELO_FILE, elo_scores)
+        async with self.io.locks(MAP_FILE, ARCHIVE_FILE):
+            # Re-read: the map may have changed while the confirmation was up
+            tourney_map = await self.io.read_json(MAP_FILE, {})
+            archive = await self.io.read_json(ARCHIVE_FILE, {})
+            if slug not in tourney_map:
+                await ctx.send(f"❌ `{slug}` was already removed.")
+                return
+            players = tourney_map[slug]
+    
+            # Delete match history and clean up ELO scores together. This goes first:
+            # if we die before the files below, the slug is still tracked and can be purged again
+            async with self.store.batch() as batch:
+                batch.delete_prefix("match_history", f"{slug}/")
+                for uid in players.keys():
+                    batch.delete("elo", uid)
+    
+            # Archive the slug and its player map, and drop it from MAP_FILE, as one commit
+            archive[slug] = players
+            del tourney_map[slug]
+            await self.io.write_json_many({ARCHIVE_FILE: archive, MAP_FILE: tourney_map}, indent=2)
     
         await ctx.send(f"✅ `{slug}` has been **purged and archived**. No longer tracked. 🪦")
 
@@ -240,7 +228,6 @@ class ChallongeCog(commands.Cog):
     async def register(self, ctx, slug: str):
         """Link your Discord account to a Challonge participant in the tournament."""
         uid = str(ctx.author.id)
-        tourney_map = load_json(MAP_FILE)
 
         # Get all participants
         data, status = await self.request("GET", f"tournaments/{slug}/participants")
@@ -265,11 +252,9 @@ class ChallongeCog(commands.Cog):
             return
 
         participant_id = str(matches[0]["id"])
-        tourney_map.setdefault(slug, {})[uid] = participant_id
-        print("Updated tourney_map:", tourney_map)
-        print("Saving to:", MAP_FILE)
-
-        save_json(MAP_FILE, tourney_map)
+        async with self.io.edit_json(MAP_FILE, indent=2) as tourney_map:
+            tourney_map.setdefault(slug, {})[uid] = participant_id
+        print(f"[Challonge] Registered {uid} as {participant_id} in {slug}")
 
         await ctx.send(f"✅ You’ve been registered to `{slug}` as `{matches[0]['name']}` (ID: {participant_id})! <:Premium:1388586503092961482>")
 
@@ -277,13 +262,11 @@ class ChallongeCog(commands.Cog):
     @commands.command(aliases=["slugs", "tlist"])
     async def list_slugs(self, ctx):
         file_path = "data/tracked_slugs.json"
-        if not os.path.exists(file_path):
+        data = await self.io.read_json(file_path)
+        if data is None:
             await ctx.send("🗂️ No tournaments found.")
             return
     
-        with open(file_path, "r") as f:
-            data = json.load(f)
-    
         tournaments = data.get("tournaments", [])
         if not tournaments:
             await ctx.send("🗂️ No tournaments found.")
@@ -301,22 +284,16 @@ class ChallongeCog(commands.Cog):
         """Track a new Challonge tournament slug and set it as active."""
         file_path = "data/tracked_slugs.json"
     
-        # Load existing tracked slugs
-        if not os.path.exists(file_path):
-            data = {"tournaments": []}
-        else:
-            with open(file_path, "r") as f:
-                data = json.load(f)
-    
         slug = slug.lower()
     
         # Add slug if not already tracked
-        if slug in data["tournaments"]:
+        async with self.io.edit_json(file_path, default=lambda: {"tournaments": []}, indent=2) as data:
+            already_tracked = slug in data["tournaments"]
+            if not already_tracked:
+                data["tournaments"].append(slug)
+        if already_tracked:
             await ctx.send(f"⚠️ Slug `{slug}` is already being tracked.")
         else:
-            data["tournaments"].append(slug)
-            with open(file_path, "w") as f:
-                json.dump(data, f, indent=2)
             await ctx.send(f"<:checkbox:1388586497984430160> Now tracking tournament slug: `{slug}`.")
     
         # ✅ Set as active for bot session
@@ -326,14 +303,14 @@ class ChallongeCog(commands.Cog):
     @tasks.loop(minutes=10)
     async def match_alerts(self):
         for guild in self.bot.guilds:
-            for slug in load_json(MAP_FILE):
+            for slug in await self.io.read_json(MAP_FILE, {}):
                 await self.alert_matches(guild, slug)
 
 
     async def alert_matches(self, guild, slug):
-        tourney_map = load_json(MAP_FILE)
-        alert_cache = load_json(ALERT_CACHE)
-        optouts = load_json(OPTOUT_FILE)
+        tourney_map = await self.io.read_json(MAP_FILE, {})
+        docs = self.docs
+        optouts = await docs.get(OPTOUT_FILE)
         if slug not in tourney_map:
             return
 
@@ -345,19 +322,23 @@ class ChallongeCog(commands.Cog):
         if status != 200:
             return
 
-        if slug not in alert_cache:
-            alert_cache[slug] = []
         user_map = {v: k for k, v in tourney_map[slug].items()}
 
         for match in matches_data:
             match = match["match"]
             mid = str(match["id"])
-            if match["state"] != "open" or mid in alert_cache[slug]:
+            if match["state"] != "open":
                 continue
             p1, p2 = user_map.get(str(match["player1_id"])), user_map.get(str(match["player2_id"]))
             mentions = [f"<@{uid}>" for uid in (p1, p2) if uid and uid not in optouts.get(slug, [])]
             if not mentions:
                 continue
+            # Claim the alert first so an overlapping sync can't send it twice
+            async with docs.edit(ALERT_CACHE) as alert_cache:
+                alerted = alert_cache.setdefault(slug, [])
+                if mid in alerted:
+                    continue
+                alerted.append(mid)
             embed = discord.Embed(title=f"🎮 Match Ready in {slug}", description=f"Match ID: `{mid}` is now open!", color=0x3498db)
             if p1: embed.add_field(name="Player 1", value=f"<@{p1}>", inline=True)
             if p2: embed.add_field(name="Player 2", value=f"<@{p2}>", inline=True)
@@ -371,15 +352,13 @@ class ChallongeCog(commands.Cog):
                     if str(interaction.user.id) != self.uid:
                         await interaction.response.send_message("Not your button.", ephemeral=True)
                         return
-                    optouts.setdefault(slug, []).append(self.uid)
-                    save_json(OPTOUT_FILE, optouts)
+                    async with docs.edit(OPTOUT_FILE) as current:
+                        current.setdefault(slug, []).append(self.uid)
                     await interaction.response.send_message("You have opted out of match pings. <:settings:1388586507664883772>", ephemeral=True)
 
             channel = guild.get_channel(LOG_CHANNEL_ID)
             if channel:
                 await channel.send(" ".join(mentions), embed=embed, view=OptOutView(p1 or p2))
-            alert_cache[slug].append(mid)
-        save_json(ALERT_CACHE, alert_cache)
 
     @commands.command(name="seed_tourney", aliases=["set_active_slug"])
     @commands.has_permissions(administrator=True)
@@ -396,35 +375,35 @@ class ChallongeCog(commands.Cog):
             await ctx.send("🚫 No active tournament set. Use `!seed_tourney <slug>` first.")
             return
     
-        player_map = load_player_map()
+        player_map = await self.io.read_json(PLAYER_MAP_FILE, {})
     
         if not player_name:
             # Try mapping from Discord display name
             key = ctx.author.display_name.strip()
             player_name = player_map.get(key, key)  # fallback to display name if unmapped
     
-        try:
-            participant = challonge.participants.create(
-                self.active_tournament_slug,
-                name=player_name
-            )
+        payload = {"participant": {"name": player_name}}
+        data, status = await self.request("POST", f"tournaments/{self.active_tournament_slug}/participants", json=payload)
+        if status == 200:
             await ctx.send(f"✅ Added `{player_name}` to the tournament.")
-        except challonge.api.ChallongeException as e:
-            await ctx.send(f"❌ Could not add player: {e}")
+        else:
+            error = data.get("errors") or data.get("error") if isinstance(data, dict) else None
+            if isinstance(error, list):
+                error = "; ".join(map(str, error))
+            await ctx.send(f"❌ Could not add player: {error or f'Challonge returned {status}'}")
 
     @commands.command(name="mapname", aliases=["setname"])
     async def mapname(self, ctx, *, desired_name: str):
         """Map your Discord display name to a tournament name."""
         name = ctx.author.display_name.strip()
-        player_map = load_player_map()
-        player_map[name] = desired_name
-        save_player_map(player_map)
+        async with self.io.edit_json(PLAYER_MAP_FILE, indent=2) as player_map:
+            player_map[name] = desired_name
         await ctx.send(f"🔗 Mapped `{name}` → `{desired_name}` for auto-registration.")
 
     @commands.command(name="namemap")
     async def view_name_map(self, ctx):
         """View all current name mappings."""
-        player_map = load_player_map()
+        player_map = await self.io.read_json(PLAYER_MAP_FILE, {})
         if not player_map:
             await ctx.send("📭 No name mappings have been set yet.")
             return
@@ -476,19 +455,19 @@ class ChallongeCog(commands.Cog):
     @commands.command()
     @commands.is_owner()
     async def bind(self, ctx, slug: str, participant_id: str):
-        tourney_map = load_json(MAP_FILE)
-        tourney_map.setdefault(slug, {})[str(ctx.author.id)] = participant_id
-        save_json(MAP_FILE, tourney_map)
+        async with self.io.edit_json(MAP_FILE, indent=2) as tourney_map:
+            tourney_map.setdefault(slug, {})[str(ctx.author.id)] = participant_id
         await ctx.send(f"✅ Bound <@{ctx.author.id}> to participant ID `{participant_id}` in `{slug}`.")
 
     @commands.command()
     @commands.is_owner()
     async def drop(self, ctx, slug: str, member: discord.Member):
-        tourney_map = load_json(MAP_FILE)
         uid = str(member.id)
-        if slug in tourney_map and uid in tourney_map[slug]:
-            del tourney_map[slug][uid]
-            save_json(MAP_FILE, tourney_map)
+        async with self.io.edit_json(MAP_FILE, indent=2) as tourney_map:
+            found = slug in tourney_map and uid in tourney_map[slug]
+            if found:
+                del tourney_map[slug][uid]
+        if found:
             await ctx.send(f"✅ Removed {member.display_name} from `{slug}`.")
         else:
             await ctx.send("❌ User not found in tournament map.")
@@ -507,7 +486,7 @@ class ChallongeCog(commands.Cog):
         import re
         PENDING_FILE = "data/pending_reports.json"
 
-        tourney_map = load_json(MAP_FILE)
+        tourney_map = await self.io.read_json(MAP_FILE, {})
         user_id = str(ctx.author.id)
         if slug not in tourney_map or user_id not in tourney_map[slug]:
             await ctx.send("❌ You are not registered in this tournament.")
@@ -534,21 +513,20 @@ class ChallongeCog(commands.Cog):
         loser_id = p2 if participant_id == p1 else p1
 
         # Save to pending reports
-        pending = load_json(PENDING_FILE)
-        pending.setdefault(slug, {})[str(match_id)] = {
-            "score": score,
-            "winner_id": winner_id,
-            "loser_id": loser_id,
-            "reporter": user_id
-        }
-        save_json(PENDING_FILE, pending)
+        async with self.io.edit_json(PENDING_FILE, indent=2) as pending:
+            pending.setdefault(slug, {})[str(match_id)] = {
+                "score": score,
+                "winner_id": winner_id,
+                "loser_id": loser_id,
+                "reporter": user_id
+            }
 
         await ctx.send(f"📝 Match report submitted for review. Awaiting dev confirmation. <:settings:1388586507664883772>")
 
     @commands.command(aliases=["cr"])
     @commands.is_owner()
     async def confirm_report(self, ctx, slug: str, match_id: int):
-        reports = load_json("data/pending_reports.json")
+        reports = await self.io.read_json(PENDING_REPORTS_FILE, {})
         slug_reports = reports.get(slug, {})
         str_match_id = str(match_id)
 
@@ -566,37 +544,32 @@ class ChallongeCog(commands.Cog):
 
         _, status = await self.request("PUT", f"tournaments/{slug}/matches/{match_id}", json=payload)
         if status == 200:
-            self.log_match(slug, report["winner_id"], report["loser_id"], str(match_id))
-            self.update_elo(report["winner_id"], report["loser_id"])
+            await self.log_match(slug, report["winner_id"], report["loser_id"], str(match_id))
+            await self.update_elo(report["winner_id"], report["loser_id"])
             await ctx.send(f"✅ Match `{match_id}` confirmed and recorded! <:Premium:1388586503092961482>")
-            del slug_reports[str_match_id]
-            if not slug_reports:
-                reports.pop(slug)
-            else:
-                reports[slug] = slug_reports
-            save_json("data/pending_reports.json", reports)
+            async with self.io.edit_json(PENDING_REPORTS_FILE, indent=2) as reports:
+                slug_reports = reports.get(slug, {})
+                slug_reports.pop(str_match_id, None)
+                if not slug_reports:
+                    reports.pop(slug, None)
         else:
             await ctx.send("❌ Failed to finalize match via Challonge API.")
 
     @commands.command(aliases=["dr"])
     @commands.is_owner()
     async def deny_report(self, ctx, slug: str, match_id: int):
-        reports = load_json("data/pending_reports.json")
-        slug_reports = reports.get(slug, {})
         str_match_id = str(match_id)
+        async with self.io.edit_json(PENDING_REPORTS_FILE, indent=2) as reports:
+            slug_reports = reports.get(slug, {})
+            report = slug_reports.pop(str_match_id, None)
+            if not slug_reports:
+                reports.pop(slug, None)
 
-        if str_match_id not in slug_reports:
+        if report is None:
             await ctx.send(f"⚠️ No pending report for match `{match_id}` in `{slug}`.")
             return
 
-        reporter_id = slug_reports[str_match_id]["reporter"]
-        del slug_reports[str_match_id]
-        if not slug_reports:
-            reports.pop(slug)
-        else:
-            reports[slug] = slug_reports
-
-        save_json("data/pending_reports.json", reports)
+        reporter_id = report["reporter"]
 
         await ctx.send(f"<:noentry:1388586500756865126> <@{reporter_id}>, your match report for `{slug}` match `{match_id}` was **denied** by the tournament overlords. Try again or appeal with better vibes. <:settings:1388586507664883772>")
 
@@ -605,8 +578,7 @@ class ChallongeCog(commands.Cog):
     @commands.is_owner()
     async def confirm_result(self, ctx, slug: str, match_id: int, score: str, loser: discord.Member):
         """Dev-only: Immediately confirm and push a match result."""
-        tourney_map = load_json(MAP_FILE)
-        ELO_FILE = "data/elo_scores.json"
+        tourney_map = await self.io.read_json(MAP_FILE, {})
 
         winner_id = str(ctx.author.id)
         loser_id = str(loser.id)
@@ -628,8 +600,8 @@ class ChallongeCog(commands.Cog):
         data, status = await self.request("PUT", f"tournaments/{slug}/matches/{match_id}", json=payload)
 
         if status == 200:
-            self.log_match(slug, winner_id, loser_id, str(match_id))
-            self.update_elo(winner_id, loser_id)
+            await self.log_match(slug, winner_id, loser_id, str(match_id))
+            await self.update_elo(winner_id, loser_id)
 
             embed = discord.Embed(
                 title="✅ Match Result Confirmed",
@@ -645,7 +617,7 @@ class ChallongeCog(commands.Cog):
         """Find your participant ID for a tournament."""
         user_name = ctx.author.display_name.lower()
         try:
-            participants = self.get_participants(slug)
+            participants = await self.get_participants(slug)
         except Exception as e:
             return await ctx.send(f"❌ Failed to fetch participants: `{e}`")
     
@@ -710,9 +682,8 @@ class ChallongeCog(commands.Cog):
             return
 
         # Auto-create entry in MAP_FILE
-        tourney_map = load_json(MAP_FILE)
-        tourney_map.setdefault(slug, {})
         created_participants = []
+        bound = {}
 
         # Preload from role
         if role:
@@ -726,9 +697,10 @@ class ChallongeCog(commands.Cog):
                 pdata, pstatus = await self.request("POST", f"tournaments/{slug}/participants", json=p_payload)
                 if pstatus == 200:
                     pid = pdata["participant"]["id"]
-                    tourney_map[slug][str(member.id)] = str(pid)
+                    bound[str(member.id)] = str(pid)
                     created_participants.append(pname)
-            save_json(MAP_FILE, tourney_map)
+            async with self.io.edit_json(MAP_FILE, indent=2) as tourney_map:
+                tourney_map.setdefault(slug, {}).update(bound)
 
         embed = discord.Embed(
             title="<:Premium:1388586503092961482> Tournament Created!",
@@ -0,0 +1,188 @@
+# cogs/credit_ledger.py
+
+import os
+import json
+import time
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+from .exaroton_client import get_client, ExarotonError
+from .persistence import read_json
+from .io_executor import get_io
+
+# ─── Configuration ────────────────────────────────────────────────
+SAMPLES_FILE            = "data/credit_samples.jsonl"
+LEGACY_BALANCE_FILE     = "data/exaroton_data.json"  # old single-balance cache, used to seed an empty ledger
+SAMPLE_INTERVAL_SECONDS = float(os.getenv("CREDIT_SAMPLE_INTERVAL", 600))
+MAX_SAMPLES             = 5000
+BURN_WINDOW_SECONDS     = 24 * 3600  # how far back burn_rate() looks
+LOW_CREDIT_THRESHOLD    = 200
+
+
+@dataclass
+class CreditSample:
+    ts: float
+    credits: float
+    source: str = "API"
+
+    @property
+    def age(self) -> float:
+        return max(0.0, time.time() - self.ts)
+
+
+class CreditLedger:
+    """Scheduled credit balance samples, cached for every credit command.
+
+    The burn rate is measured from consecutive API samples where the balance
+    dropped, so top-ups, idle stretches and hand-entered balances don't skew it.
+    """
+
+    def __init__(self, path=SAMPLES_FILE, client=None, interval=SAMPLE_INTERVAL_SECONDS):
+        self.path = path
+        self.client = client or get_client()
+        self.interval = interval
+        self.samples = deque(maxlen=MAX_SAMPLES)
+        self.io = get_io()
+        self._task = None
+        self._lock = asyncio.Lock()
+        self._loaded = False
+
+    async def load(self):
+        """Read the saved samples off the loop. Later calls do nothing."""
+        if self._loaded:
+            return
+        # The path lock keeps a concurrent record() from landing in the file mid-read
+        async with self.io.lock(self.path):
+            if self._loaded:
+                return
+            saved = await self.io.run(_read_samples, self.path, op="credit_load")
+            self._loaded = True
+        if saved is not None:
+            self.samples = deque([*saved, *self.samples], maxlen=MAX_SAMPLES)
+            return
+        legacy = await self.io.run(_read_legacy, op="credit_load")
+        if legacy is not None and not self.samples:
+            balance, ts = legacy
+            await self.record(balance, source="legacy", ts=ts)
+
+    # ─── Sampling ───────────────────────────────────────────────────
+    async def record(self, credits, source="API", ts=None) -> CreditSample:
+        sample = CreditSample(ts or time.time(), float(credits), source)
+        self.samples.append(sample)
+        try:
+            await self.io.append_line(self.path, json.dumps([round(sample.ts, 1), sample.credits, sample.source]))
+        except OSError as e:
+            print(f"[Credit Ledger] Couldn't persist sample: {e}")
+        return sample
+
+    async def refresh(self) -> Optional[CreditSample]:
+        """Sample the balance now. Concurrent callers share one request."""
+        if self._lock.locked():
+            async with self._lock:
+                return self.latest
+        async with self._lock:
+            await self.load()
+            try:
+                balance = await self.client.get_credits()
+            except ExarotonError as e:
+                print(f"[Credit Ledger] Sample failed: {e}")
+                return self.latest
+            return await self.record(balance.credits)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self):
+        await self.load()
+        while True:
+            latest = self.latest
+            wait = self.interval - latest.age if latest and latest.source == "API" else 0
+            if wait > 0:
+                await asyncio.sleep(wait)
+            await self.refresh()
+            await asyncio.sleep(self.interval)
+
+    # ─── Reads ──────────────────────────────────────────────────────
+    @property
+    def latest(self) -> Optional[CreditSample]:
+        return self.samples[-1] if self.samples else None
+
+    async def get(self) -> Optional[CreditSample]:
+        """Latest cached sample; only goes upstream if there has never been one."""
+        await self.load()
+        return self.latest or await self.refresh()
+
+    def burn_rate(self, window=BURN_WINDOW_SECONDS) -> Optional[float]:
+        """Credits per hour while running, from drops between consecutive API samples."""
+        since = time.time() - window
+        burned = elapsed = 0.0
+        prev = None
+        for sample in self.samples:
+            if sample.source != "API":
+                prev = None  # a manual or legacy balance isn't comparable with what the API reports
+                continue
+            if prev is not None and sample.ts >= since and sample.credits < prev.credits:
+                burned += prev.credits - sample.credits
+                elapsed += sample.ts - prev.ts
+            prev = sample
+        if burned <= 0 or elapsed <= 0:
+            return None
+        return burned / (elapsed / 3600)
+
+    def hours_left(self) -> Optional[float]:
+        latest, rate = self.latest, self.burn_rate()
+        if latest is None or not rate:
+            return None
+        return latest.credits / rate
+
+
+def _read_samples(path):
+    """The samples saved at path, or None if nothing has been saved yet."""
+    if not os.path.exists(path):
+        return None
+    samples = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                ts, credits, source = json.loads(line)
+            except (ValueError, TypeError):
+                continue
+            samples.append(CreditSample(float(ts), float(credits), source))
+    return samples
+
+
+def _read_legacy():
+    """(balance, mtime) from the old single-balance cache, if it has one."""
+    if not os.path.exists(LEGACY_BALANCE_FILE):
+        return None
+    balance = read_json(LEGACY_BALANCE_FILE, {}).get("balance")
+    if balance is None:
+        return None
+    return balance, os.path.getmtime(LEGACY_BALANCE_FILE)
+
+
+def format_age(seconds) -> str:
+    if seconds < 90:
+        return f"{int(seconds)}s ago"
+    if seconds < 5400:
+        return f"{int(seconds // 60)}m ago"
+    return f"{seconds / 3600:.1f}h ago"
+
+
+_ledger = None
+
+
+def get_credit_ledger() -> CreditLedger:
+    global _ledger
+    if _ledger is None:
+        _ledger = CreditLedger()
+    return _ledger
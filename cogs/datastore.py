@@ -0,0 +1,534 @@
+# cogs/datastore.py
+
+import os
+import re
+import sys
+import copy
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from .doc_cache import get_document_cache
+from .io_executor import get_io
+from .persistence import read_json
+
+# ─── Configuration ────────────────────────────────────────────────
+DB_FILE = os.getenv("BLKLINE_DB", "data/blkline.db")
+# BLKLINE_STORAGE=json keeps the collections in their JSON files (see JsonStore)
+
+COLLECTIONS = (
+    "pins", "links", "donations", "elo", "match_history", "suggestions", "challenges", "vault",
+    "graveyard", "nuke_counts", "nuke_rollups", "checkpoints",
+)
+
+# Where each collection lived before the database; read by the importer
+LEGACY_FILES = {
+    "pins": "data/pins.json",
+    "links": "data/mc_links.json",
+    "donations": "data/exaroton_donations.json",
+    "elo": "data/elo_scores.json",
+    "match_history": "data/match_history.json",  # {slug: {uid: [...]}} → key "slug/uid"
+    "suggestions": "suggestions.json",           # list → appended in order
+    "challenges": "data/challenges.json",
+    "vault": "data/vault.json",
+    "graveyard": "data/donation_graveyard.json",
+    "nuke_counts": "data/nuke_counts.json",
+    # New with the store; listed so the JSON backend has somewhere to keep them
+    "nuke_rollups": "data/nuke_rollups.json",
+    "checkpoints": "data/checkpoints.json",
+}
+
+# The JSON backend writes each file with the indent it always had
+LEGACY_INDENT = {"elo": 2, "match_history": 2, "suggestions": 2, "challenges": 2, "vault": 2}
+
+# Expression indexes for the JSON fields commands look rows up by
+FIELD_INDEXES = {
+    "links": ("username",),
+}
+
+_FIELD_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _field_expr(field):
+    if not _FIELD_RE.match(field):
+        raise ValueError(f"Bad field name: {field!r}")
+    return f"lower(json_extract(value, '$.{field}'))"
+
+
+def _sequence_key(collection):
+    return f"sequence/{collection}"  # checkpoints row with the last key append() gave out
+
+
+class Batch:
+    """Writes collected inside DataStore.batch() and committed together."""
+
+    def __init__(self):
+        self.ops = []
+
+    def put(self, collection, key, value):
+        self.ops.append(("put", collection, str(key), value))
+
+    def delete(self, collection, key):
+        self.ops.append(("delete", collection, str(key), None))
+
+    def delete_prefix(self, collection, prefix):
+        self.ops.append(("delete_prefix", collection, prefix, None))
+
+    def update(self, collection, key, fn, default=None):
+        """Like DataStore.update(), applied inside the batch's transaction."""
+        self.ops.append(("update", collection, str(key), (fn, default)))
+
+
+class DataStore:
+    """Keyed JSON collections in SQLite (WAL), one table per collection.
+
+    Every call is a point read or a single-row write; rows keep their
+    insertion order, so "latest" lookups match the old dict ordering. All
+    SQL runs on one worker thread, which also serialises writes.
+    """
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="datastore")
+        self._conn = None
+        self.imported = {}  # what the first-run import copied in
+
+    # ─── Connection ─────────────────────────────────────────────────
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        new_tables = [name for name in COLLECTIONS if name not in existing]
+        for name in COLLECTIONS:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {name} ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL UNIQUE, value TEXT NOT NULL)"
+            )
+            for field in FIELD_INDEXES.get(name, ()):
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {name}_{field}_idx ON {name} ({_field_expr(field)})")
+        self._conn = conn
+        if new_tables:
+            self.imported = import_legacy_json(self, collections=new_tables)
+            if self.imported:
+                print(f"[DataStore] Imported legacy JSON: {self.imported}")
+        return conn
+
+    async def _run(self, fn, *args):
+        # Own single-thread lane (one connection), timed alongside the rest of the I/O
+        return await get_io().run(fn, *args, op="datastore", executor=self._executor)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @staticmethod
+    def _table(collection):
+        if collection not in COLLECTIONS:
+            raise KeyError(f"Unknown collection: {collection}")
+        return collection
+
+    # ─── Sync primitives (worker thread only) ───────────────────────
+    def _get(self, collection, key):
+        row = self._connect().execute(
+            f"SELECT value FROM {self._table(collection)} WHERE key = ?", (str(key),)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _put(self, conn, collection, key, value):
+        conn.execute(
+            f"INSERT INTO {self._table(collection)} (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (str(key), json.dumps(value)),
+        )
+
+    def _delete(self, conn, collection, key):
+        return conn.execute(f"DELETE FROM {self._table(collection)} WHERE key = ?", (str(key),)).rowcount
+
+    def _delete_prefix(self, conn, collection, prefix):
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return conn.execute(
+            f"DELETE FROM {self._table(collection)} WHERE key LIKE ? ESCAPE '\\'", (escaped + "%",)
+        ).rowcount
+
+    def _transaction(self, body):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = body(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    def _apply_ops(self, ops):
+        def body(conn):
+            for op, collection, key, value in ops:
+                if op == "put":
+                    self._put(conn, collection, key, value)
+                elif op == "delete":
+                    self._delete(conn, collection, key)
+                elif op == "delete_prefix":
+                    self._delete_prefix(conn, collection, key)
+                elif op == "update":
+                    self._update_row(conn, collection, key, *value)
+        self._transaction(body)
+
+    def _append(self, collection, values):
+        table = self._table(collection)
+
+        def body(conn):
+            row = conn.execute("SELECT value FROM checkpoints WHERE key = ?", (_sequence_key(collection),)).fetchone()
+            if row is None:
+                # First append since sequences existed: carry on from the highest numeric key
+                last = conn.execute(f"SELECT COALESCE(MAX(CAST(key AS INTEGER)), 0) FROM {table}").fetchone()[0]
+            else:
+                last = json.loads(row[0])
+            keys = [str(last + i) for i in range(1, len(values) + 1)]
+            for key, value in zip(keys, values):
+                self._put(conn, collection, key, value)
+            self._put(conn, "checkpoints", _sequence_key(collection), last + len(values))
+            return keys
+        return self._transaction(body)
+
+    def _update_row(self, conn, collection, key, fn, default):
+        row = conn.execute(f"SELECT value FROM {self._table(collection)} WHERE key = ?", (str(key),)).fetchone()
+        new = fn(json.loads(row[0]) if row else default)
+        if new is None:
+            self._delete(conn, collection, key)
+        else:
+            self._put(conn, collection, key, new)
+        return new
+
+    def _update(self, collection, key, fn, default):
+        return self._transaction(lambda conn: self._update_row(conn, collection, key, fn, default))
+
+    def _items(self, collection, prefix=None, reverse=False, limit=None):
+        sql = f"SELECT key, value FROM {self._table(collection)}"
+        params = []
+        if prefix is not None:
+            sql += " WHERE key >= ? AND key < ?"
+            params += [prefix, prefix + "\U0010ffff"]
+        sql += " ORDER BY seq DESC" if reverse else " ORDER BY seq"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return [(k, json.loads(v)) for k, v in self._connect().execute(sql, params)]
+
+    def _page(self, collection, after_seq, limit):
+        return [(seq, k, json.loads(v)) for seq, k, v in self._connect().execute(
+            f"SELECT seq, key, value FROM {self._table(collection)} WHERE seq > ? ORDER BY seq LIMIT ?",
+            (after_seq, int(limit)),
+        )]
+
+    def _find(self, collection, field, value):
+        row = self._connect().execute(
+            f"SELECT key, value FROM {self._table(collection)} WHERE {_field_expr(field)} = lower(?) LIMIT 1",
+            (value,),
+        ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def _scalar(self, sql):
+        return self._connect().execute(sql).fetchone()[0]
+
+    # ─── Async API ──────────────────────────────────────────────────
+    async def get(self, collection, key, default=None):
+        value = await self._run(self._get, collection, key)
+        return default if value is None else value
+
+    async def put(self, collection, key, value):
+        await self._run(self._apply_ops, [("put", collection, str(key), value)])
+
+    async def delete(self, collection, key) -> bool:
+        return bool(await self._run(lambda: self._transaction(lambda c: self._delete(c, collection, key))))
+
+    async def delete_prefix(self, collection, prefix) -> int:
+        return await self._run(lambda: self._transaction(lambda c: self._delete_prefix(c, collection, prefix)))
+
+    async def append(self, collection, value) -> str:
+        """Insert under the collection's next sequence number and return its key.
+
+        Sequences only go up, so a deleted key is never handed out again.
+        """
+        return (await self._run(self._append, collection, [value]))[0]
+
+    async def append_many(self, collection, values) -> list:
+        """append() for every value in one transaction; returns their keys in order."""
+        values = list(values)
+        if not values:
+            return []
+        return await self._run(self._append, collection, values)
+
+    async def update(self, collection, key, fn, default=None):
+        """Atomically replace key's value with fn(current); returning None deletes it."""
+        return await self._run(self._update, collection, key, fn, default)
+
+    async def items(self, collection, prefix=None, reverse=False, limit=None):
+        """(key, value) pairs in insertion order, optionally only keys starting with prefix."""
+        return await self._run(self._items, collection, prefix, reverse, limit)
+
+    async def scan(self, collection, batch_size=500):
+        """Yield (key, value) in insertion order, fetching batch_size rows at a time."""
+        last = 0
+        while True:
+            rows = await self._run(self._page, collection, last, batch_size)
+            for _, key, value in rows:
+                yield key, value
+            if len(rows) < batch_size:
+                return
+            last = rows[-1][0]
+
+    async def values(self, collection):
+        return [v for _, v in await self.items(collection)]
+
+    async def as_dict(self, collection) -> dict:
+        return dict(await self.items(collection))
+
+    async def latest(self, collection):
+        rows = await self.items(collection, reverse=True, limit=1)
+        return rows[0] if rows else None
+
+    async def find(self, collection, field, value):
+        """First (key, value) whose JSON field equals value, case-insensitively."""
+        return await self._run(self._find, collection, field, value)
+
+    async def count(self, collection) -> int:
+        return await self._run(self._scalar, f"SELECT COUNT(*) FROM {self._table(collection)}")
+
+    @asynccontextmanager
+    async def batch(self):
+        """Collect writes and commit them in one transaction when the block exits cleanly."""
+        batch = Batch()
+        yield batch
+        if batch.ops:
+            await self._run(self._apply_ops, batch.ops)
+
+
+def _load_legacy(path):
+    try:
+        return read_json(path)
+    except (OSError, ValueError) as e:
+        print(f"[DataStore] Skipping unreadable {path}: {e}")
+        return None
+
+
+def import_legacy_json(store, force=False, collections=None) -> dict:
+    """Copy the old data/*.json files into the store. Runs on the calling thread.
+
+    Collections that already have rows are left alone unless force is set.
+    """
+    conn = store._connect()
+    counts = {}
+    for collection, path in LEGACY_FILES.items():
+        if collections is not None and collection not in collections:
+            continue
+        data = _load_legacy(path)
+        if not data:
+            continue
+        if not force and conn.execute(f"SELECT 1 FROM {collection} LIMIT 1").fetchone():
+            continue
+
+        if collection == "match_history":
+            rows = [(f"{slug}/{uid}", entries)
+                    for slug, users in data.items() for uid, entries in users.items()]
+        elif collection == "suggestions":
+            rows = [(str(i), entry) for i, entry in enumerate(data, start=1)]
+        else:
+            rows = list(data.items())
+
+        def body(c, rows=rows, collection=collection):
+            for key, value in rows:
+                store._put(c, collection, key, value)
+        store._transaction(body)
+        counts[collection] = len(rows)
+    return counts
+
+
+# ─── JSON backend ─────────────────────────────────────────────────
+def _nest_match_history(rows):
+    nested = {}
+    for key, entries in rows.items():
+        slug, _, uid = key.partition("/")
+        nested.setdefault(slug, {})[uid] = entries
+    return nested
+
+
+def _flatten_match_history(nested):
+    return {f"{slug}/{uid}": entries for slug, users in nested.items() for uid, entries in users.items()}
+
+
+# (encode, decode) between the keyed rows and each legacy file's own layout
+LEGACY_CODECS = {
+    "match_history": (_nest_match_history, _flatten_match_history),
+    "suggestions": (lambda rows: list(rows.values()),
+                    lambda entries: {str(i): entry for i, entry in enumerate(entries or [], start=1)}),
+}
+
+
+def _max_int_key(rows):
+    return max((int(k) for k in rows if k.isdigit()), default=0)
+
+class JsonStore:
+    """The DataStore API over the legacy JSON files, for deployments that keep them.
+
+    Files live in the document cache: parsed once, edited under a per-file
+    lock and flushed in the background. Values are copied in and out so
+    callers can't change cached data behind the lock's back.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache or get_document_cache()
+        self.imported = {}
+        for collection, path in LEGACY_FILES.items():
+            encode, decode = LEGACY_CODECS.get(collection, (None, None))
+            self.cache.register(path, LEGACY_INDENT.get(collection, 4), encode, decode)
+
+    @staticmethod
+    def _path(collection):
+        if collection not in COLLECTIONS:
+            raise KeyError(f"Unknown collection: {collection}")
+        return LEGACY_FILES[collection]
+
+    def close(self):
+        pass  # get_document_cache().close() does the final flush
+
+    @staticmethod
+    def _apply(rows, op, key, value):
+        if op == "put":
+            rows[key] = copy.deepcopy(value)
+        elif op == "delete":
+            rows.pop(key, None)
+        elif op == "delete_prefix":
+            for k in [k for k in rows if k.startswith(key)]:
+                del rows[k]
+        elif op == "update":
+            fn, default = value
+            current = rows.get(key)
+            new = fn(default if current is None else copy.deepcopy(current))
+            if new is None:
+                rows.pop(key, None)
+            else:
+                rows[key] = copy.deepcopy(new)
+
+    async def get(self, collection, key, default=None):
+        value = (await self.cache.get(self._path(collection))).get(str(key))
+        return default if value is None else copy.deepcopy(value)
+
+    async def put(self, collection, key, value):
+        async with self.cache.edit(self._path(collection)) as rows:
+            rows[str(key)] = copy.deepcopy(value)
+
+    async def delete(self, collection, key) -> bool:
+        async with self.cache.edit(self._path(collection)) as rows:
+            return rows.pop(str(key), None) is not None
+
+    async def delete_prefix(self, collection, prefix) -> int:
+        async with self.cache.edit(self._path(collection)) as rows:
+            doomed = [k for k in rows if k.startswith(prefix)]
+            for k in doomed:
+                del rows[k]
+            return len(doomed)
+
+    async def append(self, collection, value) -> str:
+        return (await self.append_many(collection, [value]))[0]
+
+    async def append_many(self, collection, values) -> list:
+        values = list(values)
+        if not values:
+            return []
+        async with self.cache.edit_many(self._path("checkpoints"), self._path(collection)) as (checkpoints, rows):
+            last = checkpoints.get(_sequence_key(collection))
+            if last is None:
+                last = _max_int_key(rows)
+            keys = [str(last + i) for i in range(1, len(values) + 1)]
+            for key, value in zip(keys, values):
+                rows[key] = copy.deepcopy(value)
+            checkpoints[_sequence_key(collection)] = last + len(values)
+            return keys
+
+    async def update(self, collection, key, fn, default=None):
+        async with self.cache.edit(self._path(collection)) as rows:
+            current = rows.get(str(key))
+            new = fn(default if current is None else copy.deepcopy(current))
+            if new is None:
+                rows.pop(str(key), None)
+            else:
+                rows[str(key)] = copy.deepcopy(new)
+            return new
+
+    async def items(self, collection, prefix=None, reverse=False, limit=None):
+        rows = await self.cache.get(self._path(collection))
+        keys = [k for k in rows if prefix is None or k.startswith(prefix)]
+        if reverse:
+            keys.reverse()
+        if limit is not None:
+            keys = keys[:int(limit)]
+        return [(k, copy.deepcopy(rows[k])) for k in keys]
+
+    async def scan(self, collection, batch_size=500):
+        rows = await self.cache.get(self._path(collection))
+        keys = list(rows)
+        for start in range(0, len(keys), batch_size):
+            batch = [(k, copy.deepcopy(rows[k])) for k in keys[start:start + batch_size] if k in rows]
+            for key, value in batch:
+                yield key, value
+
+    async def values(self, collection):
+        return [v for _, v in await self.items(collection)]
+
+    async def as_dict(self, collection) -> dict:
+        return dict(await self.items(collection))
+
+    async def latest(self, collection):
+        rows = await self.items(collection, reverse=True, limit=1)
+        return rows[0] if rows else None
+
+    async def find(self, collection, field, value):
+        wanted = str(value).lower()
+        for key, row in (await self.cache.get(self._path(collection))).items():
+            if isinstance(row, dict) and str(row.get(field, "")).lower() == wanted:
+                return key, copy.deepcopy(row)
+        return None
+
+    async def count(self, collection) -> int:
+        return len(await self.cache.get(self._path(collection)))
+
+    @asynccontextmanager
+    async def batch(self):
+        batch = Batch()
+        yield batch
+        if not batch.ops:
+            return
+        paths = [self._path(collection) for _, collection, _, _ in batch.ops]
+        async with self.cache.edit_many(*dict.fromkeys(paths)) as docs:
+            by_path = dict(zip(dict.fromkeys(paths), docs))
+            for (op, _, key, value), path in zip(batch.ops, paths):
+                self._apply(by_path[path], op, key, value)
+
+
+_store = None
+
+
+def get_store():
+    """The shared store: SQLite by default, the JSON files with BLKLINE_STORAGE=json."""
+    global _store
+    if _store is None:
+        backend = os.getenv("BLKLINE_STORAGE", "sqlite").lower()
+        _store = JsonStore() if backend == "json" else DataStore()
+    return _store
+
+
+if __name__ == "__main__":
+    # python -m cogs.datastore [--force]
+    store = DataStore()
+    store._connect()  # new tables import on their own
+    result = import_legacy_json(store, force=True) if "--force" in sys.argv[1:] else store.imported
+    print(f"Imported into {store.path}: {result or 'nothing new'}")
+    store.close()
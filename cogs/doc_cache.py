@@ -0,0 +1,161 @@
+# cogs/doc_cache.py
+
+import os
+import asyncio
+from contextlib import asynccontextmanager
+
+from .persistence import commit_files
+from .serializers import dumps_document, kind_of
+from .io_executor import get_io
+
+# ─── Configuration ────────────────────────────────────────────────
+FLUSH_DELAY_SECONDS = float(os.getenv("DOC_FLUSH_DELAY", 2.0))  # writes within this window share one flush
+
+
+class Document:
+    """One JSON file held in memory. Mutate it only inside DocumentCache.edit()."""
+
+    __slots__ = ("path", "data", "dirty", "version", "loaded", "lock", "indent", "encode", "decode")
+
+    def __init__(self, path, indent=4, encode=None, decode=None):
+        self.path = path
+        self.data = None
+        self.dirty = False
+        self.version = 0  # bumped by every edit, so a flush knows if one landed mid-write
+        self.loaded = False
+        self.lock = asyncio.Lock()
+        self.indent = indent
+        self.encode = encode  # in-memory shape → what goes on disk
+        self.decode = decode  # what's on disk → in-memory shape
+
+
+class DocumentCache:
+    """Write-back cache of data/*.json files.
+
+    Each file is parsed once. Changes go through edit(), which holds the
+    document's lock for the whole read-modify-write so overlapping commands
+    can't drop each other's updates, then marks it dirty. Dirty documents
+    are written together FLUSH_DELAY_SECONDS after the first change, and on
+    close().
+    """
+
+    def __init__(self, flush_delay=FLUSH_DELAY_SECONDS):
+        self.flush_delay = flush_delay
+        self._docs = {}
+        self._flush_task = None
+        self._flush_lock = asyncio.Lock()
+
+    def register(self, path, indent=4, encode=None, decode=None) -> Document:
+        """Declare how a file is stored. Optional; plain dict files need no setup."""
+        doc = self._docs.get(path)
+        if doc is None:
+            doc = self._docs[path] = Document(path, indent, encode, decode)
+        return doc
+
+    async def _load(self, path, default) -> Document:
+        doc = self.register(path)
+        if not doc.loaded:
+            async with doc.lock:
+                if not doc.loaded:
+                    raw = await get_io().read_json(path)
+                    if raw is None:
+                        raw = default() if callable(default) else default
+                    doc.data = doc.decode(raw) if doc.decode else raw
+                    doc.loaded = True
+        return doc
+
+    # ─── Access ─────────────────────────────────────────────────────
+    async def get(self, path, default=dict):
+        """The cached data for path. Treat it as read-only."""
+        return (await self._load(path, default)).data
+
+    @asynccontextmanager
+    async def edit(self, path, default=dict):
+        """Lock path's document and yield its data for in-place changes."""
+        doc = await self._load(path, default)
+        async with doc.lock:
+            try:
+                yield doc.data
+            finally:
+                self._mark_dirty(doc)  # memory is the source of truth, even after a partial edit
+
+    @asynccontextmanager
+    async def edit_many(self, *paths, default=dict):
+        """edit() for several documents at once; locks are taken in path order."""
+        docs = [await self._load(path, default) for path in paths]
+        ordered = sorted(set(docs), key=lambda d: d.path)
+        for doc in ordered:
+            await doc.lock.acquire()
+        try:
+            yield [doc.data for doc in docs]
+        finally:
+            for doc in reversed(ordered):
+                self._mark_dirty(doc)
+                doc.lock.release()
+
+    def _mark_dirty(self, doc):
+        doc.dirty = True
+        doc.version += 1
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._flush_later())
+
+    # ─── Flushing ───────────────────────────────────────────────────
+    async def _flush_later(self):
+        # Edits made while a flush is writing see this task still running and schedule
+        # nothing, so go round again until a flush leaves nothing dirty behind
+        while True:
+            await asyncio.sleep(self.flush_delay)
+            await self.flush()
+            if not any(doc.dirty for doc in self._docs.values()):
+                return
+
+    async def flush(self) -> int:
+        """Write every dirty document now, as one journaled commit. Returns how many were written."""
+        async with self._flush_lock:
+            dirty = [doc for doc in self._docs.values() if doc.dirty]
+            if not dirty:
+                return 0
+            # Take every lock so the commit is a consistent cut across files (an edit_many can't be half in it)
+            ordered = sorted(dirty, key=lambda d: d.path)
+            for doc in ordered:
+                await doc.lock.acquire()
+            try:
+                files, versions = {}, {}
+                for doc in ordered:
+                    data = doc.encode(doc.data) if doc.encode else doc.data
+                    files[doc.path] = dumps_document(data, kind_of(doc.path), indent=doc.indent)
+                    versions[doc] = doc.version
+            finally:
+                for doc in reversed(ordered):
+                    doc.lock.release()
+            # Documents stay dirty until the commit lands, so a failure of any kind leaves them queued
+            try:
+                await get_io().run(commit_files, files, op="doc_flush")
+            except OSError as e:
+                print(f"[Doc Cache] Couldn't write {', '.join(files)}: {e}")
+                return 0
+            for doc, version in versions.items():
+                if doc.version == version:  # not edited again while the commit was writing
+                    doc.dirty = False
+            return len(files)
+
+    async def close(self):
+        # Flush first: it waits out a flush already in progress rather than cutting it off
+        await self.flush()
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        self._flush_task = None
+
+    def dirty_paths(self):
+        return [doc.path for doc in self._docs.values() if doc.dirty]
+
+
+_cache = None
+
+
+def get_document_cache() -> DocumentCache:
+    global _cache
+    if _cache is None:
+        _cache = DocumentCache()
+    return _cache
@@ -0,0 +1,263 @@
+# cogs/donation_ledger.py
+
+import os
+import json
+import asyncio
+from datetime import datetime
+
+from .datastore import get_store
+from .io_executor import get_io
+from .nuke_rollups import queue_bumps
+
+# ─── Configuration ────────────────────────────────────────────────
+EVENTS_FILE    = "data/donation_events.jsonl"  # append-only; the source of truth for donations
+CHECKPOINT_KEY = "donation_events"             # checkpoints row: last event folded into the views
+VIEWS          = ("donations", "graveyard", "nuke_counts", "nuke_rollups")
+VIEWS_VERSION  = 2                             # bump when views are added or change shape; forces a replay
+EVENT_TYPES    = ("import", "grant", "set", "nuke", "forgive")
+
+
+def _month(ts):
+    return ts[:7]  # "YYYY-MM" of an ISO timestamp
+
+
+def _bump(months, month, delta):
+    months = dict(months)
+    count = months.get(month, 0) + delta
+    if count > 0:
+        months[month] = count
+    else:
+        months.pop(month, None)
+    return months or None
+
+
+def _normalize_graveyard(entry):
+    # Pre-ledger graveyards held bare amounts, with no record of who nuked them
+    if isinstance(entry, dict):
+        return entry
+    return {"amount": entry, "by": None, "month": None}
+
+
+def _normalize_months(counts):
+    # One old nuke command kept a flat count per mod instead of per month
+    return counts if isinstance(counts, dict) else {"legacy": counts}
+
+
+def apply_event(batch, event):
+    """Queue the view changes for one event onto a store batch."""
+    kind, user = event["type"], event.get("user")
+    if kind == "import":
+        for view in VIEWS:
+            for key, value in event["views"].get(view, {}).items():
+                batch.put(view, key, value)
+        for mod_id, months in event["views"].get("nuke_counts", {}).items():
+            for month, count in months.items():
+                queue_bumps(batch, mod_id, month, count)
+    elif kind == "grant":
+        batch.update("donations", user, lambda total: total + event["amount"], 0)
+    elif kind == "set":
+        batch.put("donations", user, event["amount"])
+    elif kind == "nuke":
+        month = _month(event["ts"])
+        batch.delete("donations", user)
+        batch.put("graveyard", user, {"amount": event["amount"], "by": event["by"], "month": month})
+        batch.update("nuke_counts", event["by"], lambda months: _bump(months, month, 1), {})
+        queue_bumps(batch, event["by"], month, 1)
+    elif kind == "forgive":
+        batch.put("donations", user, event["amount"])
+        batch.delete("graveyard", user)
+        # The nuke is taken back from whoever made it, in the month it was made
+        if event.get("nuked_by") and event.get("nuked_month"):
+            batch.update("nuke_counts", event["nuked_by"],
+                         lambda months: _bump(months or {}, event["nuked_month"], -1))
+            queue_bumps(batch, event["nuked_by"], event["nuked_month"], -1)
+    else:
+        raise ValueError(f"Unknown donation event type: {kind!r}")
+
+
+def _append_event(path, line) -> int:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "ab") as f:
+        f.write(line.encode("utf-8") + b"\n")
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell()
+
+
+def _read_events(path, offset=0):
+    """(events, end offset) from offset on. A torn last line is left for the next read."""
+    if not os.path.exists(path):
+        return [], 0
+    events = []
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            offset += len(raw)
+            try:
+                event = json.loads(raw)
+                if event["type"] not in EVENT_TYPES:
+                    raise ValueError(event["type"])
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"[Donation Ledger] Skipping bad event at byte {offset - len(raw)}: {e}")
+                continue
+            events.append(event)
+    return events, offset
+
+
+class DonationLedger:
+    """Donations as an append-only event log with materialized views.
+
+    Every change is one fsynced line in EVENTS_FILE. The VIEWS store
+    collections are derived from the log: each append updates them in the
+    same batch as the checkpoint, so reads stay point lookups. load() folds in anything appended after the last checkpoint
+    (e.g. a crash between the two steps); rebuild() replays from scratch.
+    """
+
+    def __init__(self, path=EVENTS_FILE, store=None):
+        self.path = path
+        self.store = store or get_store()
+        self.io = get_io()
+        self.seq = 0
+        self.offset = 0
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self._listeners = []
+
+    def on_change(self, handler):
+        """Call handler(user_id, total) after each donation change; (None, None) means reload everything."""
+        if handler not in self._listeners:
+            self._listeners.append(handler)
+        return handler
+
+    def _notify(self, user_id=None, total=None):
+        for handler in list(self._listeners):
+            try:
+                handler(user_id, total)
+            except Exception as e:
+                print(f"[Donation Ledger] Listener failed: {e}")
+
+    # ─── Startup / replay ───────────────────────────────────────────
+    async def load(self):
+        async with self._lock:
+            await self._ensure_loaded()
+
+    async def _ensure_loaded(self):
+        if self._loaded:
+            return
+        checkpoint = await self.store.get("checkpoints", CHECKPOINT_KEY, {"seq": 0, "offset": 0})
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else None
+        if size is None:
+            await self._seed()
+        elif size < checkpoint["offset"] or not checkpoint["seq"] or checkpoint.get("version") != VIEWS_VERSION:
+            print("[Donation Ledger] Checkpoint doesn't match the event log or views; rebuilding views")
+            await self._rebuild()
+        else:
+            self.seq, self.offset = checkpoint["seq"], checkpoint["offset"]
+            events, end = await self.io.run(_read_events, self.path, self.offset, op="ledger_replay")
+            if events or end != self.offset:
+                await self._fold(events, end)
+                print(f"[Donation Ledger] Caught up {len(events)} event(s) past the checkpoint")
+        self._loaded = True
+
+    async def _seed(self):
+        # First run: the existing views become an import event, so a replay reproduces them
+        views = {view: await self.store.as_dict(view) for view in ("donations", "graveyard", "nuke_counts")}
+        views["graveyard"] = {k: _normalize_graveyard(v) for k, v in views["graveyard"].items()}
+        views["nuke_counts"] = {k: _normalize_months(v) for k, v in views["nuke_counts"].items()}
+        self.seq, self.offset = 0, 0
+        await self._append({"type": "import", "views": views}, clear=True)
+        print(f"[Donation Ledger] Started {self.path} from {len(views['donations'])} donor record(s)")
+
+    async def _rebuild(self):
+        events, end = await self.io.run(_read_events, self.path, 0, op="ledger_replay")
+        self.seq, self.offset = 0, 0
+        await self._fold(events, end, clear=True)
+        return len(events)
+
+    async def rebuild(self) -> int:
+        """Recompute every view from the full log. Returns how many events were replayed."""
+        async with self._lock:
+            count = await self._rebuild()
+            self._loaded = True
+            return count
+
+    async def _fold(self, events, end, clear=False):
+        async with self.store.batch() as batch:
+            if clear:
+                for view in VIEWS:
+                    batch.delete_prefix(view, "")
+            for event in events:
+                if event.get("seq", 0) > self.seq or clear:
+                    apply_event(batch, event)
+                    self.seq = max(self.seq, event.get("seq", 0))
+            batch.put("checkpoints", CHECKPOINT_KEY, {"seq": self.seq, "offset": end, "version": VIEWS_VERSION})
+        self.offset = end
+        self._notify()
+
+    # ─── Appending ──────────────────────────────────────────────────
+    async def _append(self, event, clear=False):
+        event = {"seq": self.seq + 1, "ts": datetime.utcnow().isoformat(), **event}
+        line = json.dumps(event, separators=(",", ":"))
+        async with self.io.lock(self.path):
+            end = await self.io.run(_append_event, self.path, line, op="ledger_append")
+        self.seq = event["seq"]
+        async with self.store.batch() as batch:
+            if clear:
+                for view in VIEWS:
+                    batch.delete_prefix(view, "")
+            apply_event(batch, event)
+            batch.put("checkpoints", CHECKPOINT_KEY, {"seq": self.seq, "offset": end, "version": VIEWS_VERSION})
+        self.offset = end
+        if event["type"] == "import":
+            self._notify()
+        else:
+            self._notify(event["user"], await self.store.get("donations", event["user"]))
+        return event
+
+    async def grant(self, user_id, amount, by=None) -> float:
+        """Add amount to user_id's total; returns the new total."""
+        async with self._lock:
+            await self._ensure_loaded()
+            await self._append({"type": "grant", "user": str(user_id), "amount": amount, "by": by and str(by)})
+            return await self.store.get("donations", str(user_id), 0)
+
+    async def set(self, user_id, amount, by=None):
+        async with self._lock:
+            await self._ensure_loaded()
+            await self._append({"type": "set", "user": str(user_id), "amount": amount, "by": by and str(by)})
+
+    async def nuke(self, user_id, by):
+        """Move user_id's total to the graveyard and count it for by. None if they had nothing."""
+        async with self._lock:
+            await self._ensure_loaded()
+            amount = await self.store.get("donations", str(user_id))
+            if amount is None:
+                return None
+            await self._append({"type": "nuke", "user": str(user_id), "amount": amount, "by": str(by)})
+            return amount
+
+    async def forgive(self, user_id, by):
+        """Restore user_id's total from the graveyard. None if there is nothing to restore."""
+        async with self._lock:
+            await self._ensure_loaded()
+            entry = await self.store.get("graveyard", str(user_id))
+            if entry is None:
+                return None
+            entry = _normalize_graveyard(entry)
+            await self._append({
+                "type": "forgive", "user": str(user_id), "amount": entry["amount"], "by": str(by),
+                "nuked_by": entry["by"], "nuked_month": entry["month"],
+            })
+            return entry["amount"]
+
+
+_ledger = None
+
+
+def get_donation_ledger() -> DonationLedger:
+    global _ledger
+    if _ledger is None:
+        _ledger = DonationLedger()
+    return _ledger
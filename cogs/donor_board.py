@@ -0,0 +1,121 @@
+# cogs/donor_board.py
+
+import asyncio
+from bisect import bisect_left, insort
+
+try:
+    from sortedcontainers import SortedList
+except ImportError:  # pip install sortedcontainers; the fallback has O(n) inserts
+    SortedList = None
+
+from .datastore import get_store
+from .donation_ledger import get_donation_ledger
+
+
+class _BisectList:
+    """The slice of SortedList's API the board uses, on a plain list."""
+
+    def __init__(self, iterable=()):
+        self._items = sorted(iterable)
+
+    def add(self, value):
+        insort(self._items, value)
+
+    def remove(self, value):
+        del self._items[self.index(value)]
+
+    def index(self, value):
+        i = bisect_left(self._items, value)
+        if i == len(self._items) or self._items[i] != value:
+            raise ValueError(f"{value!r} not in list")
+        return i
+
+    def bisect_left(self, value):
+        return bisect_left(self._items, value)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __len__(self):
+        return len(self._items)
+
+
+class DonorBoard:
+    """Donation totals kept in rank order.
+
+    Entries are (-total, user_id), so the biggest donor sorts first. The
+    ledger pushes every change in, which keeps top(), rank() and
+    neighbours() at O(log n) instead of sorting all donors per command.
+    Donors with equal totals share a rank.
+    """
+
+    def __init__(self, store=None, ledger=None):
+        self.store = store or get_store()
+        self.totals = {}
+        self._order = None
+        self._missed = False  # a change arrived while loading
+        self._lock = asyncio.Lock()
+        (ledger or get_donation_ledger()).on_change(self._on_change)
+
+    async def _ensure_loaded(self):
+        if self._order is not None:
+            return
+        async with self._lock:
+            while self._order is None:
+                self._missed = False
+                totals = await self.store.as_dict("donations")
+                if self._missed:
+                    continue  # the read may predate it; go again
+                self.totals = {uid: float(total) for uid, total in totals.items()}
+                entries = [(-total, uid) for uid, total in self.totals.items()]
+                self._order = SortedList(entries) if SortedList is not None else _BisectList(entries)
+
+    def _on_change(self, user_id, total):
+        if user_id is None or self._order is None:
+            self._order = None  # wholesale change, or not loaded yet: reload on next use
+            self._missed = True
+            return
+        old = self.totals.pop(user_id, None)
+        if old is not None:
+            self._order.remove((-old, user_id))
+        if total is not None:
+            self.totals[user_id] = float(total)
+            self._order.add((-float(total), user_id))
+
+    # ─── Queries ────────────────────────────────────────────────────
+    async def top(self, n=5):
+        """[(user_id, total)] for the n biggest donors."""
+        await self._ensure_loaded()
+        return [(uid, -neg) for neg, uid in self._order[:max(0, n)]]
+
+    async def rank(self, user_id):
+        """(rank, total) for user_id, 1 being the top donor, or None if they have no total."""
+        await self._ensure_loaded()
+        total = self.totals.get(str(user_id))
+        if total is None:
+            return None
+        return self._order.bisect_left((-total,)) + 1, total
+
+    async def neighbours(self, user_id, span=2):
+        """[(rank, user_id, total)] for up to span donors either side of user_id, user_id included."""
+        await self._ensure_loaded()
+        total = self.totals.get(str(user_id))
+        if total is None:
+            return []
+        i = self._order.index((-total, str(user_id)))
+        start = max(0, i - span)
+        window = self._order[start:i + span + 1]
+        return [(self._order.bisect_left((neg,)) + 1, uid, -neg) for neg, uid in window]
+
+    def __len__(self):
+        return len(self.totals)
+
+
+_board = None
+
+
+def get_donor_board() -> DonorBoard:
+    global _board
+    if _board is None:
+        _board = DonorBoard()
+    return _board
@@ -1,11 +1,23 @@
 import discord
 from discord.ext import commands, tasks
-from mcstatus import JavaServer
 from discord.ext.commands import cooldown, BucketType, Context
 from .exaroton_scraper_playwright import get_live_status_playwright
+from .exaroton_client import get_client, ExarotonError
+from .status_service import get_status_service, StatusSnapshot
+from .exaroton_stream import ExarotonStream
+from .status_monitor import StatusMonitor
+from .status_history import get_status_history, WINDOWS
+from .credit_ledger import get_credit_ledger, format_age, LOW_CREDIT_THRESHOLD
+from .mc_probe import get_probe, describe_motd, sample_names, ProbeError
+from .datastore import get_store
+from .donation_ledger import get_donation_ledger
+from .redemption_index import get_redemption_index, FORGIVENESS_LOG
+from .nuke_rollups import parse_period, top_nukers
+from .donor_board import get_donor_board
+from .persistence import write_json, read_json
+from .io_executor import get_io
 import json
 import time
-import requests
 import asyncio
 from typing import Union
 import os
@@ -15,9 +27,8 @@ from discord.ui import View, Button
 from discord import ButtonStyle
 
 
-DATA_FILE = "data/exaroton_data.json"
 POOL_FILE = "data/exaroton_pool.json"
-DONOR_FILE = "data/exaroton_donations.json"
+NUKE_LOG = "data/donation_nukes.log"
 donor_role_id = 1391053379106508831
 DONOR_ROLE_THRESHOLD = 100.0
 MOD_LOG_CHANNEL_ID = 1391076656835330111
@@ -26,30 +37,19 @@ DEV_USER_ID = [448896936481652777, 424532190290771998]
 EXAROTON_TOKEN = os.getenv("EXAROTON_TOKEN")
 EXAROTON_SERVER_ID = os.getenv("EXAROTON_SERVER_ID")
 SERVER_ADDRESS="obscura.exaroton.me"
-CHECK_INTERVAL_HOURS = 3
 
 def load_data(filename):
-    if not os.path.exists(filename):
-        return {}
-    with open(filename, "r") as f:
-        return json.load(f)
+    return read_json(filename, {})
 
 def save_data(filename, data):
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
-    with open(filename, "w") as f:
-        json.dump(data, f, indent=4)
+    write_json(filename, data)
 
 def save_json(file, data):
-        os.makedirs(os.path.dirname(file), exist_ok=True)
-        with open(file, "w") as f:
-            json.dump(data, f, indent=4)
+    write_json(file, data)
 
 
 def load_json(file):
-    if not os.path.exists(file):
-        return {}
-    with open(file, "r") as f:
-        return json.load(f)
+    return read_json(file, {})
 
 
 class ConfirmNukeView(View):
@@ -81,13 +81,45 @@ class StatusButton(discord.ui.Button):
         super().__init__(label=label, style=discord.ButtonStyle.blurple, custom_id=custom_id)
 
     async def callback(self, interaction: discord.Interaction):
-        ctx = await interaction.client.get_context(interaction.message)
+        await interaction.response.defer()
+        snapshot = await get_status_service().get()
         if self.custom_id == "status_button":
-            await interaction.response.defer()
-            await ctx.invoke(ctx.bot.get_command("status"))
+            await interaction.followup.send(embed=build_status_embed(snapshot))
         elif self.custom_id == "players_button":
-            await interaction.response.defer()
-            await ctx.invoke(ctx.bot.get_command("players"))
+            await interaction.followup.send(embed=build_players_embed(snapshot))
+
+
+def _source_footer(snapshot):
+    footer = f"Pulled via {snapshot.source}"
+    if snapshot.latency:
+        footer += f" in {snapshot.latency * 1000:.0f}ms"
+    if snapshot.age >= 1:
+        footer += f" • {int(snapshot.age)}s ago"
+    return footer
+
+
+def build_status_embed(snapshot):
+    embed = discord.Embed(
+        title="Obscura Server Status",
+        description=f"**MOTD:** `{snapshot.motd.strip()}`",
+        color=discord.Color.green() if snapshot.online else discord.Color.red()
+    )
+    embed.add_field(name="Status", value=f"🟢 {snapshot.status_text}" if snapshot.online else f"🔴 {snapshot.status_text}", inline=True)
+    embed.add_field(name="Players", value=", ".join(snapshot.players) if snapshot.players else "Nobody online.", inline=False)
+    embed.set_footer(text=_source_footer(snapshot))
+    return embed
+
+
+def build_players_embed(snapshot):
+    embed = discord.Embed(
+        title="Online Players",
+        description="Nobody online." if not snapshot.players else ", ".join(snapshot.players),
+        color=discord.Color.green() if snapshot.online else discord.Color.red()
+    )
+    embed.add_field(name="MOTD", value=f"`{snapshot.motd.strip()}`", inline=False)
+    embed.set_footer(text=_source_footer(snapshot))
+    return embed
+
 
 class ServerControlView(discord.ui.View):
     def __init__(self, credit_code):
@@ -123,37 +155,57 @@ class ExarotonCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.credit_pool_code = load_json(POOL_FILE).get("pool")
-        self.credit_balance = load_data(DATA_FILE).get("balance", 0.0)
+        self.ledger = get_credit_ledger()
+        self.store = get_store()
+        self.donations = get_donation_ledger()
+        self.redemptions = get_redemption_index()
+        self.donor_board = get_donor_board()
+        self.io = get_io()
         self.server_address = os.getenv("SERVER_ADDRESS")
         self.channel_id = int(os.getenv("CHANNEL_ID"))
         self.role_to_tag = os.getenv("ROLE_TO_TAG")
-        self.last_status = "offline"
-        self.check_server_status.start()
-
-    def get_current_pool_code(self):
+        self.status_service = get_status_service()
+        self.status_service.server_address = self.server_address or SERVER_ADDRESS
+        self.history = get_status_history()
+        self.status_service.on_publish(self.history.record)
+        self.monitor = StatusMonitor(service=self.status_service)
+        self.monitor.on_change(self.announce_status)
+        self.stream = ExarotonStream()
+        self.stream.on("status", self.on_stream_status)
+
+    async def cog_load(self):
+        await self.donations.load()
+        await self.ledger.load()
+        await self.history.load()
+        self.ledger.start()
+        self.monitor.start()
+        self.stream.start()
+
+    async def cog_unload(self):
+        await self.stream.stop()
+        await self.monitor.stop()
+        await self.ledger.stop()
+
+    async def get_current_pool_code(self):
         """Always returns the latest pool code from disk."""
-        return load_data(POOL_FILE).get("pool", "")
+        return (await self.io.read_json(POOL_FILE, {})).get("pool", "")
 
-    @tasks.loop(hours=CHECK_INTERVAL_HOURS)
-    async def check_server_status(self):
+    async def on_stream_status(self, info, source):
+        """Status pushed by the websocket."""
+        snapshot = StatusSnapshot.from_server_info(info, source=source)
+        await self.monitor.observe(snapshot, info.status)
+
+    async def announce_status(self, old_state, new_state, snapshot):
+        """Monitor listener: post when the server comes up or goes down."""
         channel = self.bot.get_channel(self.channel_id)
-    
-        headers = {"Authorization": f"Bearer {EXAROTON_TOKEN}"}
-        url = f"https://api.exaroton.com/v1/servers/{EXAROTON_SERVER_ID}"
+        if channel is None:
+            return
     
         try:
-            response = requests.get(url, headers=headers)
-            if response.status_code != 200:
-                print("[Exaroton API] Failed to fetch status.")
-                return
-    
-            data = response.json()
-            online = data.get("host", {}).get("online", False)
-            status_code = data.get("status")
-            players = data.get("players", {}).get("list", [])
-            motd = data.get("motd", {}).get("clean", [""])[0]
+            players = snapshot.players
+            motd = snapshot.motd
     
-            if status_code == 2 and self.last_status != "online":
+            if new_state == "online":
                 embed = discord.Embed(title="🟢 **Obscura Server is ONLINE!**", color=0x83fefd)
                 embed.add_field(name="MOTD", value=motd or "Server Online", inline=False)
                 embed.add_field(name="Java IP", value=self.server_address, inline=False)
@@ -164,127 +216,49 @@ class ExarotonCog(commands.Cog):
     
                 embed.set_footer(text="Summon the squad.")
                 await channel.send(content=self.role_to_tag, embed=embed)
-                self.last_status = "online"
     
                 # Check credits
-                if self.credit_balance <= 200:
+                balance = self.ledger.latest
+                if balance and balance.credits <= LOW_CREDIT_THRESHOLD:
                     try:
                         warn_embed = discord.Embed(
                             title="<:warning:1388586513000042516> Low Server Credits!",
-                            description=f"Current balance: **{self.credit_balance} credits**\nTop up soon to avoid downtime.",
+                            description=f"Current balance: **{balance.credits:.2f} credits**\nTop up soon to avoid downtime.",
                             color=0xffaa00
                         )
-                        hours_left = round(self.credit_balance / 10, 1)
-                        warn_embed.add_field(name="Burn Estimate", value=f"~{hours_left}h left @ 10GB RAM", inline=False)
+                        hours_left = self.ledger.hours_left()
+                        if hours_left is not None:
+                            burn_text = f"~{hours_left:.1f}h left @ {self.ledger.burn_rate():.2f} credits/h (measured)"
+                        else:
+                            burn_text = f"~{balance.credits / 10:.1f}h left @ 10GB RAM"
+                        warn_embed.add_field(name="Burn Estimate", value=burn_text, inline=False)
                         warn_embed.set_footer(text="Use !topup to donate credits.")
                         view = ServerControlView(self.credit_pool_code)
                         await channel.send(embed=warn_embed, view=view)
                     except Exception as e:
                         print(f"[<:warning:1388586513000042516> Burn Warning Error] {e}")
     
-            elif status_code != 2 and self.last_status != "offline":
+            elif new_state == "offline":
                 embed = discord.Embed(
                     title="🔴 **Minecraft Server is OFFLINE or SLEEPING**",
                     color=0xff5555
                 )
                 embed.set_footer(text="Someone needs to manually start it or join to wake it up.")
                 await channel.send(content=self.role_to_tag, embed=embed)
-                self.last_status = "offline"
     
         except Exception as e:
             print(f"[🔥 Server Status Error] {e}")
 
-    async def fetch_server_status(self):
-        server_address = self.server_address or SERVER_ADDRESS
-        motd = "Unknown MOTD"
-        players = []
-        online = False
-        status_text = "Offline"
-        max_players = "?"
-        source = "None"
-
-        # ─── 1. Try mcstatus with timeout ───
-        try:
-            def run_mcstatus():
-                return JavaServer.lookup(server_address).status()
-
-            loop = asyncio.get_running_loop()
-            status = await asyncio.wait_for(loop.run_in_executor(None, run_mcstatus), timeout=3)
-            if status:
-                motd = (
-                    status.description.get("text", "Unknown MOTD")
-                    if isinstance(status.description, dict)
-                    else str(status.description)
-                )
-                players = [p.name for p in status.players.sample] if status.players.sample else []
-                online = True
-                status_text = "Online"
-                max_players = status.players.max
-                print("[mcstatus SUCCESS]")
-                source = "mcstatus"
-        except asyncio.TimeoutError:
-            print("[mcstatus TIMEOUT]")
-        except Exception as e:
-            print(f"[mcstatus FAIL]: {e}")
-
-        # ─── 2. Fallback: Exaroton API ───
-        if not online and not players:
-            try:
-                headers = {"Authorization": f"Bearer {EXAROTON_TOKEN}"}
-                url = f"https://api.exaroton.com/v1/servers/{EXAROTON_SERVER_ID}"
-                response = requests.get(url, headers=headers, timeout=10)
-
-                if response.status_code == 200:
-                    data = response.json()
-                    ex_online = data.get("host", {}).get("online", False)
-                    ex_players = data.get("players", {}).get("list", [])
-                    ex_motd = data.get("motd", {}).get("clean", [])
-                    ex_max_players = data.get("players", {}).get("max", max_players)
-
-                    if ex_online or ex_players:  # Only overwrite if it's giving us something
-                        motd = ex_motd[0] if ex_motd else motd
-                        online = ex_online
-                        players = ex_players or players
-                        status_text = "Online" if online else "Offline"
-                        max_players = ex_max_players
-                        print("[API fallback SUCCESS]")
-                        source = "API"
-                    else:
-                        print("[API fallback gave no new info]")
-            except Exception as e:
-                print(f"[Exaroton API FAIL]: {e}")
-
-        # ─── 3. Fallback: Scraper ───
-        if not online and not players:
-            try:
-                scraped = await get_live_status_playwright()
-                print("SCRAPER RESULT:", scraped)
-
-                if "error" not in scraped:
-                    scraped_status = scraped.get("status", "").lower()
-                    scraped_players = scraped.get("players", [])
-                    if "online" in scraped_status or scraped_players:
-                        motd = scraped.get("motd", motd)
-                        status_text = scraped.get("status", status_text)
-                        players = scraped_players or players
-                        online = "online" in scraped_status
-                        print("[SCRAPER fallback SUCCESS]")
-                        source = "Scraper"
-                    else:
-                        print("[SCRAPER gave no new info]")
-            except Exception as e:
-                print(f"[SCRAPER FAIL]: {e}")
-
-
-        status_text = status_text or "Unknown"
-        print(f"[Final Status Source]: {source} | Players: {players}")
-        return motd.strip(), players, online, status_text, max_players, source
+    async def fetch_server_status(self, force=False):
+        """Read the shared status snapshot (probing only when it's stale)."""
+        snapshot = await self.status_service.get(force=force)
+        return snapshot.as_tuple()
 
     @commands.command(name="reloadpool")
     async def reload_pool(self, ctx):
         """Reload credit pool code from disk into memory."""
         try:
-            file_data = load_json(POOL_FILE)
+            file_data = await self.io.read_json(POOL_FILE, {})
             self.credit_pool_code = file_data.get("pool")
             await ctx.send(f"<:checkbox:1388586497984430160> Reloaded pool code into memory: `{self.credit_pool_code}`")
         except Exception as e:
@@ -299,31 +273,9 @@ class ExarotonCog(commands.Cog):
 
         await ctx.typing()
 
-        headers = {"Authorization": f"Bearer {EXAROTON_TOKEN}"}
-        url = f"https://api.exaroton.com/v1/servers/{EXAROTON_SERVER_ID}"
+        await self.ledger.refresh()
 
-        api_data = {}
-        try:
-            response = requests.get(url, headers=headers, timeout=10)
-            if response.status_code == 200:
-                api_data = response.json()
-                self.credit_balance = float(requests.get("https://api.exaroton.com/v1/credits", headers=headers).json().get("credits", 0.0))
-        except Exception as e:
-            print(f"[API Error] {e}")
-
-        motd = api_data.get("motd", {}).get("clean", ["Unknown"])[0]
-        players = api_data.get("players", {}).get("list", [])
-        online = api_data.get("host", {}).get("online", False)
-        status = "Online" if online else "Offline"
-
-        # Fallback to scraper
-        if not players or not online:
-            scraped = await get_live_status_playwright()
-            if "error" not in scraped:
-                motd = scraped.get("motd", motd)
-                status = scraped.get("status", status)
-                players = scraped.get("players", players)
-                online = "online" in status.lower()
+        motd, players, online, status, _, source = await self.fetch_server_status(force=True)
 
         embed = discord.Embed(
             title="🔄 Refreshed Server Status",
@@ -332,7 +284,7 @@ class ExarotonCog(commands.Cog):
         )
         embed.add_field(name="Status", value=f"🟢 {status}" if online else f"🔴 {status}", inline=True)
         embed.add_field(name="Players Online", value=", ".join(players) if players else "Nobody online.", inline=False)
-        embed.set_footer(text="Live refresh via API and scraper fallback")
+        embed.set_footer(text=f"Live refresh via {source}")
 
         class RefreshControl(discord.ui.View):
             def __init__(self):
@@ -349,57 +301,44 @@ class ExarotonCog(commands.Cog):
         user_id = str(user.id)
 
         # Update credit balance (you can customize whether this affects server logic or is just for stats)
-        self.credit_balance = float(amount) if user == ctx.author else self.credit_balance
+        if user == ctx.author:
+            await self.ledger.record(amount, source="manual")
 
         # Update personal donation record
-        donations = load_data("data/exaroton_donations.json")
-        donations[user_id] = donations.get(user_id, 0) + amount
-        save_data("data/exaroton_donations.json", donations)
+        await self.donations.grant(user_id, amount, by=ctx.author.id)
 
         await ctx.send(f"<:checkbox:1388586497984430160> Set **{amount} credits** for {user.mention}.")
 
         # Optionally: show leaderboard position
-        leaderboard = sorted(donations.items(), key=lambda x: x[1], reverse=True)
-        position = [uid for uid, _ in leaderboard].index(user_id) + 1
+        position, _ = await self.donor_board.rank(user_id)
         await ctx.send(f"🏆 {user.display_name} is now **#{position}** on the donor leaderboard!")
 
     @commands.command(name="statusapi")
     async def statusapi(self, ctx):
-        headers = {"Authorization": f"Bearer {EXAROTON_TOKEN}"}
-        url = f"https://api.exaroton.com/v1/servers/{EXAROTON_SERVER_ID}"
-
         # ─── Exaroton API Check ───
         try:
-            response = requests.get(url, headers=headers, timeout=10)
-            if response.status_code != 200:
+            info = await get_client().get_server(timeout=10)
+        except ExarotonError as e:
+            if e.status:
                 await ctx.send("❌ Failed to fetch server status from Exaroton.")
-                return
-
-            data = response.json()
-        except Exception as e:
-            await ctx.send(f"❌ API call failed: {e}")
+            else:
+                await ctx.send(f"❌ API call failed: {e}")
             return
 
         # ─── Extract API Data ───
-        motd = data.get("motd", {}).get("clean", ["Unknown MOTD"])[0]
-        online = data.get("host", {}).get("online", False)
-        players = data.get("players", {}).get("list", [])
+        motd = info.motd or "Unknown MOTD"
+        online = info.host_online
+        players = info.players
 
         # ─── mcstatus Patch if API Sucks ───
         if not online:
             try:
-                server = JavaServer.lookup(SERVER_ADDRESS)
-                status = server.status()
-                if status:
-                    online = True
-                    players = [p.name for p in status.players.sample] if status.players.sample else players
-                    motd = (
-                        status.description.get("text", motd)
-                        if isinstance(status.description, dict)
-                        else str(status.description)
-                    )
-                    print("[!statusapi patched via mcstatus]")
-            except Exception as e:
+                status = await get_probe().status(SERVER_ADDRESS)
+                online = True
+                players = sample_names(status) or players
+                motd = describe_motd(status, motd)
+                print("[!statusapi patched via mcstatus]")
+            except ProbeError as e:
                 print(f"[!statusapi mcstatus FAIL]: {e}")
 
         # ─── Embed Response ───
@@ -420,17 +359,11 @@ class ExarotonCog(commands.Cog):
         )
 
         # ─── Uptime Footer ───
-        started = data.get("timeStarted")
-        if started:
-            try:
-                dt = datetime.fromisoformat(started.replace("Z", "+00:00"))
-                uptime = datetime.utcnow() - dt
-                hours, rem = divmod(int(uptime.total_seconds()), 3600)
-                minutes, _ = divmod(rem, 60)
-                embed.set_footer(text=f"Uptime: {hours}h {minutes}m • Pulled via API + mcstatus")
-            except Exception as e:
-                print(f"[Uptime parse FAIL]: {e}")
-                embed.set_footer(text="Pulled via API + mcstatus")
+        uptime = info.uptime()
+        if uptime:
+            hours, rem = divmod(int(uptime.total_seconds()), 3600)
+            minutes, _ = divmod(rem, 60)
+            embed.set_footer(text=f"Uptime: {hours}h {minutes}m • Pulled via API + mcstatus")
         else:
             embed.set_footer(text="Pulled via API + mcstatus")
 
@@ -443,18 +376,8 @@ class ExarotonCog(commands.Cog):
             return
 
         await ctx.typing()
-        motd, players, online, status_text, max_players, source = await self.fetch_server_status()
-
-        embed = discord.Embed(
-            title="Obscura Server Status",
-            description=f"**MOTD:** `{motd}`",
-            color=discord.Color.green() if online else discord.Color.red()
-        )
-        embed.add_field(name="Status", value=f"🟢 {status_text}" if online else f"🔴 {status_text}", inline=True)
-        embed.add_field(name="Players", value=", ".join(players) if players else "Nobody online.", inline=False)
-        embed.set_footer(text=f"Pulled via {source} {'(fallback)' if source != 'mcstatus' else '(primary)'}")
-
-        await ctx.send(embed=embed)
+        snapshot = await self.status_service.get()
+        await ctx.send(embed=build_status_embed(snapshot))
 
 
     @commands.command(name="dboard", aliases=["donors"])
@@ -476,19 +399,18 @@ class ExarotonCog(commands.Cog):
 
         last_donorboard_time = now
 
-        donations = load_data("data/exaroton_donations.json")
-        if not donations:
+        leaderboard = await self.donor_board.top(top)
+        if not leaderboard:
             await ctx.send("📭 No donation data yet!")
             return
 
-        leaderboard = sorted(donations.items(), key=lambda x: x[1], reverse=True)
         embed = discord.Embed(
             title="🏆 Top Server Donors",
             description="Most generous credit contributors ❤️",
             color=0x83fefd
         )
 
-        for i, (user_id, total) in enumerate(leaderboard[:top], start=1):
+        for i, (user_id, total) in enumerate(leaderboard, start=1):
             user = self.bot.get_user(int(user_id)) or f"<@{user_id}>"
             name = user.display_name if hasattr(user, 'display_name') else str(user)
             embed.add_field(
@@ -500,25 +422,44 @@ class ExarotonCog(commands.Cog):
         if is_dev:
             embed.set_footer(text="Dev bypass (GUY)")
 
-        view = DonateButton(self.get_current_pool_code())
+        view = DonateButton(await self.get_current_pool_code())
         await ctx.send(embed=embed, view=view)
 
+    @commands.command(name="donorrank", aliases=["dorank", "myrank"])
+    async def donorrank(self, ctx, member: discord.Member = None):
+        """Show where a donor sits on the leaderboard, with the donors just above and below."""
+        member = member or ctx.author
+        placed = await self.donor_board.rank(member.id)
+        if placed is None:
+            await ctx.send(f"📭 {member.display_name} has no recorded donations.")
+            return
+
+        rank, total = placed
+        embed = discord.Embed(
+            title=f"🏆 {member.display_name} is #{rank} of {len(self.donor_board)}",
+            description=f"💰 {total:.2f} credits donated",
+            color=0x83fefd
+        )
+        lines = []
+        for place, user_id, amount in await self.donor_board.neighbours(member.id):
+            marker = "➡️ " if user_id == str(member.id) else ""
+            lines.append(f"{marker}**{place}.** <@{user_id}> — {amount:.2f}")
+        embed.add_field(name="Nearby", value="\n".join(lines), inline=False)
+        await ctx.send(embed=embed)
+
     @commands.command(name="credits", aliases=["excredits", "bal"])
     async def credits(self, ctx):
-        headers = {"Authorization": f"Bearer {EXAROTON_TOKEN}"}
-        response = requests.get("https://api.exaroton.com/v1/credits", headers=headers)
-
-        if response.status_code != 200:
+        sample = await self.ledger.get()
+        if sample is None:
             await ctx.send("❌ Failed to fetch credit balance.")
             return
 
-        credits = response.json().get("credits", 0.0)
         embed = discord.Embed(
             title="💳 Server Credit Balance",
-            description=f"You currently have **{credits:.2f}** Obscura credits remaining.",
+            description=f"You currently have **{sample.credits:.2f}** Obscura credits remaining.",
             color=0x3d5e8e
         )
-        embed.set_footer(text="Keep it running <:beebo:1383282292478312519>")
+        embed.set_footer(text=f"Sampled {format_age(sample.age)} • Keep it running <:beebo:1383282292478312519>")
         await ctx.send(embed=embed)
 
 
@@ -533,10 +474,7 @@ class ExarotonCog(commands.Cog):
                 user_id = int(user)
                 target = ctx.guild.get_member(user_id) or await self.bot.fetch_user(user_id)
 
-            donor_data = load_data(DONOR_FILE)
-            user_id_str = str(target.id)
-            donor_data[user_id_str] = donor_data.get(user_id_str, 0) + amount
-            save_data(DONOR_FILE, donor_data)
+            await self.donations.grant(target.id, amount, by=ctx.author.id)
 
             await ctx.send(
                 f"<:Premium:1388586503092961482> Added **{amount:.2f}** credits to **{target.display_name}**'s donation total."
@@ -553,25 +491,37 @@ class ExarotonCog(commands.Cog):
             await ctx.send("<:warning:1388586513000042516> Invalid input. Make sure you're naming a valid user and the amount is a number.")
 
     @commands.command()
-    async def burn(self, ctx, hours: float = 1, ram: int = 10):
-        rate_per_gb_hour = 1.0  # Exaroton's current rate
-        session_burn = round(rate_per_gb_hour * ram * hours, 2)
-        daily_burn = round(rate_per_gb_hour * ram * 24, 2)
+    async def burn(self, ctx, hours: float = 1, ram: int = None):
+        rate_per_gb_hour = 1.0  # Exaroton's list rate, used when we can't measure
+
+        # Measured rate from the ledger unless a RAM size was asked about
+        measured = self.ledger.burn_rate() if ram is None else None
+        if measured:
+            rate = measured
+            basis = f"Measured burn: **{rate:.2f} credits/h**..."
+        else:
+            ram = 10 if ram is None else ram
+            rate = rate_per_gb_hour * ram
+            basis = f"Using **{ram}GB RAM**..."
+
+        session_burn = round(rate * hours, 2)
+        daily_burn = round(rate * 24, 2)
         weekly_burn = round(daily_burn * 7, 2)
 
         # Estimate runtime left based on current credit balance
-        if ram > 0:
-            response = requests.get("https://api.exaroton.com/v1/credits", headers={"Authorization": f"Bearer {EXAROTON_TOKEN}"})
-            balance = response.json().get("credits", 0.0)
-            hours_left = balance / (rate_per_gb_hour * ram)
+        sample = await self.ledger.get()
+        if rate > 0 and sample is not None:
+            hours_left = sample.credits / rate
             days_left = hours_left / 24
             lifespan = f"Estimated uptime left: **{hours_left:.1f}h** (~{days_left:.1f} days)"
+        elif sample is None:
+            lifespan = "<:warning:1388586513000042516> Credit balance unavailable."
         else:
             lifespan = "<:warning:1388586513000042516> Invalid RAM config for burn estimate."
 
         embed = discord.Embed(
             title="🔥 Obscura Burn Estimate",
-            description=f"Using **{ram}GB RAM**...",
+            description=basis,
             color=0x83fefd
         )
         embed.add_field(name=f"Per {hours}h session", value=f"💸 **{session_burn} credits**", inline=False)
@@ -584,20 +534,13 @@ class ExarotonCog(commands.Cog):
 
     @commands.command(name="burnrate", aliases=["burnstats", "projected"])
     async def burnrate(self, ctx):
-        headers = {"Authorization": f"Bearer {EXAROTON_TOKEN}"}
-        response = requests.get(f"https://api.exaroton.com/v1/servers/{EXAROTON_SERVER_ID}", headers=headers)
-
-        if response.status_code != 200:
-            await ctx.send("<:warning:1388586513000042516> Couldn't fetch server details.")
-            return
-
-        server = response.json()
-        if server.get("creditsPerHour") is None:
-            await ctx.send("<:warning:1388586513000042516> Server burn rate data is unavailable.")
+        sample = await self.ledger.get()
+        rate = self.ledger.burn_rate()
+        if sample is None or rate is None:
+            await ctx.send("<:warning:1388586513000042516> Server burn rate data is unavailable. The ledger needs a few samples first.")
             return
 
-        rate = server["creditsPerHour"]
-        balance = server.get("credits", 0.0)
+        balance = sample.credits
         projected_hours = balance / rate if rate > 0 else 0
 
         embed = discord.Embed(
@@ -609,7 +552,7 @@ class ExarotonCog(commands.Cog):
                 f"• Estimated Time Left: **{projected_hours:.2f} hours**"
             )
         )
-        embed.set_footer(text="Based on current usage pattern")
+        embed.set_footer(text=f"Measured from credit samples • balance sampled {format_age(sample.age)}")
         await ctx.send(embed=embed)
 
     @commands.command(name="setdonation", aliases=["setdono", "forceadd"])
@@ -622,13 +565,8 @@ class ExarotonCog(commands.Cog):
                 user_id = int(user)
                 target = ctx.guild.get_member(user_id) or await self.bot.fetch_user(user_id)
     
-            donor_data = load_data(DONOR_FILE)
-            donor_data[str(target.id)] = amount
-            save_data(DONOR_FILE, donor_data)
-
-            # Safe rank calculation
-            sorted_donors = sorted(donor_data.items(), key=lambda x: x[1], reverse=True)
-            rank = next((i + 1 for i, (uid, amt) in enumerate(sorted_donors) if uid == str(target.id)), None)
+            await self.donations.set(target.id, amount, by=ctx.author.id)
+            rank, _ = await self.donor_board.rank(target.id) or (None, None)
 
             await ctx.send(f"✏️ Set **{target.display_name}**'s donation total to **{amount:.2f} credits**.")
 
@@ -658,18 +596,11 @@ class ExarotonCog(commands.Cog):
                 target = ctx.guild.get_member(user_id) or await self.bot.fetch_user(user_id)
 
             async def confirmed(interaction, user_id, display_name):
-                donor_data = load_data(DONOR_FILE)
-                user_key = str(user_id)
-
-                if user_key in donor_data:
-                    # 🔥 Remove donor record
-                    del donor_data[user_key]
-                    save_data(DONOR_FILE, donor_data)
-
+                # 🔥 Remove donor record and 📊 track mod nuke count, as one ledger event
+                if await self.donations.nuke(user_id, by=interaction.user.id) is not None:
                     # 📎 Log the nuke
                     timestamp = datetime.utcnow().isoformat()
-                    with open("data/donation_nukes.log", "a", encoding="utf-8") as f:
-                        f.write(f"{timestamp} - Nuked: {display_name} (ID: {user_id}) by {interaction.user.id}\n")
+                    await self.io.append_line(NUKE_LOG, f"{timestamp} - Nuked: {display_name} (ID: {user_id}) by {interaction.user.id}")
 
                     # 🗼 Remove donor role if exists
                     donor_role = interaction.guild.get_role(DONOR_ROLE_ID)
@@ -680,17 +611,6 @@ class ExarotonCog(commands.Cog):
 
                     await interaction.response.send_message(f"💥 Nuked **{display_name}** from donor records.")
 
-                    # 📊 Track mod nuke count
-                    nuke_stats = load_data("data/nuke_counts.json")
-                    mod_id = str(interaction.user.id)
-                    monthly_key = datetime.utcnow().strftime("%Y-%m")
-                    if mod_id not in nuke_stats:
-                        nuke_stats[mod_id] = {}
-                    if monthly_key not in nuke_stats[mod_id]:
-                        nuke_stats[mod_id][monthly_key] = 0
-                    nuke_stats[mod_id][monthly_key] += 1
-                    save_data("data/nuke_counts.json", nuke_stats)
-
                 else:
                     await interaction.response.send_message("❌ That user has no recorded donations.")
 
@@ -704,28 +624,26 @@ class ExarotonCog(commands.Cog):
 
 
     @commands.command(name="nukeboard")
-    async def nukeboard(self, ctx, month: str = None):
+    async def nukeboard(self, ctx, period: str = None):
+        """Top nukers for a month (default: this one), a year, the last N months (`3m`) or `all`."""
         try:
-            nuke_stats = load_data("data/nuke_counts.json")
-            month_key = month or datetime.utcnow().strftime("%Y-%m")
-            leaderboard = []
-
-            for mod_id, months in nuke_stats.items():
-                count = months.get(month_key, 0)
-                if count > 0:
-                    leaderboard.append((mod_id, count))
+            try:
+                keys, label = parse_period(period)
+            except ValueError as e:
+                await ctx.send(f"<:warning:1388586513000042516> {e}")
+                return
 
+            leaderboard = await top_nukers(self.store, keys, k=5)
             if not leaderboard:
-                await ctx.send(f"💪 No nukes recorded for {month_key}.")
+                await ctx.send(f"💪 No nukes recorded for {label}.")
                 return
 
-            leaderboard.sort(key=lambda x: x[1], reverse=True)
             embed = discord.Embed(
-                title=f"💥 Top Nukers - {month_key}",
+                title=f"💥 Top Nukers - {label}",
                 color=discord.Color.red()
             )
 
-            for i, (mod_id, count) in enumerate(leaderboard[:5], start=1):
+            for i, (mod_id, count) in enumerate(leaderboard, start=1):
                 user = self.bot.get_user(int(mod_id)) or f"<@{mod_id}>"
                 name = user.display_name if hasattr(user, 'display_name') else str(user)
                 embed.add_field(name=f"{i}. {name}", value=f"{count} nukes", inline=False)
@@ -746,29 +664,10 @@ class ExarotonCog(commands.Cog):
                 target = ctx.guild.get_member(user_id) or await self.bot.fetch_user(user_id)
 
             async def confirmed(interaction, user_id, display_name):
-                donor_data = load_data(DONOR_FILE)
-                user_key = str(user_id)
-
-                if user_key in donor_data:
-                    # 🔥 Remove donor record
-                    previous_amount = donor_data[user_key]
-                    del donor_data[user_key]
-                    save_data(DONOR_FILE, donor_data)
-
-                    # 📅 Backup to graveyard
-                    graveyard = load_data("data/donation_graveyard.json")
-                    graveyard[user_key] = previous_amount
-                    save_data("data/donation_graveyard.json", graveyard)
-
-                    # 📉 Increment nuke count
-                    nuke_tracker = load_data("data/nuke_counts.json")
-                    mod_id = str(interaction.user.id)
-                    nuke_tracker[mod_id] = nuke_tracker.get(mod_id, 0) + 1
-                    save_data("data/nuke_counts.json", nuke_tracker)
-
+                # 🔥 Remove donor record, 📅 back it up to the graveyard and 📉 count the nuke, as one ledger event
+                if await self.donations.nuke(user_id, by=interaction.user.id) is not None:
                     # 📎 Log the nuke
-                    with open("data/donation_nukes.log", "a", encoding="utf-8") as f:
-                        f.write(f"{datetime.utcnow().isoformat()} - Nuked: {display_name} (ID: {user_id}) by {interaction.user}\n")
+                    await self.io.append_line(NUKE_LOG, f"{datetime.utcnow().isoformat()} - Nuked: {display_name} (ID: {user_id}) by {interaction.user}")
 
                     # 🗼 Remove donor role if exists
                     DONOR_ROLE_NAME = "💎 Donor"
@@ -801,11 +700,7 @@ class ExarotonCog(commands.Cog):
             target = ctx.guild.get_member(user_id) or await self.bot.fetch_user(user_id)
 
         async def confirmed(interaction, user_id):
-            donor_data = load_data(DONOR_FILE)
-            user_key = str(user_id)
-            if user_key in donor_data:
-                del donor_data[user_key]
-                save_data(DONOR_FILE, donor_data)
+            if await self.donations.nuke(user_id, by=interaction.user.id) is not None:
                 await interaction.response.send_message(f"💥 Nuked **{target.display_name}** from donor records.")
             else:
                 await interaction.response.send_message("❌ That user has no recorded donations.")
@@ -827,35 +722,19 @@ class ExarotonCog(commands.Cog):
                 user_id = int(user)
                 target = ctx.guild.get_member(user_id) or await self.bot.fetch_user(user_id)
 
-            user_id_str = str(target.id)
-            graveyard = load_data("data/donation_graveyard.json")
-            if user_id_str not in graveyard:
+            # 💾 Restore donation out of the graveyard and 🔄 take the nuke back from whoever made it
+            restored_amount = await self.donations.forgive(target.id, by=ctx.author.id)
+            if restored_amount is None:
                 await ctx.send("👻 No previous donation data found for this user.")
                 return
 
-            # 💾 Restore donation
-            donor_data = load_data(DONOR_FILE)
-            restored_amount = graveyard[user_id_str]
-            donor_data[user_id_str] = restored_amount
-            save_data(DONOR_FILE, donor_data)
-            del graveyard[user_id_str]
-            save_data("data/donation_graveyard.json", graveyard)
-
-            # 🔄 Decrement mod nuke count
-            nuke_tracker = load_data("data/nuke_counts.json")
-            mod_id = str(ctx.author.id)
-            if mod_id in nuke_tracker:
-                nuke_tracker[mod_id] = max(0, nuke_tracker[mod_id] - 1)
-                save_data("data/nuke_counts.json", nuke_tracker)
-
             # 🎖️ Restore donor role if present in guild
             donor_role = ctx.guild.get_role(DONOR_ROLE_ID)
             if donor_role and isinstance(target, discord.Member):
                 await target.add_roles(donor_role, reason="Donation forgiven.")
 
             # 📜 Log the forgiveness
-            with open("data/donation_forgiveness.log", "a", encoding="utf-8") as f:
-                f.write(f"{datetime.utcnow().isoformat()} - Forgiven: {target.display_name} (ID: {target.id}) by {ctx.author}\n")
+            await self.io.append_line(FORGIVENESS_LOG, f"{datetime.utcnow().isoformat()} - Forgiven: {target.display_name} (ID: {target.id}) by {ctx.author}")
 
             modlog = self.bot.get_channel(MOD_LOG_CHANNEL_ID)
             if modlog:
@@ -874,34 +753,20 @@ class ExarotonCog(commands.Cog):
         except Exception as e:
             await ctx.send(f"<:warning:1388586513000042516> Could not forgive: {e}")
 
+    @commands.command(name="rebuilddonos", aliases=["replaydonos"])
+    @commands.is_owner()
+    async def rebuild_donations(self, ctx):
+        """Replay the donation event log into fresh totals, graveyard and nuke counts."""
+        try:
+            count = await self.donations.rebuild()
+            await ctx.send(f"<:checkbox:1388586497984430160> Replayed **{count}** donation events.")
+        except Exception as e:
+            await ctx.send(f"<:warning:1388586513000042516> Rebuild failed: {e}")
+
     @commands.command(name="redemptionboard", aliases=["redemption", "forgiven", "redboard"])
     async def redemption_board(self, ctx, top: int = 5):
-        log_file = "data/donation_forgiveness.log"
-        if not os.path.exists(log_file):
-            await ctx.send("📭 No redemption data yet!")
-            return
-
-        from collections import Counter
-        user_counter = Counter()
-        forgiver_counter = Counter()
-        last_forgiver = {}
-
-        with open(log_file, "r", encoding="utf-8") as f:
-            for line in f:
-                if "Forgave:" in line:
-                    try:
-                        parts = line.strip().split(" - ")
-                        forgave_part = parts[1].split("Forgave: ")[1]
-                        user_info, _, forgiver = forgave_part.partition(" by ")
-                        display_name, user_id_part = user_info.strip().rsplit(" ", 1)
-                        user_id = user_id_part.strip("()ID:")
-                        user_counter[user_id] += 1
-                        forgiver_counter[forgiver.strip()] += 1
-                        last_forgiver[user_id] = forgiver.strip()
-                    except Exception:
-                        continue
-
-        if not user_counter:
+        most_forgiven, top_forgivers, last_forgiver = await self.redemptions.board(top)
+        if not most_forgiven:
             await ctx.send("📭 No one has been forgiven yet.")
             return
 
@@ -915,7 +780,7 @@ class ExarotonCog(commands.Cog):
             name="👑 Most Forgiven Users",
             value="\n".join([
                 f"**{i+1}.** <@{uid}> — {count}x (by {last_forgiver.get(uid, 'Unknown')})"
-                for i, (uid, count) in enumerate(user_counter.most_common(top))
+                for i, (uid, count) in enumerate(most_forgiven)
             ]) or "None yet.",
             inline=False
         )
@@ -924,7 +789,7 @@ class ExarotonCog(commands.Cog):
             name="🧙 Top Forgivers",
             value="\n".join([
                 f"**{i+1}.** {mod} — {count}x"
-                for i, (mod, count) in enumerate(forgiver_counter.most_common(top))
+                for i, (mod, count) in enumerate(top_forgivers)
             ]) or "None yet.",
             inline=False
         )
@@ -938,12 +803,13 @@ class ExarotonCog(commands.Cog):
 
         public_cmds = [
             "`!dboard` — View the top donors leaderboard",
+            "`!donorrank [@user]` — Your (or someone's) donor rank and the donors around it",
             "`!credits` — Check remaining server credits",
             "`!burn` — Estimate credit burn time for server usage",
             "`!burnrate` — Show real-time burn rate and credit lifespan",
             "`!forgive @user` — Resurrect a nuked donation (if any exists)",
             "`!nukeboard` — Leaderboard of who nuked the most donors",
-            "`!nukeboard --month` — Top nukers this month",
+            "`!nukeboard [2025-03 | 2025 | 3m | year | all]` — Top nukers for a month, year, recent months or all time",
             "`!nukeboard --user <mod>` — Show how many nukes a specific mod has triggered"
         ]
 
@@ -953,7 +819,8 @@ class ExarotonCog(commands.Cog):
             "`!resetdono @user` — Begin soft nuke (confirmation required)",
             "`!cleardono @user --confirm` — Instantly remove and log donation (no mercy)",
             "`!forgive @user` — Restore donation from graveyard, reinstate donor role",
-            "`!nukeboard --user <mod>` — Shows how many nukes a mod has issued"
+            "`!nukeboard --user <mod>` — Shows how many nukes a mod has issued",
+            "`!rebuilddonos` — Recompute totals, graveyard and nuke counts from the donation event log"
         ]
 
         embed = discord.Embed(
@@ -983,9 +850,7 @@ class ExarotonCog(commands.Cog):
         # await ctx.send(f"🔍 Saving to: `{POOL_FILE}` with code `{pool_code_clean}`")
 
         try:
-            os.makedirs(os.path.dirname(POOL_FILE), exist_ok=True)
-            with open(POOL_FILE, "w") as f:
-                json.dump({"pool": pool_code_clean}, f, indent=4)
+            await self.io.write_json(POOL_FILE, {"pool": pool_code_clean})
         except Exception as e:
             await ctx.send(f"❌ Save failed: {e}")
             return
@@ -995,13 +860,13 @@ class ExarotonCog(commands.Cog):
 
     @commands.command()
     async def debugpool(self, ctx):
-        pool_data = load_json(POOL_FILE)
+        pool_data = await self.io.read_json(POOL_FILE, {})
         await ctx.send(f"Debug pool file contents: `{pool_data}`")
 
     @commands.command()
     async def topup(self, ctx):
         user_id = ctx.author.id
-        code = self.get_current_pool_code()
+        code = await self.get_current_pool_code()
 
         if not code:
             await ctx.send("❌ No credit pool link set.")
@@ -1027,34 +892,20 @@ class ExarotonCog(commands.Cog):
 
         await ctx.typing()
 
-        headers = {"Authorization": f"Bearer {EXAROTON_TOKEN}"}
-        url = f"https://api.exaroton.com/v1/servers/{EXAROTON_SERVER_ID}"
-
         try:
-            response = requests.get(url, headers=headers, timeout=10)
-            if response.status_code != 200:
-                raise Exception(f"API status {response.status_code}")
-            data = response.json()
-        except Exception as e:
+            info = await get_client().get_server(timeout=10)
+        except ExarotonError as e:
             print(f"[Uptime Fetch Error]: {e}")
             await ctx.send("❌ Could not retrieve server uptime.")
             return
 
-        time_started = data.get("timeStarted")
-        if not time_started:
+        uptime = info.uptime()
+        if not uptime:
             await ctx.send("<:warning:1388586513000042516> Server is not online or uptime not available.")
             return
 
-        try:
-            started_dt = datetime.fromisoformat(time_started.replace("Z", "+00:00"))
-            now = datetime.utcnow()
-            uptime = now - started_dt
-            hours, remainder = divmod(int(uptime.total_seconds()), 3600)
-            minutes, _ = divmod(remainder, 60)
-        except Exception as e:
-            print(f"[Uptime Parsing Error]: {e}")
-            await ctx.send("<:warning:1388586513000042516> Something went wrong calculating uptime.")
-            return
+        hours, remainder = divmod(int(uptime.total_seconds()), 3600)
+        minutes, _ = divmod(remainder, 60)
 
         await ctx.send(f"🕓 **Obscura** has been online for **{hours}h {minutes}m**.")
 
@@ -1073,15 +924,30 @@ class ExarotonCog(commands.Cog):
             return
 
         await ctx.typing()
-        motd, players, online, status_text, max_players, source = await self.fetch_server_status()
-
-        embed = discord.Embed(
-            title="Online Players",
-            description="Nobody online." if not players else ", ".join(players),
-            color=discord.Color.green() if online else discord.Color.red()
-        )
-        embed.add_field(name="MOTD", value=f"`{motd}`", inline=False)
-        embed.set_footer(text=f"Pulled via {source} {'(fallback)' if source != 'mcstatus' else '(primary)'}")
+        snapshot = await self.status_service.get()
+        await ctx.send(embed=build_players_embed(snapshot))
+
+    @commands.command(name="statushistory", aliases=["uptimestats", "history"])
+    async def status_history(self, ctx):
+        """Uptime, average players and outages over the rolling windows."""
+        embed = discord.Embed(title="📈 Obscura Status History", color=0x83fefd)
+        for label, seconds in WINDOWS:
+            stats = self.history.summary(seconds)
+            if stats["uptime"] is None:
+                embed.add_field(name=f"Last {label}", value="No data yet.", inline=False)
+                continue
+            covered = stats["observed"] / 3600
+            embed.add_field(
+                name=f"Last {label}",
+                value=(
+                    f"🟢 Uptime: **{stats['uptime']:.1f}%**\n"
+                    f"👥 Avg players: **{stats['avg_players']:.2f}**\n"
+                    f"🔴 Outages: **{stats['outages']}**\n"
+                    f"_{covered:.1f}h observed • {stats['samples']} checks_"
+                ),
+                inline=True
+            )
+        embed.set_footer(text=f"{len(self.history.rows)} recent checks in memory")
         await ctx.send(embed=embed)
 
 
@@ -1092,7 +958,7 @@ class ExarotonCog(commands.Cog):
             await ctx.send("🚫 You don't have permission to access the donation panel.")
             return
 
-        code = self.get_current_pool_code()
+        code = await self.get_current_pool_code()
         if not code:
             await ctx.send("❌ No credit pool link set.")
             return
@@ -1140,7 +1006,7 @@ class ExarotonCog(commands.Cog):
 
         embed.add_field(
             name="<:noentry:1388586500756865126> Status Pings",
-            value="Server alerts for online/offline run every 3 hours.\nNo command needed.",
+            value="Server alerts for online/offline are pushed live from Exaroton.\nNo command needed.",
             inline=False
         )
 
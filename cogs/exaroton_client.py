@@ -0,0 +1,245 @@
+# cogs/exaroton_client.py
+
+import os
+import asyncio
+import datetime
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import aiohttp
+
+from .resilience import call_upstream, UpstreamError, RETRY_STATUSES, IDEMPOTENT_METHODS
+
+# ─── Configuration ────────────────────────────────────────────────
+API_BASE          = os.getenv("EXAROTON_API_BASE", "https://api.exaroton.com/v1")
+DEFAULT_TIMEOUT   = 10   # seconds per call unless overridden
+POOL_SIZE         = 10   # max open connections to the API
+KEEPALIVE_SECONDS = 60   # how long idle connections stay warm
+
+# Server status codes as reported by the exaroton API
+STATUS_OFFLINE    = 0
+STATUS_ONLINE     = 1
+STATUS_STARTING   = 2
+STATUS_STOPPING   = 3
+STATUS_RESTARTING = 4
+STATUS_SAVING     = 5
+STATUS_LOADING    = 6
+STATUS_CRASHED    = 7
+STATUS_PENDING    = 8
+STATUS_PREPARING  = 10
+
+STATUS_TEXT = {
+    STATUS_OFFLINE: "Offline",
+    STATUS_ONLINE: "Online",
+    STATUS_STARTING: "Starting",
+    STATUS_STOPPING: "Stopping",
+    STATUS_RESTARTING: "Restarting",
+    STATUS_SAVING: "Saving",
+    STATUS_LOADING: "Loading",
+    STATUS_CRASHED: "Crashed",
+    STATUS_PENDING: "Pending",
+    STATUS_PREPARING: "Preparing",
+}
+
+
+class ExarotonError(Exception):
+    """Raised when the exaroton API can't be reached or returns an error."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+def _parse_time(value):
+    if not value:
+        return None
+    try:
+        if isinstance(value, (int, float)):
+            return datetime.datetime.fromtimestamp(value, tz=datetime.timezone.utc)
+        return datetime.datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except (ValueError, OverflowError):
+        return None
+
+
+@dataclass
+class ServerInfo:
+    id: str
+    name: str
+    address: str
+    motd: str
+    status: int
+    host_online: bool
+    players: List[str] = field(default_factory=list)
+    player_count: int = 0
+    max_players: Optional[int] = None
+    started_at: Optional[datetime.datetime] = None
+    host_uptime: int = 0
+    credits: Optional[float] = None
+    credits_per_hour: Optional[float] = None
+    raw: dict = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_payload(cls, data: dict) -> "ServerInfo":
+        players = data.get("players") or {}
+        host = data.get("host") or {}
+        motd = data.get("motd") or ""
+        if isinstance(motd, dict):
+            clean = motd.get("clean") or [""]
+            motd = clean[0] if isinstance(clean, list) else str(clean)
+
+        rate = data.get("creditsPerHour")
+        if rate is None:
+            rate = (data.get("settings") or {}).get("creditPerHour")
+
+        return cls(
+            id=str(data.get("id", "")),
+            name=data.get("name", ""),
+            address=data.get("address", ""),
+            motd=motd,
+            status=int(data.get("status", STATUS_OFFLINE) or 0),
+            host_online=bool(host.get("online", False)),
+            players=list(players.get("list") or []),
+            player_count=int(players.get("count") or len(players.get("list") or [])),
+            max_players=players.get("max"),
+            started_at=_parse_time(data.get("timeStarted")),
+            host_uptime=int(host.get("uptime") or 0),
+            credits=float(data["credits"]) if data.get("credits") is not None else None,
+            credits_per_hour=float(rate) if rate is not None else None,
+            raw=data,
+        )
+
+    @property
+    def is_online(self) -> bool:
+        return self.status == STATUS_ONLINE
+
+    @property
+    def status_text(self) -> str:
+        return STATUS_TEXT.get(self.status, "Unknown")
+
+    def uptime(self) -> Optional[datetime.timedelta]:
+        """Time since the server started, if the API reported a start time."""
+        if not self.started_at:
+            return None
+        now = datetime.datetime.now(datetime.timezone.utc)
+        started = self.started_at
+        if started.tzinfo is None:
+            started = started.replace(tzinfo=datetime.timezone.utc)
+        return now - started
+
+
+@dataclass
+class CreditBalance:
+    credits: float
+    raw: dict = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_payload(cls, data: dict) -> "CreditBalance":
+        return cls(credits=float(data.get("credits", 0.0) or 0.0), raw=data)
+
+
+class ExarotonClient:
+    """One pooled aiohttp session shared by every cog that talks to exaroton."""
+
+    def __init__(self, token=None, server_id=None, base_url=API_BASE, timeout=DEFAULT_TIMEOUT):
+        self.token = token or os.getenv("EXAROTON_TOKEN")
+        self.server_id = server_id or os.getenv("EXAROTON_SERVER_ID")
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._session = None
+        self._session_lock = asyncio.Lock()
+
+    async def session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it inside the running loop on first use."""
+        if self._session and not self._session.closed:
+            return self._session
+        async with self._session_lock:
+            if self._session is None or self._session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=POOL_SIZE,
+                    keepalive_timeout=KEEPALIVE_SECONDS,
+                    ttl_dns_cache=300,
+                )
+                self._session = aiohttp.ClientSession(
+                    connector=connector,
+                    headers={"Authorization": f"Bearer {self.token}"},
+                )
+        return self._session
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _request(self, method, path, timeout=None, **kwargs):
+        session = await self.session()
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        client_timeout = aiohttp.ClientTimeout(total=timeout or self.timeout)
+
+        async def attempt():
+            async with session.request(method, url, timeout=client_timeout, **kwargs) as resp:
+                if resp.status == 204:
+                    return resp.status, {}
+                try:
+                    payload = await resp.json(content_type=None)
+                except (aiohttp.ContentTypeError, ValueError):
+                    payload = None
+                if resp.status in RETRY_STATUSES:
+                    raise UpstreamError(f"API status {resp.status}", status=resp.status)
+                return resp.status, payload
+
+        # Breaker, retries and the per-host cap live in the resilience layer
+        retries = None if method.upper() in IDEMPOTENT_METHODS else 0
+        try:
+            status, payload = await call_upstream(url, attempt, retries=retries)
+        except UpstreamError as e:
+            raise ExarotonError(str(e), status=e.status) from e
+
+        if status >= 400:
+            error = payload.get("error") if isinstance(payload, dict) else None
+            raise ExarotonError(error or f"API status {status}", status=status)
+
+        # The API wraps results as {"success": ..., "error": ..., "data": {...}}
+        if isinstance(payload, dict) and "success" in payload:
+            if not payload.get("success", True):
+                raise ExarotonError(payload.get("error") or "API reported failure", status=status)
+            return payload.get("data") or {}
+        return payload or {}
+
+    async def get_server(self, server_id=None, timeout=None) -> ServerInfo:
+        data = await self._request("GET", f"servers/{server_id or self.server_id}", timeout=timeout)
+        return ServerInfo.from_payload(data)
+
+    async def get_credits(self, timeout=None) -> CreditBalance:
+        data = await self._request("GET", "credits", timeout=timeout)
+        return CreditBalance.from_payload(data)
+
+    async def start_server(self, server_id=None, timeout=None):
+        await self._request("POST", f"servers/{server_id or self.server_id}/start", timeout=timeout)
+
+    async def restart_server(self, server_id=None, timeout=None):
+        await self._request("POST", f"servers/{server_id or self.server_id}/restart", timeout=timeout)
+
+    async def get_players(self, server_id=None, timeout=None) -> List[str]:
+        return (await self.get_server(server_id, timeout=timeout)).players
+
+    async def get_log(self, server_id=None, timeout=None) -> str:
+        """The server's latest.log, as the API last read it."""
+        data = await self._request("GET", f"servers/{server_id or self.server_id}/logs", timeout=timeout)
+        return data.get("content") or ""
+
+
+_client = None
+
+
+def get_client() -> ExarotonClient:
+    """Shared client; reads the token on first use so .env is already loaded."""
+    global _client
+    if _client is None:
+        _client = ExarotonClient()
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.close()
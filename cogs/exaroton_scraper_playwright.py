@@ -6,32 +6,169 @@ EXAROTON_EMAIL = os.getenv("EXAROTON_EMAIL")
 EXAROTON_PASSWORD = os.getenv("EXAROTON_PASSWORD")
 EXAROTON_SERVER_ID = os.getenv("EXAROTON_SERVER_ID")
 
-async def get_live_status_playwright():
-    try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context()
-            page = await context.new_page()
-
-            # Login page
-            await page.goto("https://exaroton.com/login", timeout=15000)
-            await page.fill('input[name="email"]', EXAROTON_EMAIL)
-            await page.fill('input[name="password"]', EXAROTON_PASSWORD)
-            await page.click('button[type="submit"]')
-
-            # Wait for login to complete
-            await page.wait_for_url("https://exaroton.com/dashboard", timeout=10000)
-
-            # Navigate to server page
-            await page.goto(f"https://exaroton.com/server/{EXAROTON_SERVER_ID}", timeout=15000)
+LOGIN_URL = "https://exaroton.com/login"
+DASHBOARD_URL = "https://exaroton.com/dashboard"
+STORAGE_STATE_FILE = "data/exaroton_storage_state.json"  # cookies so we don't log in on every scrape
+PAGE_POOL_SIZE = 2
+PAGE_ACQUIRE_TIMEOUT = 30
+
+# Nothing we read lives in these, so don't download them
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+BLOCKED_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "facebook.net",
+    "hotjar.com",
+    "cloudflareinsights.com",
+)
+
+
+class ScraperPool:
+    """Long-lived Chromium with one logged-in context and a few reusable pages."""
+
+    def __init__(self, size=PAGE_POOL_SIZE, storage_state_file=STORAGE_STATE_FILE):
+        self.size = size
+        self.storage_state_file = storage_state_file
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._pages = asyncio.Queue()
+        self._lock = asyncio.Lock()
+
+    def _server_url(self):
+        return f"https://exaroton.com/server/{EXAROTON_SERVER_ID or os.getenv('EXAROTON_SERVER_ID')}"
+
+    async def _ensure_browser(self):
+        if self._browser is not None and self._browser.is_connected():
+            return
+        async with self._lock:
+            if self._browser is not None and self._browser.is_connected():
+                return
+            await self._teardown()
+            print("[Scraper] Launching browser")
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=True)
+            self._browser.on("disconnected", self._on_disconnected)
+
+            state = self.storage_state_file if os.path.exists(self.storage_state_file) else None
+            self._context = await self._browser.new_context(storage_state=state)
+            await self._context.route("**/*", self._filter_request)
+
+            # Keep the same queue: scrapes already waiting in get() then receive the new pages
+            while not self._pages.empty():
+                self._pages.get_nowait()  # old context's pages, closed with it
+            for _ in range(self.size):
+                self._pages.put_nowait(await self._context.new_page())
+
+    def _on_disconnected(self, *_):
+        # Browser crashed or was killed; the next scrape relaunches it
+        print("[Scraper] Browser disconnected")
+        self._browser = None
+
+    async def _teardown(self):
+        for closer in (
+            self._context.close if self._context else None,
+            self._browser.close if self._browser else None,
+            self._playwright.stop if self._playwright else None,
+        ):
+            if closer is None:
+                continue
+            try:
+                await closer()
+            except Exception:
+                pass
+        self._playwright = self._browser = self._context = None
+
+    async def close(self):
+        async with self._lock:
+            await self._teardown()
+
+    async def _filter_request(self, route):
+        request = route.request
+        if request.resource_type in BLOCKED_RESOURCE_TYPES or any(host in request.url for host in BLOCKED_HOSTS):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _login(self, page):
+        email = EXAROTON_EMAIL or os.getenv("EXAROTON_EMAIL")
+        password = EXAROTON_PASSWORD or os.getenv("EXAROTON_PASSWORD")
+        if page.url != LOGIN_URL:
+            await page.goto(LOGIN_URL, timeout=15000)
+        await page.fill('input[name="email"]', email)
+        await page.fill('input[name="password"]', password)
+        await page.click('button[type="submit"]')
+        await page.wait_for_url(DASHBOARD_URL, timeout=10000)
+
+        os.makedirs(os.path.dirname(self.storage_state_file), exist_ok=True)
+        await self._context.storage_state(path=self.storage_state_file)
+        print("[Scraper] Logged in, session saved")
+
+    async def _release(self, page, healthy):
+        context = self._context
+        if healthy and not page.is_closed() and page.context is context:
+            self._pages.put_nowait(page)
+            return
+        try:
+            await page.close()
+        except Exception:
+            pass
+        if context is None or page.context is not context:
+            return  # pool was rebuilt, the new one has its own pages
+        try:
+            self._pages.put_nowait(await context.new_page())
+        except Exception:
+            self._browser = None  # context is gone; relaunch on next scrape
+
+    async def scrape(self):
+        await self._ensure_browser()
+        page = await asyncio.wait_for(self._pages.get(), timeout=PAGE_ACQUIRE_TIMEOUT)
+        healthy = False
+        try:
+            server_url = self._server_url()
+            if page.url == server_url:
+                await page.reload(timeout=15000)
+            else:
+                await page.goto(server_url, timeout=15000)
+
+            if page.url.startswith(LOGIN_URL):
+                await self._login(page)
+                await page.goto(server_url, timeout=15000)
+
             await page.wait_for_selector(".statusBadge", timeout=5000)
 
             motd = await page.locator(".motd").inner_text()
             status = await page.locator(".statusBadge").inner_text()
             players = await page.locator(".players .name").all_inner_texts()
-
-            await browser.close()
+            healthy = True
             return {"motd": motd, "status": status, "players": players}
+        except asyncio.CancelledError:
+            # Usually a hedge that lost to a faster probe. The page is fine, so it goes back
+            # as it is; the next scrape navigates it anyway. Only real errors cost a page.
+            healthy = True
+            raise
+        finally:
+            await self._release(page, healthy)
+
+
+_pool = None
 
+
+def get_scraper_pool():
+    global _pool
+    if _pool is None:
+        _pool = ScraperPool()
+    return _pool
+
+
+async def close_scraper():
+    if _pool is not None:
+        await _pool.close()
+
+
+async def get_live_status_playwright():
+    try:
+        return await get_scraper_pool().scrape()
     except Exception as e:
         return {"error": str(e)}
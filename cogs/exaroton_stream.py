@@ -0,0 +1,175 @@
+# cogs/exaroton_stream.py
+
+import os
+import json
+import random
+import asyncio
+from collections import defaultdict, deque
+
+import aiohttp
+
+from .exaroton_client import get_client, ServerInfo
+
+# ─── Configuration ────────────────────────────────────────────────
+DEFAULT_STREAMS       = [s for s in os.getenv("EXAROTON_WS_STREAMS", "console,tick,heap").split(",") if s]
+MIN_BACKOFF_SECONDS   = 1
+MAX_BACKOFF_SECONDS   = 300
+HEARTBEAT_SECONDS     = 30
+CONSOLE_TAIL_LINES    = 200
+
+
+class ExarotonStream:
+    """Consumes the exaroton server websocket and pushes status changes to handlers.
+
+    Handlers are registered per event with on():
+        "status"  -> handler(info: ServerInfo, source: str)
+        "console" -> handler(line: str)
+        "tick"    -> handler(data: dict)
+        "heap"    -> handler(data: dict)
+
+    Polling while the socket is down is the StatusMonitor's job.
+    Pass url= to point it at a local stand-in server.
+    """
+
+    def __init__(self, client=None, server_id=None, url=None, streams=None,
+                 min_backoff=MIN_BACKOFF_SECONDS, max_backoff=MAX_BACKOFF_SECONDS):
+        self.client = client or get_client()
+        self.server_id = server_id or self.client.server_id
+        self.url = url or os.getenv("EXAROTON_WS_URL") or self._default_url()
+        self.streams = list(DEFAULT_STREAMS if streams is None else streams)
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+
+        self.connected = False
+        self.last_info = None
+        self.tick = None
+        self.heap = None
+        self.console = deque(maxlen=CONSOLE_TAIL_LINES)
+
+        self._handlers = defaultdict(list)
+        self._task = None
+        self._ws = None
+        self._ready = False
+        self._streaming = False  # start frames sent on this socket since the server last went down
+
+    def _default_url(self):
+        base = self.client.base_url.replace("https://", "wss://", 1).replace("http://", "ws://", 1)
+        return f"{base}/servers/{self.server_id}/websocket"
+
+    def on(self, event, handler):
+        self._handlers[event].append(handler)
+        return handler
+
+    async def _emit(self, event, *args):
+        for handler in list(self._handlers[event]):
+            try:
+                await handler(*args)
+            except Exception as e:
+                print(f"[Exaroton WS] {event} handler failed: {e}")
+
+    # ─── Lifecycle ──────────────────────────────────────────────────
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._ws is not None and not self._ws.closed:
+            await self._ws.close()
+        self._task = self._ws = None
+        self.connected = False
+
+    def _backoff(self, attempt):
+        delay = min(self.max_backoff, self.min_backoff * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _run(self):
+        attempt = 0
+        while True:
+            self._ready = self._streaming = False
+            try:
+                await self._consume()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[Exaroton WS] Connection lost: {e}")
+            self.connected = False
+
+            attempt = 0 if self._ready else attempt + 1
+            delay = self._backoff(attempt)
+            print(f"[Exaroton WS] Reconnecting in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def _consume(self):
+        session = await self.client.session()
+        async with session.ws_connect(self.url, heartbeat=HEARTBEAT_SECONDS) as ws:
+            self._ws = ws
+            async for msg in ws:
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    try:
+                        message = json.loads(msg.data)
+                    except ValueError:
+                        continue
+                    await self._handle(message, ws)
+                elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                    break
+        self._ws = None
+
+    # ─── Messages ───────────────────────────────────────────────────
+    async def _handle(self, message, ws):
+        mtype = message.get("type")
+        stream = message.get("stream")
+        data = message.get("data")
+
+        if mtype == "keep-alive":
+            return
+
+        # Status frames come as {"stream": "status", "type": "status", "data": {...}}
+        if mtype == "status" and stream in (None, "status"):
+            if isinstance(data, dict):
+                info = ServerInfo.from_payload(data)
+                await self._publish_status(info, "WebSocket")
+                # console/tick/heap only exist while the server is running, so
+                # they're started again each time it comes up on this socket
+                if not info.is_online:
+                    self._streaming = False
+                elif not self._streaming:
+                    await self._start_streams(ws)
+            return
+
+        if stream is None:
+            if mtype == "ready":
+                self._ready = True
+                self.connected = True
+                print("[Exaroton WS] Ready")
+                await self._start_streams(ws)
+            elif mtype == "disconnected":
+                self.connected = False
+            return
+
+        if stream == "console" and mtype == "line":
+            self.console.append(data)
+            await self._emit("console", data)
+        elif stream == "tick" and mtype == "tick":
+            self.tick = data
+            await self._emit("tick", data)
+        elif stream == "heap" and mtype == "heap":
+            self.heap = data
+            await self._emit("heap", data)
+
+    async def _start_streams(self, ws):
+        self._streaming = True
+        for name in self.streams:
+            payload = {"stream": name, "type": "start"}
+            if name == "console":
+                payload["data"] = {"tail": 0}
+            try:
+                await ws.send_json(payload)
+            except Exception as e:
+                print(f"[Exaroton WS] Couldn't start {name} stream: {e}")
+
+    async def _publish_status(self, info, source):
+        self.last_info = info
+        await self._emit("status", info, source)
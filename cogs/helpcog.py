@@ -30,6 +30,7 @@ class HelpCog(commands.Cog):
                 "!burnstats": "View credit burn rate and project time remaining.",
                 "!credits": "Current Exaroton credit balance.",
                 "!players": "See who's currently online.",
+                "!statushistory": "Uptime, average players and outages over 24h/7d/30d.",
                 "!sessionlength": "Current session duration (uptime).",
                 "!restartserver": "Dev-only: Restart the server.",
             }
@@ -0,0 +1,186 @@
+# cogs/io_executor.py
+
+import os
+import time
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from .persistence import atomic_write, read_json, write_json_many
+from .serializers import dumps_document, kind_of
+
+# ─── Configuration ────────────────────────────────────────────────
+IO_WORKERS      = int(os.getenv("IO_WORKERS", 4))
+LATENCY_SAMPLES = 500   # recent timings kept per operation for percentiles
+
+
+class OpStats:
+    """Timings for one kind of I/O operation."""
+
+    __slots__ = ("count", "failed", "total", "max", "recent")
+
+    def __init__(self):
+        self.count = 0
+        self.failed = 0
+        self.total = 0.0  # seconds, submit → done
+        self.max = 0.0
+        self.recent = deque(maxlen=LATENCY_SAMPLES)
+
+    def add(self, seconds, ok):
+        self.count += 1
+        self.failed += not ok
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def percentile(self, pct) -> float:
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class IOExecutor:
+    """Runs blocking file I/O off the event loop.
+
+    Read-modify-write sequences hold an asyncio lock for their path, so two
+    commands editing the same file queue up while everything else carries
+    on. Every call is timed; stats() reports queue depth and latency.
+    """
+
+    def __init__(self, max_workers=IO_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="blkline-io")
+        self._locks = {}
+        self.ops = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.queue_wait = OpStats()  # submit → a worker picked it up
+
+    def lock(self, path) -> asyncio.Lock:
+        lock = self._locks.get(path)
+        if lock is None:
+            lock = self._locks[path] = asyncio.Lock()
+        return lock
+
+    @asynccontextmanager
+    async def locks(self, *paths):
+        """Hold several path locks at once, always taken in sorted order."""
+        ordered = sorted(set(paths))
+        for path in ordered:
+            await self.lock(path).acquire()
+        try:
+            yield
+        finally:
+            for path in reversed(ordered):
+                self.lock(path).release()
+
+    async def run(self, fn, *args, op="call", executor=None):
+        """Run fn(*args) on the I/O pool (or the given executor) and time it under op."""
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+        started = None
+
+        def job():
+            nonlocal started
+            started = time.perf_counter()
+            return fn(*args)
+
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        ok = False
+        try:
+            result = await loop.run_in_executor(executor or self._executor, job)
+            ok = True
+            return result
+        finally:
+            self.in_flight -= 1
+            stats = self.ops.get(op)
+            if stats is None:
+                stats = self.ops[op] = OpStats()
+            stats.add(time.perf_counter() - submitted, ok)
+            if started is not None:
+                self.queue_wait.add(started - submitted, True)
+
+    @property
+    def queued(self) -> int:
+        return self._executor._work_queue.qsize()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+    # ─── File helpers ───────────────────────────────────────────────
+    async def read_json(self, path, default=None):
+        """Decoded document at path, or default if it doesn't exist. Files are replaced atomically, so no lock."""
+        return await self.run(read_json, path, default, op="read_json")
+
+    async def write_json(self, path, data, indent=4):
+        async with self.lock(path):
+            await self._write_json(path, data, indent)
+
+    async def _write_json(self, path, data, indent):
+        await self.run(atomic_write, path, dumps_document(data, kind_of(path), indent=indent), op="write_json")
+
+    async def read_text(self, path, default=""):
+        return await self.run(_read_text, path, default, op="read_text")
+
+    async def append_line(self, path, line):
+        async with self.lock(path):
+            await self.run(_append_line, path, line, op="append")
+
+    async def write_json_many(self, docs, indent=4):
+        """Journaled multi-file write. Hold locks(*docs) around the read-modify-write."""
+        await self.run(write_json_many, docs, indent, op="write_json_many")
+
+    @asynccontextmanager
+    async def edit_json(self, path, default=dict, indent=4):
+        """Lock path, yield its parsed contents, write them back when the block exits cleanly."""
+        async with self.lock(path):
+            data = await self.read_json(path)
+            if data is None:
+                data = default() if callable(default) else default
+            yield data
+            await self._write_json(path, data, indent)
+
+    # ─── Metrics ────────────────────────────────────────────────────
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "queued": self.queued,
+            "queue_wait_p95": self.queue_wait.percentile(0.95),
+            "locked_paths": sum(1 for lock in self._locks.values() if lock.locked()),
+            "ops": {
+                name: {
+                    "count": s.count,
+                    "failed": s.failed,
+                    "avg": s.total / s.count if s.count else 0.0,
+                    "p95": s.percentile(0.95),
+                    "max": s.max,
+                }
+                for name, s in sorted(self.ops.items())
+            },
+        }
+
+
+def _read_text(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _append_line(path, line):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line if line.endswith("\n") else line + "\n")
+
+
+_io = None
+
+
+def get_io() -> IOExecutor:
+    global _io
+    if _io is None:
+        _io = IOExecutor()
+    return _io
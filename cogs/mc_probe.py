@@ -0,0 +1,86 @@
+# cogs/mc_probe.py
+
+import os
+import time
+import asyncio
+
+from mcstatus import JavaServer
+
+# ─── Configuration ────────────────────────────────────────────────
+PROBE_TIMEOUT      = float(os.getenv("MC_PROBE_TIMEOUT", 3))  # seconds per lookup / status attempt
+PROBE_RETRIES      = int(os.getenv("MC_PROBE_RETRIES", 1))    # extra attempts after the first
+LOOKUP_TTL_SECONDS = int(os.getenv("MC_LOOKUP_TTL", 300))     # how long a resolved SRV/DNS answer is reused
+
+
+class ProbeError(Exception):
+    """Raised when the Minecraft server couldn't be pinged."""
+
+
+class MinecraftProbe:
+    """Async mcstatus pings with cached address resolution.
+
+    Resolving the SRV record is the slow part of a ping, so each address is
+    looked up once and reused for lookup_ttl seconds. A failed attempt
+    drops the cached lookup so a retry resolves fresh.
+    """
+
+    def __init__(self, timeout=PROBE_TIMEOUT, retries=PROBE_RETRIES, lookup_ttl=LOOKUP_TTL_SECONDS):
+        self.timeout = timeout
+        self.retries = retries
+        self.lookup_ttl = lookup_ttl
+        self._servers = {}  # address -> (JavaServer, resolved_at)
+
+    async def _resolve(self, address, timeout):
+        cached = self._servers.get(address)
+        if cached and time.monotonic() - cached[1] < self.lookup_ttl:
+            return cached[0]
+        server = await asyncio.wait_for(JavaServer.async_lookup(address, timeout=timeout), timeout=timeout)
+        self._servers[address] = (server, time.monotonic())
+        return server
+
+    def forget(self, address=None):
+        """Drop the cached lookup for address, or every lookup."""
+        if address is None:
+            self._servers.clear()
+        else:
+            self._servers.pop(address, None)
+
+    async def status(self, address=None, timeout=None, retries=None):
+        """Ping address and return the mcstatus status response."""
+        address = address or os.getenv("SERVER_ADDRESS")
+        if not address:
+            raise ProbeError("No server address configured")
+        timeout = self.timeout if timeout is None else timeout
+        retries = self.retries if retries is None else retries
+
+        last_error = None
+        for _ in range(retries + 1):
+            try:
+                server = await self._resolve(address, timeout)
+                return await asyncio.wait_for(server.async_status(), timeout=timeout)
+            except Exception as e:
+                last_error = e
+                self.forget(address)
+        raise ProbeError(f"{address} unreachable: {last_error or 'timed out'}") from last_error
+
+
+def describe_motd(status, default="Unknown MOTD"):
+    """Plain MOTD text from a status response."""
+    description = status.description
+    if isinstance(description, dict):
+        return description.get("text", default)
+    return str(description) if description else default
+
+
+def sample_names(status):
+    return [p.name for p in status.players.sample] if status.players.sample else []
+
+
+_probe = None
+
+
+def get_probe() -> MinecraftProbe:
+    global _probe
+    if _probe is None:
+        _probe = MinecraftProbe()
+    return _probe
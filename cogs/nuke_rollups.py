@@ -0,0 +1,90 @@
+# cogs/nuke_rollups.py
+
+import re
+import heapq
+from datetime import datetime
+
+# ─── Configuration ────────────────────────────────────────────────
+TOP_K = 10  # leaders kept precomputed per rollup row
+
+_MONTH_RE = re.compile(r"^\d{4}-\d{2}$")
+_YEAR_RE = re.compile(r"^\d{4}$")
+_LAST_RE = re.compile(r"^(?:last)?(\d{1,3})m(?:onths?)?$")
+
+
+# Rows in the nuke_rollups collection, keyed "YYYY-MM", "YYYY" or "all":
+#   {"counts": {mod_id: nukes}, "top": [[mod_id, nukes], ...]}  (top: best TOP_K, highest first)
+
+def rollup_keys(month) -> list:
+    """Every rollup a nuke made in month counts towards."""
+    if month and _MONTH_RE.match(month):
+        return [month, month[:4], "all"]
+    return ["all"]  # pre-ledger counts with no real month
+
+
+def _top(counts, k=TOP_K):
+    return [list(kv) for kv in heapq.nlargest(k, counts.items(), key=lambda kv: (kv[1], kv[0]))]
+
+
+def bump(row, mod_id, delta):
+    """A rollup row with mod_id's count moved by delta; None once it's empty."""
+    counts = dict(row["counts"]) if row else {}
+    count = counts.get(mod_id, 0) + delta
+    if count > 0:
+        counts[mod_id] = count
+    else:
+        counts.pop(mod_id, None)
+    if not counts:
+        return None
+    return {"counts": counts, "top": _top(counts)}
+
+
+def queue_bumps(batch, mod_id, month, delta):
+    for key in rollup_keys(month):
+        batch.update("nuke_rollups", key, lambda row: bump(row, mod_id, delta))
+
+
+def _last_months(n, now):
+    year, month = now.year, now.month
+    keys = []
+    for _ in range(n):
+        keys.append(f"{year:04d}-{month:02d}")
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return keys
+
+
+def parse_period(text=None, now=None):
+    """(rollup keys to combine, label) for a period like "2025-03", "2025", "3m", "year" or "all"."""
+    now = now or datetime.utcnow()
+    text = (text or "").strip().lower().lstrip("-")
+    if text in ("", "month", "thismonth"):
+        month = now.strftime("%Y-%m")
+        return [month], month
+    if text in ("year", "thisyear"):
+        return [str(now.year)], str(now.year)
+    if text in ("all", "alltime", "ever"):
+        return ["all"], "All Time"
+    if _MONTH_RE.match(text) or _YEAR_RE.match(text):
+        return [text], text
+    match = _LAST_RE.match(text)
+    if match and 0 < int(match.group(1)) <= 120:
+        n = int(match.group(1))
+        return _last_months(n, now), f"Last {n} Months"
+    raise ValueError(f"Unknown period `{text}`. Try `2025-03`, `2025`, `3m`, `year` or `all`.")
+
+
+async def top_nukers(store, keys, k=5):
+    """The k biggest nukers over the given rollup keys: [(mod_id, nukes)]."""
+    if len(keys) == 1:
+        row = await store.get("nuke_rollups", keys[0])
+        if row is None:
+            return []
+        if k <= TOP_K:
+            return [tuple(entry) for entry in row["top"][:k]]
+        return [tuple(entry) for entry in _top(row["counts"], k)]
+    merged = {}
+    for key in keys:
+        row = await store.get("nuke_rollups", key)
+        for mod_id, count in (row or {"counts": {}})["counts"].items():
+            merged[mod_id] = merged.get(mod_id, 0) + count
+    return [tuple(entry) for entry in _top(merged, k)]
@@ -0,0 +1,124 @@
+# cogs/persistence.py
+
+import os
+import json
+import base64
+import tempfile
+
+from .serializers import dumps_document, loads_document, kind_of
+
+# ─── Configuration ────────────────────────────────────────────────
+JOURNAL_FILE = "data/.journal.json"  # pending multi-file commit, replayed by recover()
+TMP_SUFFIX   = ".tmp"
+
+
+def _fsync_dir(directory):
+    try:
+        fd = os.open(directory or ".", os.O_RDONLY)
+    except OSError:
+        return  # not supported (Windows); the rename is still atomic
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path, content):
+    """Replace path with content (str or bytes) so readers see the old or the new file, never half of one."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=TMP_SUFFIX, dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(directory)
+
+
+def write_json(path, data, indent=4):
+    """Write a data document in the configured format (pretty JSON unless BLKLINE_SERIALIZER says otherwise)."""
+    atomic_write(path, dumps_document(data, kind_of(path), indent=indent))
+
+
+def read_json(path, default=None):
+    """Read a document written by write_json(), in whichever format it was saved."""
+    if not os.path.exists(path):
+        return default
+    with open(path, "rb") as f:
+        return loads_document(f.read(), kind_of(path))
+
+
+def commit_files(files, journal=JOURNAL_FILE):
+    """Atomically replace several files as one unit. files: {path: str or bytes}.
+
+    The new contents go to the journal first; once it is durable each file
+    is swapped in and the journal removed. A crash anywhere in between is
+    finished by recover() on the next start.
+    """
+    if len(files) == 1:
+        (path, text), = files.items()
+        atomic_write(path, text)
+        return
+    entries = {
+        path: {"b64": base64.b64encode(content).decode("ascii")} if isinstance(content, bytes) else content
+        for path, content in files.items()
+    }
+    atomic_write(journal, json.dumps({"files": entries}))
+    _apply(files)
+    os.remove(journal)
+    _fsync_dir(os.path.dirname(journal))
+
+
+def write_json_many(docs, indent=4, journal=JOURNAL_FILE):
+    """commit_files() for {path: data}."""
+    commit_files({path: dumps_document(data, kind_of(path), indent=indent) for path, data in docs.items()}, journal)
+
+
+def _apply(files):
+    for path, content in files.items():
+        if isinstance(content, dict):
+            content = base64.b64decode(content["b64"])
+        atomic_write(path, content)
+
+
+def recover(journal=JOURNAL_FILE) -> list:
+    """Finish an interrupted commit_files() and sweep leftover temp files.
+
+    Call once at startup, before anything reads data/. Returns the paths
+    that were rewritten from the journal.
+    """
+    recovered = []
+    if os.path.exists(journal):
+        try:
+            with open(journal, "r", encoding="utf-8") as f:
+                files = json.load(f)["files"]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            # atomic_write never leaves a torn journal, so this was never committed
+            print(f"[Persistence] Discarding unreadable journal: {e}")
+        else:
+            _apply(files)
+            recovered = list(files)
+            print(f"[Persistence] Replayed journal for {len(recovered)} file(s): {', '.join(recovered)}")
+        os.remove(journal)
+
+    directory = os.path.dirname(journal) or "."
+    if os.path.isdir(directory):
+        for name in os.listdir(directory):
+            if name.startswith(".") and name.endswith(TMP_SUFFIX):
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+    return recovered
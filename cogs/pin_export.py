@@ -0,0 +1,249 @@
+# cogs/pin_export.py
+
+import io
+import csv
+import json
+import gzip
+import math
+from datetime import datetime
+
+from .datastore import get_store
+from .io_executor import get_io
+
+# ─── Configuration ────────────────────────────────────────────────
+DEFAULT_FORMATS = ("jsonl", "csv")
+DEFAULT_LIMIT   = 10 * 1024 * 1024  # bytes per attachment when the guild doesn't say
+GZIP_FLUSH      = 256 * 1024        # sync-flush gzip after this much input, so part sizes stay measurable
+SCAN_BATCH      = 500
+
+
+class PinFormat:
+    name = None
+    extension = None
+    header = b""
+    separator = b""
+    footer = b""
+
+    def row(self, pin_id, pin) -> bytes:
+        raise NotImplementedError
+
+
+class JsonLinesFormat(PinFormat):
+    name = "jsonl"
+    extension = "jsonl"
+
+    def row(self, pin_id, pin):
+        return (json.dumps({"id": pin_id, **pin}, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+class CsvFormat(PinFormat):
+    name = "csv"
+    extension = "csv"
+    COLUMNS = ["ID", "X", "Y", "Z", "Description", "Submitter", "Attributed", "Timestamp"]
+
+    def __init__(self):
+        self.header = self._line(self.COLUMNS)
+
+    @staticmethod
+    def _line(values) -> bytes:
+        out = io.StringIO()
+        csv.writer(out).writerow(values)
+        return out.getvalue().encode("utf-8")
+
+    def row(self, pin_id, pin):
+        return self._line([
+            pin_id, pin.get("x"), "" if pin.get("y") is None else pin["y"], pin.get("z"),
+            pin.get("description"), pin.get("submitter_id"), pin.get("attributed_user_id"), pin.get("timestamp"),
+        ])
+
+
+class GeoJsonFormat(PinFormat):
+    """A FeatureCollection of points at [x, z]; y stays in the properties."""
+
+    name = "geojson"
+    extension = "geojson"
+    header = b'{"type": "FeatureCollection", "features": [\n'
+    separator = b",\n"
+    footer = b"\n]}\n"
+
+    def row(self, pin_id, pin):
+        feature = {
+            "type": "Feature",
+            "id": pin_id,
+            "geometry": {"type": "Point", "coordinates": [pin.get("x"), pin.get("z")]},
+            "properties": {k: v for k, v in pin.items() if k not in ("x", "z")},
+        }
+        return json.dumps(feature, ensure_ascii=False).encode("utf-8")
+
+
+FORMATS = {cls.name: cls for cls in (JsonLinesFormat, CsvFormat, GeoJsonFormat)}
+
+
+class PartWriter:
+    """Streams one format into in-memory parts that each fit under limit bytes."""
+
+    def __init__(self, fmt: PinFormat, limit, compress=False):
+        self.fmt = fmt
+        self.limit = limit
+        self.compress = compress
+        self.parts = []  # bytes of each finished part
+        self.rows = 0
+        self._start()
+
+    def _start(self):
+        self._buf = io.BytesIO()
+        self._stream = gzip.GzipFile(fileobj=self._buf, mode="wb") if self.compress else self._buf
+        self._stream.write(self.fmt.header)
+        self._written = len(self.fmt.header)
+        self._pending = self._written  # input zlib may not have emitted yet
+        self._part_rows = 0
+
+    def _size(self):
+        # Counting unflushed input at full size overestimates, so a part never ends up over the limit
+        return self._buf.tell() + self._pending + 32 if self.compress else self._written
+
+    def _finish(self):
+        self._stream.write(self.fmt.footer)
+        if self.compress:
+            self._stream.close()
+        self.parts.append(self._buf.getvalue())
+
+    def write(self, pin_id, pin):
+        data = self.fmt.row(pin_id, pin)
+        if self._part_rows:
+            data = self.fmt.separator + data
+            if self._size() + len(data) + len(self.fmt.footer) > self.limit:
+                self._finish()
+                self._start()
+                data = data[len(self.fmt.separator):]
+        self._stream.write(data)
+        self._written += len(data)
+        self._pending += len(data)
+        if self.compress and self._pending >= min(GZIP_FLUSH, self.limit // 8):
+            self._stream.flush()
+            self._pending = 0
+        self._part_rows += 1
+        self.rows += 1
+
+    def write_many(self, rows):
+        for pin_id, pin in rows:
+            self.write(pin_id, pin)
+
+    def close(self, basename="pins"):
+        """[(filename, bytes)] for every part."""
+        self._finish()
+        suffix = f".{self.fmt.extension}" + (".gz" if self.compress else "")
+        if len(self.parts) == 1:
+            return [(basename + suffix, self.parts[0])]
+        total = len(self.parts)
+        return [(f"{basename}-{i}of{total}{suffix}", data) for i, data in enumerate(self.parts, start=1)]
+
+
+class ExportFilter:
+    """Which pins go into an export. Every set condition has to hold."""
+
+    def __init__(self, user_id=None, near=None, box=None, after=None, before=None):
+        self.user_id = None if user_id is None else str(user_id)
+        self.near = near      # (x, z, radius)
+        self.box = box        # (x0, z0, x1, z1)
+        self.after = after    # ISO timestamps, exclusive
+        self.before = before
+
+    def __call__(self, pin) -> bool:
+        if self.user_id is not None and str(pin.get("attributed_user_id")) != self.user_id:
+            return False
+        x, z = pin.get("x"), pin.get("z")
+        if self.near is not None:
+            if x is None or z is None or math.hypot(x - self.near[0], z - self.near[1]) > self.near[2]:
+                return False
+        if self.box is not None:
+            x0, z0, x1, z1 = self.box
+            if x is None or z is None or not (x0 <= x <= x1 and z0 <= z <= z1):
+                return False
+        timestamp = pin.get("timestamp") or ""
+        if self.after is not None and timestamp <= self.after:
+            return False
+        if self.before is not None and timestamp >= self.before:
+            return False
+        return True
+
+
+def _numbers(value, counts, usage):
+    try:
+        numbers = [int(float(n)) for n in value.split(",")]
+    except ValueError:
+        raise ValueError(usage)
+    if len(numbers) not in counts:
+        raise ValueError(usage)
+    return numbers
+
+
+def parse_export_args(text):
+    """(format names, gzip?, raw user: text or None, ExportFilter) from `csv geojson gz user:@x box:... after:...`."""
+    formats, compress, user, flt = [], False, None, ExportFilter()
+    for part in (text or "").split():
+        key, sep, value = part.partition(":")
+        key = key.lower()
+        if not sep:
+            if key in ("gz", "gzip"):
+                compress = True
+            elif key in FORMATS:
+                formats.append(key)
+            elif key == "json":
+                formats.append("jsonl")
+            else:
+                raise ValueError(f"Unknown format `{part}`. Pick from {', '.join(FORMATS)} (and `gz`).")
+        elif key == "user":
+            user = value
+        elif key == "near":
+            numbers = _numbers(value, (2, 3), "near: takes `x,z` or `x,z,radius`.")
+            flt.near = (numbers[0], numbers[1], numbers[2] if len(numbers) == 3 else 500)
+        elif key == "box":
+            x0, z0, x1, z1 = _numbers(value, (4,), "box: takes `x1,z1,x2,z2`.")
+            flt.box = (min(x0, x1), min(z0, z1), max(x0, x1), max(z0, z1))
+        elif key in ("after", "before"):
+            try:
+                setattr(flt, key, datetime.fromisoformat(value).isoformat())
+            except ValueError:
+                raise ValueError(f"{key}: takes a date like `2025-01-31`.")
+        else:
+            raise ValueError(f"Unknown filter `{key}:`. Try user:, near:, box:, after: or before:.")
+    return list(dict.fromkeys(formats)) or list(DEFAULT_FORMATS), compress, user, flt
+
+
+async def export_pins(formats, match=None, compress=False, limit=DEFAULT_LIMIT, store=None):
+    """([(filename, bytes)], pins exported). Streams the pins once, feeding every format's writer."""
+    store = store or get_store()
+    writers = [PartWriter(FORMATS[name](), limit, compress) for name in formats]
+    io_pool = get_io()
+    batch = []
+
+    async def flush():
+        for writer in writers:
+            await io_pool.run(writer.write_many, batch, op="pin_export")
+        batch.clear()
+
+    async for pin_id, pin in store.scan("pins", SCAN_BATCH):
+        if match is None or match(pin):
+            batch.append((pin_id, pin))
+            if len(batch) >= SCAN_BATCH:
+                await flush()
+    await flush()
+    files = []
+    for writer in writers:
+        files += await io_pool.run(writer.close, op="pin_export")
+    return files, writers[0].rows if writers else 0
+
+
+def group_for_upload(files, limit, per_message=10):
+    """Split [(filename, bytes)] into messages of at most per_message files and limit bytes each."""
+    messages, current, size = [], [], 0
+    for name, data in files:
+        if current and (len(current) == per_message or size + len(data) > limit):
+            messages.append(current)
+            current, size = [], 0
+        current.append((name, data))
+        size += len(data)
+    if current:
+        messages.append(current)
+    return messages
@@ -0,0 +1,374 @@
+# cogs/pin_import.py
+
+import os
+import re
+import csv
+import json
+import math
+import zlib
+import asyncio
+import codecs
+from datetime import datetime
+
+import aiohttp
+
+from .datastore import get_store
+from .resilience import open_stream, UpstreamError
+from .pin_index import PinIndex, get_pin_index
+
+# ─── Configuration ────────────────────────────────────────────────
+MAX_COORD      = 30_000_000  # world border
+MIN_Y, MAX_Y   = -64, 320
+MAX_DESC       = 256         # embed titles stop there
+DEDUPE_RADIUS  = int(os.getenv("PIN_IMPORT_DEDUPE_RADIUS", 3))  # blocks; closer than this to a pin counts as the same spot
+MAX_ROWS       = int(os.getenv("PIN_IMPORT_MAX_ROWS", 20000))
+MAX_BYTES      = int(os.getenv("PIN_IMPORT_MAX_BYTES", 25 * 1024 * 1024))
+CHUNK_SIZE     = 64 * 1024
+ERRORS_KEPT    = 10          # invalid rows remembered for the report
+
+# Column / key names other tools use for the fields a pin needs
+FIELD_ALIASES = {
+    "x": ("x",),
+    "y": ("y",),
+    "z": ("z",),
+    "description": ("description", "desc", "name", "label", "title"),
+    "attributed_user_id": ("attributed_user_id", "attributed", "user_id"),
+    "timestamp": ("timestamp", "created", "date"),
+}
+_JSON_NAME_RE = re.compile(r"\.(json|jsonl|ndjson|geojson)$", re.IGNORECASE)
+
+
+class ImportReport:
+    """What an import did: pins written, duplicates skipped and rows rejected."""
+
+    def __init__(self):
+        self.inserted = []  # [(pin_id, pin)]
+        self.duplicates = 0
+        self.invalid = 0
+        self.errors = []    # [(row, reason)], the first ERRORS_KEPT
+        self.truncated = False
+
+    def reject(self, row, reason):
+        self.invalid += 1
+        if len(self.errors) < ERRORS_KEPT:
+            self.errors.append((row, reason))
+
+
+# ─── Streaming parsers ────────────────────────────────────────────
+class _CsvRecords:
+    """Turns text chunks into {column: value} rows, keyed by the lowercased header."""
+
+    def __init__(self):
+        self.row = 1  # the header
+        self._header = None
+        self._carry = ""
+        self._pending = []  # lines of a record whose quoted field spans a newline
+        self._quotes = 0
+
+    def feed(self, text, final=False):
+        lines = (self._carry + text).split("\n")
+        self._carry = "" if final else lines.pop()
+        for line in lines:
+            self._pending.append(line + "\n")
+            self._quotes += line.count('"')
+            if self._quotes % 2:
+                continue  # still inside quotes
+            yield from self._record()
+        if final and self._pending:
+            yield from self._record()
+
+    def _record(self):
+        text = "".join(self._pending)
+        self._pending, self._quotes = [], 0
+        fields = next(csv.reader([text]), None)
+        if not fields or not any(f.strip() for f in fields):
+            return
+        if self._header is None:
+            self._header = [f.strip().lower() for f in fields]
+            return
+        self.row += 1
+        yield self.row, dict(zip(self._header, fields))
+
+
+class _JsonRecords:
+    """Turns text chunks into pin-like dicts.
+
+    Takes a JSON array (streamed element by element), JSON Lines (streamed
+    line by line, like !exportpins writes), or any other single document
+    such as GeoJSON or an old pins.json, which is read whole.
+    """
+
+    def __init__(self):
+        self.row = 0
+        self._buf = ""
+        self._mode = None
+        self._decoder = json.JSONDecoder()
+
+    def feed(self, text, final=False):
+        self._buf += text
+        if self._mode is None:
+            start = self._buf.lstrip()
+            if not start:
+                return
+            if start[0] == "[":
+                self._mode, self._buf = "array", start[1:]
+            elif "\n" in start or final:
+                try:
+                    json.loads(start.split("\n", 1)[0])
+                    self._mode = "lines"
+                except ValueError:
+                    self._mode = "document"
+            else:
+                return
+        yield from getattr(self, f"_{self._mode}")(final)
+
+    def _lines(self, final):
+        lines = self._buf.split("\n")
+        self._buf = "" if final else lines.pop()
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                self.row += 1
+                yield self.row, None
+                continue
+            yield from self._expand(obj)
+
+    def _array(self, final):
+        buf, pos = self._buf, 0
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buf):
+                break
+            if buf[pos] == "]":
+                self._mode, pos = "done", len(buf)
+                break
+            try:
+                obj, pos = self._decoder.raw_decode(buf, pos)
+            except ValueError:
+                if final:
+                    raise ValueError(f"The JSON array is malformed after entry {self.row}.")
+                break  # the element carries on in the next chunk
+            yield from self._expand([obj])
+        self._buf = buf[pos:]
+        if final and self._mode == "array":
+            raise ValueError("The JSON array never closes.")
+
+    def _document(self, final):
+        if not final:
+            return
+        try:
+            obj = json.loads(self._buf)
+        except ValueError:
+            raise ValueError("The file isn't valid JSON.")
+        self._buf = ""
+        yield from self._expand(obj)
+
+    def _done(self, final):
+        self._buf = ""
+        return iter(())
+
+    def _expand(self, obj):
+        for record in _json_records(obj):
+            self.row += 1
+            yield self.row, record
+
+
+def _json_records(obj):
+    if isinstance(obj, list):
+        yield from obj
+    elif isinstance(obj, dict) and isinstance(obj.get("features"), list):
+        yield from (_feature(f) for f in obj["features"])
+    elif isinstance(obj, dict) and obj.get("type") == "Feature":
+        yield _feature(obj)
+    elif isinstance(obj, dict) and obj and "x" not in obj and all(isinstance(v, dict) for v in obj.values()):
+        yield from obj.values()  # {pin_id: pin}, the old pins.json
+    else:
+        yield obj
+
+
+def _feature(feature):
+    """A GeoJSON point as a flat record; coordinates are [x, z] as !exportpins writes them."""
+    if not isinstance(feature, dict):
+        return feature
+    record = dict(feature.get("properties") or {})
+    coords = (feature.get("geometry") or {}).get("coordinates")
+    if isinstance(coords, list) and len(coords) >= 2:
+        record["x"], record["z"] = coords[0], coords[1]
+    return record
+
+
+def _parser_for(filename, head):
+    """A CSV or JSON parser, by extension and then by the first character."""
+    if _JSON_NAME_RE.search(filename or ""):
+        return _JsonRecords()
+    if (filename or "").lower().endswith(".csv"):
+        return _CsvRecords()
+    return _JsonRecords() if head.lstrip()[:1] in ("[", "{") else _CsvRecords()
+
+
+# ─── Validation ───────────────────────────────────────────────────
+def _pick(record, field):
+    for alias in FIELD_ALIASES[field]:
+        value = record.get(alias)
+        if value is not None and (not isinstance(value, str) or value.strip()):
+            return value
+    return None
+
+
+def _coordinate(value, name, low, high):
+    if value is None:
+        raise ValueError(f"no {name}")
+    if isinstance(value, bool):
+        raise ValueError(f"{name} isn't a number")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} `{str(value)[:20]}` isn't a number")
+    if not math.isfinite(number):
+        raise ValueError(f"{name} isn't a number")
+    number = math.floor(number)  # the block it falls in
+    if not low <= number <= high:
+        raise ValueError(f"{name} {number} is outside {low}..{high}")
+    return number
+
+
+def to_pin(record, submitter_id, now):
+    """A pin dict from an imported record. Raises ValueError saying what's wrong with it."""
+    if not isinstance(record, dict):
+        raise ValueError("not an object")
+    record = {str(k).strip().lower(): v for k, v in record.items()}
+    x = _coordinate(_pick(record, "x"), "x", -MAX_COORD, MAX_COORD)
+    z = _coordinate(_pick(record, "z"), "z", -MAX_COORD, MAX_COORD)
+    y = _pick(record, "y")
+    y = None if y is None else _coordinate(y, "y", MIN_Y, MAX_Y)
+    description = _pick(record, "description")
+    if description is None:
+        raise ValueError("no description")
+    description = " ".join(str(description).split())[:MAX_DESC]
+
+    attributed = str(_pick(record, "attributed_user_id") or "").strip()
+    if not attributed.isdigit():
+        attributed = str(submitter_id)
+    timestamp = _pick(record, "timestamp")
+    try:
+        timestamp = datetime.fromisoformat(str(timestamp)).isoformat()
+    except ValueError:
+        timestamp = now
+    return {
+        "x": x,
+        "y": y,
+        "z": z,
+        "description": description,
+        "submitter_id": str(submitter_id),
+        "attributed_user_id": attributed,
+        "timestamp": timestamp,
+    }
+
+
+# ─── Import ───────────────────────────────────────────────────────
+async def download(url, chunk_size=CHUNK_SIZE):
+    """Yield an attachment's bytes as they arrive, over the shared session and the CDN's breaker."""
+    try:
+        async with open_stream("GET", url, timeout=120) as resp:
+            if resp.status != 200:
+                raise ValueError(f"Couldn't download the file (HTTP {resp.status}).")
+            async for chunk in resp.content.iter_chunked(chunk_size):
+                yield chunk
+    except (UpstreamError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+        raise ValueError(f"Couldn't download the file ({type(e).__name__}).")
+
+
+def _inflate(inflate, chunk):
+    """Decompress chunk CHUNK_SIZE bytes at a time, so the size cap is checked before much piles up."""
+    while chunk:
+        try:
+            out = inflate.decompress(chunk, CHUNK_SIZE)
+        except zlib.error:
+            raise ValueError("The file isn't valid gzip.")
+        chunk = inflate.unconsumed_tail
+        yield out
+
+
+async def import_pins(chunks, filename, submitter_id, store=None, index=None) -> ImportReport:
+    """Parse, validate and write pins from an async iterator of file bytes.
+
+    Rows are checked as they stream in; one lands within DEDUPE_RADIUS of
+    an existing pin (or an earlier row) counts as a duplicate. Nothing is
+    written unless the whole file parses, and then every accepted pin goes
+    in with one append_many() transaction. A .gz file is decompressed on
+    the fly. Raises ValueError if the file as a whole can't be read.
+    chunks is closed however this ends, so its connection is let go.
+    """
+    store = store or get_store()
+    index = index if index is not None else get_pin_index()
+    staged = PinIndex.scratch()
+    report = ImportReport()
+    pins = []
+    now = datetime.utcnow().isoformat()
+    text = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    inflate = None
+    parser = None
+    size = 0
+
+    async def take(rows):
+        """Stage valid, new rows; False once MAX_ROWS have been looked at."""
+        for row, record in rows:
+            if len(pins) + report.duplicates + report.invalid >= MAX_ROWS:
+                report.truncated = True
+                return False
+            try:
+                if record is None:
+                    raise ValueError("malformed JSON")
+                pin = to_pin(record, submitter_id, now)
+            except ValueError as e:
+                report.reject(row, str(e))
+                continue
+            x, z = pin["x"], pin["z"]
+            if await index.within(x, z, DEDUPE_RADIUS) or await staged.within(x, z, DEDUPE_RADIUS):
+                report.duplicates += 1
+                continue
+            staged.add(len(pins), pin)
+            pins.append(pin)
+        return True
+
+    async def read():
+        """Feed the file through the parser, stopping early once MAX_ROWS is reached."""
+        nonlocal filename, inflate, parser, size
+        first = True
+        async for chunk in chunks:
+            if first:
+                first = False
+                if (filename or "").lower().endswith(".gz") or chunk[:2] == b"\x1f\x8b":
+                    inflate = zlib.decompressobj(wbits=31)
+                    if (filename or "").lower().endswith(".gz"):
+                        filename = filename[:-3]
+            for piece in (_inflate(inflate, chunk) if inflate is not None else (chunk,)):
+                size += len(piece)  # after inflating, so a small .gz can't unpack into something huge
+                if size > MAX_BYTES:
+                    raise ValueError(f"The file is over {MAX_BYTES // (1024 * 1024)} MB.")
+                decoded = text.decode(piece)
+                if parser is None:
+                    if not decoded.strip():
+                        continue
+                    parser = _parser_for(filename, decoded)
+                if not await take(parser.feed(decoded)):
+                    return
+        decoded = text.decode(b"", final=True)
+        if parser is None:
+            parser = _parser_for(filename, decoded)
+        await take(parser.feed(decoded, final=True))
+
+    try:
+        await read()
+    finally:
+        aclose = getattr(chunks, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+    keys = await store.append_many("pins", pins)
+    report.inserted = list(zip(keys, pins))
+    return report
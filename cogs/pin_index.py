@@ -0,0 +1,204 @@
+# cogs/pin_index.py
+
+import math
+import heapq
+import asyncio
+
+from .datastore import get_store
+
+# ─── Configuration ────────────────────────────────────────────────
+CELL_SIZE = 256  # blocks per grid cell side; 16 chunks
+
+
+class PinIndex:
+    """Uniform grid over pin x/z coordinates.
+
+    Each cell holds the IDs of the pins inside it, so radius and nearest
+    queries only look at cells near the query point. Pins carry no
+    dimension, so everything lives on one plane; y rides along for display
+    and doesn't count towards distance. Keep it in sync with add()/remove()
+    after every pin write.
+    """
+
+    def __init__(self, store=None, cell_size=CELL_SIZE):
+        self.store = store or get_store()
+        self.cell_size = cell_size
+        self.cells = {}   # (cx, cz) → {pin_id}
+        self.coords = {}  # pin_id → (x, y, z)
+        self.labels = {}  # pin_id → description, for map captions
+        self.bounds = None  # (min cx, min cz, max cx, max cz) ever occupied; only grows
+        self._loaded = False
+        self._missed = False  # a pin changed while loading
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def scratch(cls, cell_size=CELL_SIZE):
+        """An empty index that never loads from the store, for staging pins before they're written."""
+        index = cls(store=object(), cell_size=cell_size)
+        index._loaded = True
+        return index
+
+    async def _ensure_loaded(self):
+        if self._loaded:
+            return
+        async with self._lock:
+            while not self._loaded:
+                self._missed = False
+                rows = await self.store.items("pins")
+                if self._missed:
+                    continue  # the read may predate it; go again
+                for pin_id, pin in rows:
+                    self.add(pin_id, pin)
+                self._loaded = True
+
+    def _cell(self, x, z):
+        return int(x) // self.cell_size, int(z) // self.cell_size
+
+    # ─── Maintenance ────────────────────────────────────────────────
+    def add(self, pin_id, pin):
+        """Index (or re-index) a pin."""
+        pin_id = str(pin_id)
+        self.remove(pin_id)
+        x, z = pin.get("x"), pin.get("z")
+        if x is None or z is None:
+            return
+        self.coords[pin_id] = (x, pin.get("y"), z)
+        self.labels[pin_id] = pin.get("description") or ""
+        cx, cz = cell = self._cell(x, z)
+        self.cells.setdefault(cell, set()).add(pin_id)
+        if self.bounds is None:
+            self.bounds = (cx, cz, cx, cz)
+        else:
+            x0, z0, x1, z1 = self.bounds
+            self.bounds = (min(x0, cx), min(z0, cz), max(x1, cx), max(z1, cz))
+
+    def remove(self, pin_id):
+        pin_id = str(pin_id)
+        if not self._loaded:
+            self._missed = True
+        old = self.coords.pop(pin_id, None)
+        self.labels.pop(pin_id, None)
+        if old is None:
+            return
+        cell = self._cell(old[0], old[2])
+        members = self.cells.get(cell)
+        if members is not None:
+            members.discard(pin_id)
+            if not members:
+                del self.cells[cell]
+
+    def reset(self):
+        """Drop everything; the next query reloads from the store."""
+        self.cells.clear()
+        self.coords.clear()
+        self.labels.clear()
+        self.bounds = None
+        self._loaded = False
+
+    # ─── Queries ────────────────────────────────────────────────────
+    def _distance(self, pin_id, x, z):
+        px, _, pz = self.coords[pin_id]
+        return math.hypot(px - x, pz - z)
+
+    def _cells_in_box(self, x0, z0, x1, z1):
+        (cx0, cz0), (cx1, cz1) = self._cell(x0, z0), self._cell(x1, z1)
+        if (cx1 - cx0 + 1) * (cz1 - cz0 + 1) > len(self.cells):
+            # Box spans more cells than are occupied: walk the occupied ones instead
+            for (cx, cz), members in self.cells.items():
+                if cx0 <= cx <= cx1 and cz0 <= cz <= cz1:
+                    yield members
+            return
+        for cx in range(cx0, cx1 + 1):
+            for cz in range(cz0, cz1 + 1):
+                members = self.cells.get((cx, cz))
+                if members:
+                    yield members
+
+    async def within(self, x, z, radius):
+        """[(distance, pin_id)] for pins within radius blocks of (x, z), nearest first."""
+        await self._ensure_loaded()
+        hits = []
+        for members in self._cells_in_box(x - radius, z - radius, x + radius, z + radius):
+            for pin_id in members:
+                d = self._distance(pin_id, x, z)
+                if d <= radius:
+                    hits.append((d, pin_id))
+        hits.sort(key=lambda hit: (hit[0], int(hit[1]) if hit[1].isdigit() else 0))
+        return hits
+
+    async def in_box(self, x0, z0, x1, z1):
+        """Pin IDs with x0 <= x <= x1 and z0 <= z <= z1."""
+        await self._ensure_loaded()
+        found = []
+        for members in self._cells_in_box(x0, z0, x1, z1):
+            for pin_id in members:
+                px, _, pz = self.coords[pin_id]
+                if x0 <= px <= x1 and z0 <= pz <= z1:
+                    found.append(pin_id)
+        return found
+
+    async def nearest(self, x, z, k=5):
+        """[(distance, pin_id)] for the k pins closest to (x, z), nearest first.
+
+        Searches square rings of cells outwards. Once ring r has been
+        scanned, nothing unscanned can be closer than r cells, so the
+        search stops as soon as the k-th best is within that bound.
+        """
+        await self._ensure_loaded()
+        if not self.cells or k <= 0:
+            return []
+        cx, cz = self._cell(x, z)
+        x0, z0, x1, z1 = self.bounds
+        max_ring = max(abs(cx - x0), abs(cx - x1), abs(cz - z0), abs(cz - z1))
+
+        best = []  # max-heap of (-distance, pin_id), size <= k
+        ring = 0
+        while ring <= max_ring:
+            if (2 * ring + 1) ** 2 > 4 * len(self.cells):
+                # The rings have outgrown the occupied area: finish with a pass over what's left
+                for (ox, oz), members in self.cells.items():
+                    if max(abs(ox - cx), abs(oz - cz)) >= ring:
+                        self._offer(best, members, x, z, k)
+                break
+            for ox, oz in _ring(cx, cz, ring):
+                members = self.cells.get((ox, oz))
+                if members:
+                    self._offer(best, members, x, z, k)
+            if len(best) == k and -best[0][0] <= ring * self.cell_size:
+                break
+            ring += 1
+        return sorted((-neg, pin_id) for neg, pin_id in best)
+
+    def _offer(self, best, members, x, z, k):
+        for pin_id in members:
+            d = self._distance(pin_id, x, z)
+            if len(best) < k:
+                heapq.heappush(best, (-d, pin_id))
+            elif d < -best[0][0]:
+                heapq.heapreplace(best, (-d, pin_id))
+
+    def __len__(self):
+        return len(self.coords)
+
+
+def _ring(cx, cz, r):
+    """Cells at Chebyshev distance exactly r from (cx, cz)."""
+    if r == 0:
+        yield cx, cz
+        return
+    for dx in range(-r, r + 1):
+        yield cx + dx, cz - r
+        yield cx + dx, cz + r
+    for dz in range(-r + 1, r):
+        yield cx - r, cz + dz
+        yield cx + r, cz + dz
+
+
+_index = None
+
+
+def get_pin_index() -> PinIndex:
+    global _index
+    if _index is None:
+        _index = PinIndex()
+    return _index
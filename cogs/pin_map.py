@@ -0,0 +1,216 @@
+# cogs/pin_map.py
+
+import io
+import os
+import math
+import asyncio
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:  # in requirements.txt (Pillow>=10.1); !pinmap says so if it's missing
+    Image = None
+
+from .pin_index import get_pin_index
+
+# ─── Configuration ────────────────────────────────────────────────
+TILE_PX         = 256
+MAX_ZOOM        = 6     # 1 block per pixel
+MIN_ZOOM        = 0     # 64 blocks per pixel
+DEFAULT_ZOOM    = 3
+VIEW_SIZE       = (768, 512)
+CLUSTER_PX      = 28    # pins closer than this (on the global pixel grid) merge into one marker
+LABEL_MARGIN_PX = 160   # neighbours this far outside a tile still get drawn, so labels cross seams
+LABEL_CHARS     = 24
+TILE_CACHE_SIZE = int(os.getenv("PINMAP_TILE_CACHE", 512))
+RENDER_WORKERS  = int(os.getenv("PINMAP_WORKERS", 1))
+
+BACKGROUND = (30, 27, 43)
+GRID       = (48, 44, 66)
+AXIS       = (90, 80, 130)
+PIN        = (180, 140, 255)
+CLUSTER    = (255, 170, 80)
+TEXT       = (235, 235, 245)
+
+
+def available() -> bool:
+    return Image is not None
+
+
+def blocks_per_px(zoom) -> int:
+    return 2 ** (MAX_ZOOM - zoom)
+
+
+# ─── Rendering (runs in the worker process) ───────────────────────
+def _clusters(pins, bpp):
+    """Group (id, x, z, label) pins into buckets on the global pixel grid."""
+    buckets = {}
+    for pin in pins:
+        gx, gz = pin[1] / bpp, pin[2] / bpp
+        buckets.setdefault((int(gx // CLUSTER_PX), int(gz // CLUSTER_PX)), []).append((gx, gz, pin))
+    for members in buckets.values():
+        gx = sum(m[0] for m in members) / len(members)
+        gz = sum(m[1] for m in members) / len(members)
+        yield gx, gz, [m[2] for m in members]
+
+
+def render_tile(zoom, tx, tz, pins) -> bytes:
+    """PNG for one tile. pins: [(id, x, z, label)] in and around it."""
+    bpp = blocks_per_px(zoom)
+    image = Image.new("RGB", (TILE_PX, TILE_PX), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default()
+    ox, oz = tx * TILE_PX, tz * TILE_PX  # tile origin in global pixels
+
+    # Grid every 512 blocks at close zooms, coarser further out
+    step = max(512, bpp * 64)
+    first_x = math.ceil(ox * bpp / step) * step
+    for bx in range(first_x, (ox + TILE_PX) * bpp, step):
+        px = bx // bpp - ox
+        draw.line([(px, 0), (px, TILE_PX)], fill=AXIS if bx == 0 else GRID)
+    first_z = math.ceil(oz * bpp / step) * step
+    for bz in range(first_z, (oz + TILE_PX) * bpp, step):
+        pz = bz // bpp - oz
+        draw.line([(0, pz), (TILE_PX, pz)], fill=AXIS if bz == 0 else GRID)
+
+    for gx, gz, members in _clusters(pins, bpp):
+        px, pz = gx - ox, gz - oz
+        if len(members) > 1:
+            r = min(16, 6 + 2 * int(math.log2(len(members))))
+            draw.ellipse([px - r, pz - r, px + r, pz + r], fill=CLUSTER, outline=BACKGROUND)
+            text = str(len(members))
+            draw.text((px - 3 * len(text), pz - 6), text, fill=BACKGROUND, font=font)
+        else:
+            pin_id, _, _, label = members[0]
+            draw.ellipse([px - 4, pz - 4, px + 4, pz + 4], fill=PIN, outline=TEXT)
+            try:
+                draw.text((px + 7, pz - 6), label, fill=TEXT, font=font)
+            except UnicodeEncodeError:
+                # Pillow before 10.1 only has a latin-1 bitmap default font
+                draw.text((px + 7, pz - 6), f"#{pin_id}", fill=TEXT, font=font)
+
+    out = io.BytesIO()
+    image.save(out, "PNG", optimize=True)
+    return out.getvalue()
+
+
+def compose_view(tiles, left, top, size) -> bytes:
+    """Stitch {(tx, tz): png} into one PNG whose top-left is global pixel (left, top)."""
+    view = Image.new("RGB", size, BACKGROUND)
+    for (tx, tz), png in tiles.items():
+        with Image.open(io.BytesIO(png)) as tile:
+            view.paste(tile, (tx * TILE_PX - left, tz * TILE_PX - top))
+    out = io.BytesIO()
+    view.save(out, "PNG", optimize=True)
+    return out.getvalue()
+
+
+# ─── Tiles and cache (bot side) ───────────────────────────────────
+class PinMap:
+    """Top-down pin maps assembled from cached tiles.
+
+    A tile is keyed by (zoom, tile x, tile z, version), where the version
+    hashes the pins drawn on it (its own plus the label margin). Editing a
+    pin changes the version of the few tiles it appears on, so only those
+    get redrawn. Rendering happens in a worker process.
+    """
+
+    def __init__(self, index=None, cache_size=TILE_CACHE_SIZE):
+        self.index = index if index is not None else get_pin_index()  # an unloaded index is empty, so falsy
+        self.cache = OrderedDict()  # (zoom, tx, tz, version) → png, least recently used first
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._pool = None
+        self._pending = {}  # key → future, so concurrent views share one render
+
+    def _executor(self):
+        if self._pool is None:
+            # Spawn, not fork: the bot process has an event loop, open sessions and a browser subprocess
+            self._pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS, mp_context=get_context("spawn"))
+        return self._pool
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _tile_pins(self, zoom, tx, tz):
+        bpp = blocks_per_px(zoom)
+        margin = LABEL_MARGIN_PX * bpp
+        x0, z0 = tx * TILE_PX * bpp, tz * TILE_PX * bpp
+        ids = await self.index.in_box(x0 - margin, z0 - margin, x0 + TILE_PX * bpp + margin, z0 + TILE_PX * bpp + margin)
+        pins = []
+        for pin_id in sorted(ids):
+            x, _, z = self.index.coords[pin_id]
+            label = self.index.labels.get(pin_id) or f"#{pin_id}"
+            pins.append((pin_id, x, z, label[:LABEL_CHARS]))
+        return pins
+
+    @staticmethod
+    def _version(pins) -> str:
+        return hashlib.blake2b(repr(pins).encode("utf-8"), digest_size=8).hexdigest()
+
+    async def _tile(self, zoom, tx, tz):
+        pins = await self._tile_pins(zoom, tx, tz)
+        key = (zoom, tx, tz, self._version(pins))
+        png = self.cache.get(key)
+        if png is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return png
+        future = self._pending.get(key)
+        if future is None:
+            self.misses += 1
+            future = self._pending[key] = asyncio.ensure_future(self._render(zoom, tx, tz, pins))
+        try:
+            png = await future
+        finally:
+            self._pending.pop(key, None)
+        self.cache[key] = png
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return png
+
+    async def _render(self, zoom, tx, tz, pins):
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            pool = self._executor()
+            try:
+                return await loop.run_in_executor(pool, render_tile, zoom, tx, tz, pins)
+            except BrokenProcessPool:
+                # A worker died (killed, out of memory); every later submit would fail too, so start a new pool
+                if self._pool is pool:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    self._pool = None
+                if attempt:
+                    raise
+                print("[Pin Map] Render worker died; restarting the pool")
+
+    async def render(self, x, z, zoom=DEFAULT_ZOOM, size=VIEW_SIZE) -> bytes:
+        """PNG of the area centred on block (x, z)."""
+        zoom = max(MIN_ZOOM, min(MAX_ZOOM, zoom))
+        bpp = blocks_per_px(zoom)
+        left = int(x // bpp) - size[0] // 2
+        top = int(z // bpp) - size[1] // 2
+        keys = [(tx, tz)
+                for tz in range(top // TILE_PX, (top + size[1] - 1) // TILE_PX + 1)
+                for tx in range(left // TILE_PX, (left + size[0] - 1) // TILE_PX + 1)]
+        pngs = await asyncio.gather(*(self._tile(zoom, tx, tz) for tx, tz in keys))
+        tiles = dict(zip(keys, pngs))
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor(), compose_view, tiles, left, top, size)
+
+
+_map = None
+
+
+def get_pin_map() -> PinMap:
+    global _map
+    if _map is None:
+        _map = PinMap()
+    return _map
@@ -0,0 +1,228 @@
+# cogs/pin_search.py
+
+import re
+import math
+import asyncio
+from bisect import bisect_left, insort
+from datetime import datetime
+
+from .datastore import get_store
+
+# ─── Configuration ────────────────────────────────────────────────
+PAGE_SIZE      = 10
+NEAR_RADIUS    = 500  # near:x,z without a radius
+EXACT_WEIGHT   = 3.0  # how much a term counts, by how it matched a token
+PREFIX_WEIGHT  = 2.0
+TRIGRAM_WEIGHT = 1.0
+
+_TOKEN_RE = re.compile(r"\w+")
+_FILTER_RE = re.compile(r"^(user|near|after|page):(.+)$", re.IGNORECASE)
+
+
+def tokenize(text) -> list:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def trigrams(token) -> set:
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+class SearchQuery:
+    """A parsed search: free-text terms plus user:, near:, after: and page: filters."""
+
+    __slots__ = ("terms", "user", "near", "after", "page")
+
+    def __init__(self, terms=(), user=None, near=None, after=None, page=1):
+        self.terms = list(terms)
+        self.user = user    # raw user: text; the cog turns it into an ID
+        self.near = near    # (x, z, radius)
+        self.after = after  # ISO timestamp prefix
+        self.page = page
+
+
+def parse_query(text) -> SearchQuery:
+    """Parse `words user:@x near:x,z[,r] after:2025-01-01 page:2`. Raises ValueError on a bad filter."""
+    query = SearchQuery()
+    words = []
+    for part in (text or "").split():
+        match = _FILTER_RE.match(part)
+        if not match:
+            words.append(part)
+            continue
+        key, value = match.group(1).lower(), match.group(2)
+        if key == "user":
+            query.user = value
+        elif key == "near":
+            try:
+                numbers = [int(float(n)) for n in value.split(",")]
+            except ValueError:
+                raise ValueError("near: takes `x,z` or `x,z,radius`.")
+            if len(numbers) not in (2, 3) or (len(numbers) == 3 and numbers[2] <= 0):
+                raise ValueError("near: takes `x,z` or `x,z,radius`.")
+            query.near = (numbers[0], numbers[1], numbers[2] if len(numbers) == 3 else NEAR_RADIUS)
+        elif key == "after":
+            try:
+                query.after = datetime.fromisoformat(value).isoformat()
+            except ValueError:
+                raise ValueError("after: takes a date like `2025-01-31`.")
+        elif key == "page":
+            if not value.isdigit() or int(value) < 1:
+                raise ValueError("page: takes a page number.")
+            query.page = int(value)
+    query.terms = tokenize(" ".join(words))
+    return query
+
+
+class PinSearch:
+    """Inverted index over pin descriptions and attributed users.
+
+    Tokens map to the pins containing them; a sorted vocabulary answers
+    prefix lookups and a trigram map finds tokens containing a fragment.
+    Results are ranked by tf-idf weighted by how each term matched, then
+    by recency. Keep it in sync with add()/remove() after every pin write.
+    """
+
+    def __init__(self, store=None):
+        self.store = store or get_store()
+        self.postings = {}   # token → {pin_id: count}
+        self.vocab = []      # sorted tokens, for prefix lookups
+        self.grams = {}      # trigram → {token}
+        self.by_user = {}    # attributed user ID → {pin_id}
+        self.docs = {}       # pin_id → (tokens, attributed user ID, timestamp)
+        self._loaded = False
+        self._missed = False  # a pin changed while loading
+        self._lock = asyncio.Lock()
+
+    async def _ensure_loaded(self):
+        if self._loaded:
+            return
+        async with self._lock:
+            while not self._loaded:
+                self._missed = False
+                rows = await self.store.items("pins")
+                if self._missed:
+                    continue  # the read may predate it; go again
+                for pin_id, pin in rows:
+                    self.add(pin_id, pin)
+                self._loaded = True
+
+    # ─── Maintenance ────────────────────────────────────────────────
+    def add(self, pin_id, pin):
+        """Index (or re-index) a pin."""
+        pin_id = str(pin_id)
+        self.remove(pin_id)
+        tokens = tokenize(pin.get("description"))
+        user = str(pin.get("attributed_user_id", ""))
+        self.docs[pin_id] = (tokens, user, pin.get("timestamp") or "")
+        for token in tokens:
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = {}
+                insort(self.vocab, token)
+                for gram in trigrams(token):
+                    self.grams.setdefault(gram, set()).add(token)
+            posting[pin_id] = posting.get(pin_id, 0) + 1
+        self.by_user.setdefault(user, set()).add(pin_id)
+
+    def remove(self, pin_id):
+        pin_id = str(pin_id)
+        if not self._loaded:
+            self._missed = True
+        doc = self.docs.pop(pin_id, None)
+        if doc is None:
+            return
+        tokens, user, _ = doc
+        for token in set(tokens):
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+            posting.pop(pin_id, None)
+            if not posting:
+                del self.postings[token]
+                del self.vocab[bisect_left(self.vocab, token)]
+                for gram in trigrams(token):
+                    self.grams[gram].discard(token)
+                    if not self.grams[gram]:
+                        del self.grams[gram]
+        pins = self.by_user.get(user)
+        if pins is not None:
+            pins.discard(pin_id)
+            if not pins:
+                del self.by_user[user]
+
+    def reset(self):
+        for table in (self.postings, self.grams, self.by_user, self.docs):
+            table.clear()
+        self.vocab.clear()
+        self._loaded = False
+
+    # ─── Lookup ─────────────────────────────────────────────────────
+    def _expand(self, term):
+        """{token: weight} for the tokens a query term matches."""
+        matches = {}
+        i = bisect_left(self.vocab, term)
+        while i < len(self.vocab) and self.vocab[i].startswith(term):
+            token = self.vocab[i]
+            matches[token] = EXACT_WEIGHT if token == term else PREFIX_WEIGHT
+            i += 1
+        grams = trigrams(term)
+        if grams:
+            candidates = set.intersection(*(self.grams.get(g, set()) for g in grams))
+            for token in candidates:
+                if term in token:
+                    matches.setdefault(token, TRIGRAM_WEIGHT)
+        return matches
+
+    async def search(self, query: SearchQuery, user_id=None, near_ids=None):
+        """(page of pin IDs, total matches) for query.
+
+        user_id and near_ids are the resolved user: and near: filters
+        (near_ids: {pin_id: distance}); with no terms, near: results come
+        back closest first and everything else newest first.
+        """
+        await self._ensure_loaded()
+        total_docs = max(1, len(self.docs))
+        scores = None
+        for term in query.terms:
+            term_scores = {}
+            for token, weight in self._expand(term).items():
+                posting = self.postings[token]
+                idf = math.log(1 + total_docs / len(posting))
+                for pin_id, count in posting.items():
+                    term_scores[pin_id] = max(term_scores.get(pin_id, 0.0), weight * idf * (1 + math.log(count)))
+            if term in self.docs:  # a bare pin ID
+                term_scores[term] = term_scores.get(term, 0.0) + EXACT_WEIGHT * math.log(1 + total_docs)
+            # Every term has to match something (AND), scores add up
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {pid: s + term_scores[pid] for pid, s in scores.items() if pid in term_scores}
+            if not scores:
+                return [], 0
+
+        candidates = set(scores) if scores is not None else set(self.docs)
+        if user_id is not None:
+            candidates &= self.by_user.get(str(user_id), set())
+        if near_ids is not None:
+            candidates &= set(near_ids)
+        if query.after:
+            candidates = {pid for pid in candidates if self.docs[pid][2] > query.after}
+
+        # Newest first, then (stable) by relevance or distance when there is one
+        ordered = sorted(candidates, key=lambda pid: self.docs[pid][2], reverse=True)
+        if scores is not None:
+            ordered.sort(key=lambda pid: -scores[pid])
+        elif near_ids is not None:
+            ordered.sort(key=lambda pid: near_ids[pid])
+        start = (query.page - 1) * PAGE_SIZE
+        return ordered[start:start + PAGE_SIZE], len(ordered)
+
+
+_search = None
+
+
+def get_pin_search() -> PinSearch:
+    global _search
+    if _search is None:
+        _search = PinSearch()
+    return _search
@@ -3,12 +3,17 @@
 import discord
 from discord.ext import commands
 from typing import Union
-import json
-import os
-import csv
+import io
+import re
 from datetime import datetime
+from collections import OrderedDict
+from .datastore import get_store
+from .pin_index import get_pin_index
+from .pin_search import get_pin_search, parse_query, PAGE_SIZE
+from .pin_export import export_pins, parse_export_args, group_for_upload, DEFAULT_LIMIT
+from .pin_import import import_pins, download, MAX_BYTES as IMPORT_MAX_BYTES, MAX_ROWS as IMPORT_MAX_ROWS
+from . import pin_map
 
-PIN_DATA_FILE = "data/pins.json"
 SUBMITTER_MAP = {
     "1": 448896936481652777,  # you
     "2": 777345438495277076, # Lex
@@ -17,21 +22,43 @@ SUBMITTER_MAP = {
     "5": 1276777730762870837   # Addy
 }
 DEV_IDS = [448896936481652777]  # you
-
-def load_pins():
-    if not os.path.exists(PIN_DATA_FILE):
-        return {}
-    with open(PIN_DATA_FILE, "r") as f:
-        return json.load(f)
-
-def save_pins(data):
-    os.makedirs(os.path.dirname(PIN_DATA_FILE), exist_ok=True)
-    with open(PIN_DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+RECENT_PINS = 50  # newest pins kept in memory for !pins
 
 class PinPoint(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.store = get_store()
+        self.index = get_pin_index()
+        self.search = get_pin_search()
+        self.recent = None  # OrderedDict of the newest pins, oldest first; loaded on first use
+        self.map = pin_map.get_pin_map()
+
+    async def cog_unload(self):
+        self.map.shutdown()
+
+    def _indexed(self, pin_id, pin=None):
+        """Bring the spatial and text indexes in line with a pin write (pin=None: deleted)."""
+        for index in (self.index, self.search):
+            if pin is None:
+                index.remove(pin_id)
+            else:
+                index.add(pin_id, pin)
+        if self.recent is None:
+            return
+        if pin is None:
+            self.recent.pop(pin_id, None)
+            if not self.recent:
+                self.recent = None  # refill from the store next time
+        else:
+            self.recent[pin_id] = pin  # an edit keeps its place; a new pin goes on the end
+            while len(self.recent) > RECENT_PINS:
+                self.recent.popitem(last=False)
+
+    async def _recent_pins(self, count):
+        if self.recent is None or len(self.recent) < count:
+            rows = await self.store.items("pins", reverse=True, limit=RECENT_PINS)
+            self.recent = OrderedDict(reversed(rows))
+        return list(self.recent.items())[-count:]
 
     @commands.command(name="mark")
     async def mark(self, ctx, x: int, y_or_desc: str, z: int, *, description: str = None):
@@ -48,13 +75,11 @@ class PinPoint(commands.Cog):
             y = None
             desc = f"{y_or_desc} {description}" if description else y_or_desc
 
-        pins = load_pins()
-        pin_id = str(max([int(k) for k in pins.keys()] + [0]) + 1)
         timestamp = datetime.utcnow().isoformat()
         submitter_id = str(ctx.author.id)
         attributed_id = str(ctx.author.id)
     
-        pins[pin_id] = {
+        pin = {
             "x": x,
             "y": y,
             "z": z,
@@ -63,8 +88,8 @@ class PinPoint(commands.Cog):
             "attributed_user_id": attributed_id,
             "timestamp": timestamp
         }
-    
-        save_pins(pins)
+        pin_id = await self.store.append("pins", pin)
+        self._indexed(pin_id, pin)
         embed = discord.Embed(title=f"📍 {desc}", color=0x462f80)
         coord_field = f"x: {x}, z: {z}" if y is None else f"x: {x}, y: {y}, z: {z}"
         embed.add_field(name="🧭 Coordinates", value=coord_field, inline=False)
@@ -74,14 +99,13 @@ class PinPoint(commands.Cog):
 
     @commands.command(name="pins")
     async def pins(self, ctx):
-        pins = load_pins()
-        if not pins:
+        recent = await self._recent_pins(5)
+        if not recent:
             await ctx.send("📭 No pins found.")
             return
     
         embed = discord.Embed(title="📌 Recent Pins", color=0x462f80)
     
-        recent = sorted(pins.items(), key=lambda item: int(item[0]))[-5:]
         for pid, p in recent:
             user_id = int(p["attributed_user_id"])
             user = self.bot.get_user(user_id)
@@ -112,10 +136,7 @@ class PinPoint(commands.Cog):
             y = None
             desc = f"{y_or_desc} {description}" if description else y_or_desc
     
-        pins = load_pins()
-        pin_id = str(max([int(k) for k in pins.keys()] + [0]) + 1)
-    
-        pins[pin_id] = {
+        pin = {
             "x": x,
             "y": y,
             "z": z,
@@ -124,8 +145,8 @@ class PinPoint(commands.Cog):
             "attributed_user_id": str(attributed.id),
             "timestamp": datetime.utcnow().isoformat()
         }
-    
-        save_pins(pins)
+        pin_id = await self.store.append("pins", pin)
+        self._indexed(pin_id, pin)
     
         embed = discord.Embed(title=f"📍 {desc}", color=0x462f80)
         coord_field = f"x: {x}, z: {z}" if y is None else f"x: {x}, y: {y}, z: {z}"
@@ -149,8 +170,7 @@ class PinPoint(commands.Cog):
 
     @commands.command(name="pin")
     async def pin(self, ctx, pin_id: str):
-        pins = load_pins()
-        pin = pins.get(pin_id)
+        pin = await self.store.get("pins", pin_id)
         if not pin:
             await ctx.send("❌ Pin not found.")
             return
@@ -175,37 +195,110 @@ class PinPoint(commands.Cog):
         await ctx.send(embed=embed)
 
 
-    @commands.command(name="filterpins")
+    def _resolve_user(self, ctx, text):
+        mention = re.match(r"^<@!?(\d+)>$", text)
+        if mention:
+            return int(mention.group(1))
+        if text.isdigit():
+            return int(text)
+        member = ctx.guild.get_member_named(text.lstrip("@")) if ctx.guild else None
+        return member.id if member else None
+
+    @commands.command(name="filterpins", aliases=["searchpins", "findpins"])
     async def filterpins(self, ctx, *, query: str):
-        pins = load_pins()
-        results = []
-
-        for pid, pin in pins.items():
-            if (
-                query in pin["description"]
-                or query in pid
-                or query in pin["submitter_id"]
-                or query in pin["attributed_user_id"]
-            ):
-                results.append((pid, pin))
-
-        if not results:
-            await ctx.send("❌ No pins matched your filter.")
+        """Search pins. Usage: !filterpins words user:@who near:x,z[,radius] after:2025-01-31 page:2"""
+        try:
+            parsed = parse_query(query)
+        except ValueError as e:
+            await ctx.send(f"❗ {e}")
+            return
+
+        user_id = None
+        if parsed.user is not None:
+            user_id = self._resolve_user(ctx, parsed.user)
+            if user_id is None:
+                await ctx.send(f"❗ Couldn't find a user matching `{parsed.user}`.")
+                return
+        near_ids = None
+        if parsed.near is not None:
+            near_ids = {pid: d for d, pid in await self.index.within(*parsed.near)}
+
+        page_ids, total = await self.search.search(parsed, user_id=user_id, near_ids=near_ids)
+        if not page_ids:
+            await ctx.send("❌ No pins matched your filter." if total == 0 else f"❌ There's no page {parsed.page}.")
             return
 
+        pages = (total + PAGE_SIZE - 1) // PAGE_SIZE
         embed = discord.Embed(title="🔎 Filtered Pins", color=0x462f80)
-        for pid, pin in results[:10]:
+        for pid in page_ids:
+            pin = await self.store.get("pins", pid)
+            if pin is None:
+                continue
             user = self.bot.get_user(int(pin["attributed_user_id"])) or f"<@{pin['attributed_user_id']}>"
             embed.add_field(name=f"{pin['description']} (ID {pid})",
                             value=f"x: {pin['x']}, z: {pin['z']} — by {user}",
                             inline=False)
+        embed.set_footer(text=f"Page {parsed.page}/{pages} • {total} match(es) • add page:N for more")
+
+        await ctx.send(embed=embed)
 
+    async def _send_nearby(self, ctx, title, hits):
+        embed = discord.Embed(title=title, color=0x462f80)
+        for distance, pid in hits[:10]:
+            pin = await self.store.get("pins", pid)
+            if pin is None:
+                continue
+            coords = f"x: {pin['x']}, z: {pin['z']}"
+            if pin.get("y") is not None:
+                coords = f"x: {pin['x']}, y: {pin['y']}, z: {pin['z']}"
+            embed.add_field(name=f"📍 {pin['description']} (ID {pid})",
+                            value=f"{coords} — {distance:,.0f} blocks away",
+                            inline=False)
+        if len(hits) > 10:
+            embed.set_footer(text=f"Showing the closest 10 of {len(hits)}")
         await ctx.send(embed=embed)
 
+    @commands.command(name="nearpins", aliases=["near"])
+    async def nearpins(self, ctx, x: int, z: int, radius: int = 500):
+        """Pins within radius blocks of x z. Usage: !nearpins x z [radius]"""
+        if radius <= 0:
+            await ctx.send("❗ Radius has to be positive.")
+            return
+        hits = await self.index.within(x, z, radius)
+        if not hits:
+            await ctx.send(f"📭 No pins within {radius:,} blocks of x: {x}, z: {z}.")
+            return
+        await self._send_nearby(ctx, f"🧭 {len(hits)} pin(s) within {radius:,} blocks of x: {x}, z: {z}", hits)
+
+    @commands.command(name="nearest")
+    async def nearest(self, ctx, x: int, z: int, k: int = 5):
+        """The k pins closest to x z. Usage: !nearest x z [k]"""
+        hits = await self.index.nearest(x, z, max(1, min(k, 10)))
+        if not hits:
+            await ctx.send("📭 No pins found.")
+            return
+        await self._send_nearby(ctx, f"🧭 Closest pins to x: {x}, z: {z}", hits)
+
+    @commands.command(name="pinmap", aliases=["map"])
+    @commands.cooldown(2, 20, commands.BucketType.user)
+    async def pinmap(self, ctx, x: int = 0, z: int = 0, zoom: int = pin_map.DEFAULT_ZOOM):
+        """Top-down map of pins around x z. Usage: !pinmap [x z zoom] (zoom 0 = far out, 6 = 1 block per pixel)"""
+        if not pin_map.available():
+            await ctx.send("🗺️ Map rendering needs Pillow on the bot host (`pip install Pillow`).")
+            return
+        zoom = max(pin_map.MIN_ZOOM, min(pin_map.MAX_ZOOM, zoom))
+        async with ctx.typing():
+            png = await self.map.render(x, z, zoom)
+
+        span = pin_map.VIEW_SIZE[0] * pin_map.blocks_per_px(zoom)
+        embed = discord.Embed(title=f"🗺️ Pins around x: {x}, z: {z}", color=0x462f80)
+        embed.set_image(url="attachment://pinmap.png")
+        embed.set_footer(text=f"Zoom {zoom} • {span:,} blocks across • tiles cached {self.map.hits}/{self.map.hits + self.map.misses}")
+        await ctx.send(embed=embed, file=discord.File(io.BytesIO(png), filename="pinmap.png"))
+
     @commands.command(name="editpin")
     async def editpin(self, ctx, pin_id: str, *, new_desc: str):
-        pins = load_pins()
-        pin = pins.get(pin_id)
+        pin = await self.store.get("pins", pin_id)
         if not pin:
             await ctx.send("❌ Pin not found.")
             return
@@ -218,13 +311,13 @@ class PinPoint(commands.Cog):
             return
     
         pin["description"] = new_desc
-        save_pins(pins)
+        await self.store.put("pins", pin_id, pin)
+        self._indexed(pin_id, pin)
         await ctx.send(f"✏️ Pin `{pin_id}` updated.")
 
     @commands.command(name="deletepin")
     async def deletepin(self, ctx, pin_id: str):
-        pins = load_pins()
-        pin = pins.get(pin_id)
+        pin = await self.store.get("pins", pin_id)
         if not pin:
             await ctx.send("❌ Pin not found.")
             return
@@ -236,8 +329,8 @@ class PinPoint(commands.Cog):
             await ctx.send("🚫 You can't delete this pin.")
             return
 
-        del pins[pin_id]
-        save_pins(pins)
+        await self.store.delete("pins", pin_id)
+        self._indexed(pin_id)
         await ctx.send(f"🗑️ Pin `{pin_id}` deleted.")
 
     @commands.command(name="pinhelp", aliases=["pincmds", "pinmanual"])
@@ -250,45 +343,91 @@ class PinPoint(commands.Cog):
         embed.add_field(name="!mark x z description", value="Add a new pin at coordinates with a short description.", inline=False)
         embed.add_field(name="!pins", value="List the latest 5 pins added.", inline=False)
         embed.add_field(name="!pin ID", value="View detailed info on a specific pin.", inline=False)
-        embed.add_field(name="!filterpins query", value="Search for pins by keyword, user ID, or description.", inline=False)
+        embed.add_field(name="!filterpins query", value="Search pin descriptions; narrow with `user:@who`, `near:x,z[,radius]`, `after:2025-01-31` and `page:2`.", inline=False)
+        embed.add_field(name="!nearpins x z [radius]", value="Pins within a radius (default 500 blocks) of a spot.", inline=False)
+        embed.add_field(name="!pinmap [x z zoom]", value="Render a map of pins around a spot (zoom 0-6).", inline=False)
+        embed.add_field(name="!nearest x z [k]", value="The k closest pins to a spot (default 5, max 10).", inline=False)
         embed.add_field(name="!editpin ID new description", value="Edit your own or dev-assigned pin's description.", inline=False)
         embed.add_field(name="!deletepin ID", value="Delete your own or dev-assigned pin.", inline=False)
-        embed.add_field(name="!exportpins", value="Export all pins as `.json` and `.csv` files.", inline=False)
+        embed.add_field(name="!importpins + attached file", value="Bulk-add pins from a CSV or JSON file (admin-only); pins on top of existing ones are skipped.", inline=False)
+        embed.add_field(name="!exportpins [formats] [filters]", value="Export pins as `jsonl`, `csv` and/or `geojson` (add `gz` to compress), filtered by `user:`, `near:`, `box:`, `after:` or `before:`.", inline=False)
         embed.set_footer(text="PinPoint • Map tracking for explorers and troublemakers 🗺️")
 
         await ctx.send(embed=embed)
 
     @commands.command(name="exportpins")
-    async def exportpins(self, ctx):
-        pins = load_pins()
-        if not pins:
+    async def exportpins(self, ctx, *, options: str = ""):
+        """Export pins. Usage: !exportpins [jsonl] [csv] [geojson] [gz] [user:@who] [near:x,z,r] [box:x1,z1,x2,z2] [after:date] [before:date]"""
+        try:
+            formats, compress, user, match = parse_export_args(options)
+        except ValueError as e:
+            await ctx.send(f"❗ {e}")
+            return
+        if user is not None:
+            match.user_id = self._resolve_user(ctx, user)
+            if match.user_id is None:
+                await ctx.send(f"❗ Couldn't find a user matching `{user}`.")
+                return
+
+        # Leave room for the rest of the upload request
+        limit = (getattr(ctx.guild, "filesize_limit", None) or DEFAULT_LIMIT) - 64 * 1024
+        files, count = await export_pins(formats, match, compress=compress, limit=limit)
+        if not count:
             await ctx.send("<:report:1388586505693302968> No pins to export.")
             return
 
-        json_path = "/mnt/data/pin_export.json"
-        csv_path = "/mnt/data/pin_export.csv"
-
-        with open(json_path, "w") as f:
-            json.dump(pins, f, indent=4)
-
-        with open(csv_path, "w", newline="") as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(["ID", "X", "Z", "Description", "Submitter", "Attributed", "Timestamp"])
-            for pid, pin in pins.items():
-                writer.writerow([
-                    pid,
-                    pin["x"],
-                    pin["z"],
-                    pin["description"],
-                    pin["submitter_id"],
-                    pin["attributed_user_id"],
-                    pin["timestamp"]
-                ])
-
-        await ctx.send("<:report:1388586505693302968> Pins exported:", files=[
-            discord.File(json_path),
-            discord.File(csv_path)
-        ])
+        messages = group_for_upload(files, limit)
+        for i, group in enumerate(messages, start=1):
+            label = f"<:report:1388586505693302968> Exported {count} pin(s)"
+            if len(messages) > 1:
+                label += f" ({i}/{len(messages)})"
+            await ctx.send(label + ":", files=[discord.File(io.BytesIO(data), filename=name) for name, data in group])
+
+    @commands.command(name="importpins")
+    @commands.has_permissions(administrator=True)
+    @commands.max_concurrency(1)
+    async def importpins(self, ctx):
+        """Bulk-add pins from an attached CSV (X, Y, Z, Description...) or JSON/JSONL/GeoJSON file, optionally .gz."""
+        if not ctx.message.attachments:
+            await ctx.send("❗ Attach a CSV or JSON file of pins, e.g. one made by `!exportpins`.")
+            return
+        attachment = ctx.message.attachments[0]
+        if attachment.size > IMPORT_MAX_BYTES:
+            await ctx.send(f"❗ That file is too big; the limit is {IMPORT_MAX_BYTES // (1024 * 1024)} MB.")
+            return
+
+        async with ctx.typing():
+            try:
+                report = await import_pins(download(attachment.url), attachment.filename, ctx.author.id)
+            except ValueError as e:
+                await ctx.send(f"❗ {e} Nothing was imported.")
+                return
+        for pin_id, pin in report.inserted:
+            self._indexed(pin_id, pin)
+
+        embed = discord.Embed(title=f"📥 Imported {attachment.filename}", color=0x462f80)
+        embed.add_field(name="Inserted", value=str(len(report.inserted)), inline=True)
+        embed.add_field(name="Skipped (duplicates)", value=str(report.duplicates), inline=True)
+        embed.add_field(name="Invalid", value=str(report.invalid), inline=True)
+        if report.inserted:
+            embed.add_field(name="IDs", value=f"{report.inserted[0][0]}–{report.inserted[-1][0]}", inline=False)
+        if report.errors:
+            lines = [f"Row {row}: {reason}" for row, reason in report.errors]
+            if report.invalid > len(report.errors):
+                lines.append(f"…and {report.invalid - len(report.errors)} more")
+            embed.add_field(name="Problems", value="\n".join(lines)[:1024], inline=False)
+        if report.truncated:
+            embed.set_footer(text=f"Stopped after {IMPORT_MAX_ROWS} rows; import the rest separately.")
+        await ctx.send(embed=embed)
+
+    @importpins.error
+    async def importpins_error(self, ctx, error):
+        if isinstance(error, commands.MissingPermissions):
+            await ctx.send("🚫 You need admin permissions to use this command.")
+        elif isinstance(error, commands.MaxConcurrencyReached):
+            await ctx.send("⏳ An import is already running, try again when it's done.")
+        else:
+            await ctx.send("⚠️ An error occurred while importing pins.")
 
 async def setup(bot):
     await bot.add_cog(PinPoint(bot))
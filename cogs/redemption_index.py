@@ -0,0 +1,96 @@
+# cogs/redemption_index.py
+
+import os
+import re
+import asyncio
+from collections import Counter
+
+from .datastore import get_store
+from .io_executor import get_io
+
+# ─── Configuration ────────────────────────────────────────────────
+FORGIVENESS_LOG = "data/donation_forgiveness.log"
+CHECKPOINT_KEY  = "redemption_board"  # checkpoints row holding the offset and the counters
+
+# "<iso ts> - Forgiven: <display name> (ID: <id>) by <forgiver>"; very old lines said "Forgave:"
+LINE_RE = re.compile(r"^\S+ - (?:Forgiven|Forgave): .* \(ID: (\d+)\) by (.+?)\s*$")
+
+
+def _empty():
+    return {"inode": None, "offset": 0, "users": {}, "forgivers": {}, "last_forgiver": {}, "skipped": 0}
+
+
+def _scan(path, state):
+    """Fold the lines appended since state["offset"] into state. Runs on the I/O pool."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return state, False
+    if st.st_ino != state["inode"] or st.st_size < state["offset"]:
+        # Rotated (new file) or truncated in place: the counters keep the old lines, read the new file from 0
+        state["inode"], state["offset"] = st.st_ino, 0
+    if st.st_size == state["offset"]:
+        return state, False
+
+    users, forgivers = Counter(state["users"]), Counter(state["forgivers"])
+    with open(path, "rb") as f:
+        f.seek(state["offset"])
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break  # still being written; pick it up next time
+            state["offset"] += len(raw)
+            match = LINE_RE.match(raw.decode("utf-8", "replace"))
+            if not match:
+                if raw.strip():
+                    state["skipped"] += 1
+                continue
+            user_id, forgiver = match.groups()
+            users[user_id] += 1
+            forgivers[forgiver] += 1
+            state["last_forgiver"][user_id] = forgiver
+    state["users"], state["forgivers"] = dict(users), dict(forgivers)
+    return state, True
+
+
+class RedemptionIndex:
+    """Running totals over the forgiveness log for !redboard.
+
+    Only the bytes appended since the saved offset are parsed; the offset
+    and counters are checkpointed in the store, so a restart resumes
+    where it left off instead of rereading the log.
+    """
+
+    def __init__(self, path=FORGIVENESS_LOG, store=None):
+        self.path = path
+        self.store = store or get_store()
+        self._state = None
+        self._lock = asyncio.Lock()
+
+    async def refresh(self) -> dict:
+        async with self._lock:
+            if self._state is None:
+                self._state = {**_empty(), **await self.store.get("checkpoints", CHECKPOINT_KEY, {})}
+            state, changed = await get_io().run(_scan, self.path, self._state, op="redemption_scan")
+            if changed:
+                await self.store.put("checkpoints", CHECKPOINT_KEY, state)
+            self._state = state
+            return state
+
+    async def board(self, top=5):
+        """(most forgiven [(user_id, count)], top forgivers [(name, count)], last forgiver by user_id)."""
+        state = await self.refresh()
+        return (
+            Counter(state["users"]).most_common(top),
+            Counter(state["forgivers"]).most_common(top),
+            state["last_forgiver"],
+        )
+
+
+_index = None
+
+
+def get_redemption_index() -> RedemptionIndex:
+    global _index
+    if _index is None:
+        _index = RedemptionIndex()
+    return _index
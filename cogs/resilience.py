@@ -0,0 +1,265 @@
+# cogs/resilience.py
+
+import time
+import random
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+import aiohttp
+
+# ─── Configuration ────────────────────────────────────────────────
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}  # safe to retry
+RETRY_STATUSES     = {429, 500, 502, 503, 504}
+RETRY_TOKEN_MAX    = 10.0   # retries a host can bank
+RETRY_TOKEN_EARN   = 0.2    # tokens earned per successful call
+
+
+@dataclass
+class HostPolicy:
+    timeout: float = 10.0          # seconds per attempt
+    retries: int = 2               # extra attempts for idempotent calls
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    concurrency: int = 4           # in-flight calls per host
+    failure_threshold: int = 5     # consecutive failures before the breaker opens
+    reset_timeout: float = 30.0    # seconds open before a trial call is let through
+
+
+DEFAULT_POLICY = HostPolicy()
+HOST_POLICIES = {
+    "api.exaroton.com": HostPolicy(concurrency=10),
+    "exaroton.com": HostPolicy(timeout=15.0, retries=1, concurrency=2),
+    "api.mojang.com": HostPolicy(timeout=8.0, concurrency=4, reset_timeout=60.0),
+    "api.challonge.com": HostPolicy(timeout=15.0, concurrency=4),
+}
+
+
+class UpstreamError(Exception):
+    """An upstream call failed after its retries."""
+
+    def __init__(self, message, status=None, host=None):
+        super().__init__(message)
+        self.status = status
+        self.host = host
+
+
+class BreakerOpen(UpstreamError):
+    """Raised straight away while a host's breaker is open."""
+
+    def __init__(self, host, retry_in):
+        super().__init__(f"{host} is unavailable, retrying in {retry_in:.0f}s", host=host)
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.trips = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def retry_in(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._trial_running:
+            self._trial_running = True  # one caller probes, the rest keep failing fast
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._trial_running or (self.opened_at is None and self.failures >= self.failure_threshold):
+            if self.opened_at is None:
+                self.trips += 1
+            self.opened_at = time.monotonic()
+        self._trial_running = False
+
+    def release(self):
+        """End a call that was neither a success nor a transport failure (cancelled, or a bug)."""
+        self._trial_running = False
+
+
+class Upstream:
+    """Breaker, concurrency cap, retry budget and counters for one host."""
+
+    def __init__(self, host, policy):
+        self.host = host
+        self.policy = policy
+        self.breaker = CircuitBreaker(policy.failure_threshold, policy.reset_timeout)
+        self.semaphore = asyncio.Semaphore(policy.concurrency)
+        self.retry_tokens = RETRY_TOKEN_MAX
+        self.calls = 0
+        self.failed = 0
+        self.retried = 0
+        self.rejected = 0
+
+    def _backoff(self, attempt):
+        delay = min(self.policy.backoff_max, self.policy.backoff_base * (2 ** attempt))
+        return random.uniform(0, delay)
+
+    async def call(self, attempt_fn, retries=None):
+        """Run attempt_fn() under this host's breaker, retrying transient failures.
+
+        attempt_fn signals a retryable failure by raising UpstreamError,
+        asyncio.TimeoutError or aiohttp.ClientError; anything it returns
+        counts as a success.
+        """
+        retries = self.policy.retries if retries is None else retries
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self.rejected += 1
+                raise BreakerOpen(self.host, self.breaker.retry_in())
+
+            self.calls += 1
+            try:
+                async with self.semaphore:
+                    result = await attempt_fn()
+            except (UpstreamError, asyncio.TimeoutError, aiohttp.ClientError) as e:
+                self.failed += 1
+                self.breaker.record_failure()
+                if attempt >= retries or self.retry_tokens < 1:
+                    if isinstance(e, UpstreamError):
+                        raise
+                    raise UpstreamError(f"{self.host}: {str(e) or type(e).__name__}", host=self.host) from e
+                self.retry_tokens -= 1
+                self.retried += 1
+                await asyncio.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+            except BaseException:
+                # Cancelled (e.g. a hedge loser) or a non-transport error: not the host's
+                # fault, but a half-open trial has to give its slot back
+                self.breaker.release()
+                raise
+
+            self.breaker.record_success()
+            self.retry_tokens = min(RETRY_TOKEN_MAX, self.retry_tokens + RETRY_TOKEN_EARN)
+            return result
+
+
+_upstreams = {}
+_session = None
+
+
+def get_upstream(url_or_host) -> Upstream:
+    host = urlparse(url_or_host).hostname if "://" in url_or_host else url_or_host
+    upstream = _upstreams.get(host)
+    if upstream is None:
+        upstream = _upstreams[host] = Upstream(host, HOST_POLICIES.get(host, DEFAULT_POLICY))
+    return upstream
+
+
+def all_upstreams():
+    return list(_upstreams.values())
+
+
+async def call_upstream(url_or_host, attempt_fn, retries=None):
+    return await get_upstream(url_or_host).call(attempt_fn, retries=retries)
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300))
+    return _session
+
+
+async def _request(method, url, read, session=None, timeout=None, retries=None, **kwargs):
+    upstream = get_upstream(url)
+    method = method.upper()
+    if retries is None and method not in IDEMPOTENT_METHODS:
+        retries = 0
+    client_timeout = aiohttp.ClientTimeout(total=timeout or upstream.policy.timeout)
+
+    async def attempt():
+        http = session or await _get_session()
+        async with http.request(method, url, timeout=client_timeout, **kwargs) as resp:
+            if resp.status in RETRY_STATUSES:
+                raise UpstreamError(f"{upstream.host} returned {resp.status}", status=resp.status, host=upstream.host)
+            return resp.status, await read(resp)
+
+    return await upstream.call(attempt, retries=retries)
+
+
+async def _read_json(resp):
+    try:
+        return await resp.json(content_type=None)
+    except (aiohttp.ContentTypeError, ValueError):
+        return None
+
+
+async def _read_text(resp):
+    return await resp.text()
+
+
+async def request_json(method, url, **kwargs):
+    """(status, decoded JSON or None). 4xx comes back as a status, not an exception."""
+    return await _request(method, url, _read_json, **kwargs)
+
+
+async def request_text(method, url, **kwargs):
+    return await _request(method, url, _read_text, **kwargs)
+
+
+@asynccontextmanager
+async def open_stream(method, url, timeout=None, retries=None, **kwargs):
+    """Yield the response for url, body unread, for reading in pieces.
+
+    Connecting and the status line go through the host's breaker and
+    retries like any other call; the body is the caller's to read, within
+    timeout, and the connection goes back to the pool on exit.
+    """
+    upstream = get_upstream(url)
+    method = method.upper()
+    if retries is None and method not in IDEMPOTENT_METHODS:
+        retries = 0
+    client_timeout = aiohttp.ClientTimeout(total=timeout or upstream.policy.timeout)
+
+    async def attempt():
+        http = await _get_session()
+        resp = await http.request(method, url, timeout=client_timeout, **kwargs)
+        if resp.status in RETRY_STATUSES:
+            resp.release()
+            raise UpstreamError(f"{upstream.host} returned {resp.status}", status=resp.status, host=upstream.host)
+        return resp
+
+    resp = await upstream.call(attempt, retries=retries)
+    try:
+        yield resp
+    finally:
+        resp.release()
+
+
+async def close_sessions():
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
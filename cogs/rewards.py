@@ -4,14 +4,17 @@ import json
 import time
 import os
 from datetime import datetime, timedelta
-import requests
 from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
+from cogs.resilience import request_json, request_text, UpstreamError
+from cogs.datastore import get_store
+from cogs.doc_cache import get_document_cache
+from cogs.persistence import write_json, read_json
+from cogs.io_executor import get_io
 
 
-LINK_FILE = "data/mc_links.json"
 TIME_FILE = "data/mc_time.json"
 POOL_FILE = "data/exaroton_pool.json"
 PLAYTIME_FILE = "data/playtime_rewards.json"
@@ -22,15 +25,10 @@ cooldowns = {}
 MC_LOG_CHANNEL_ID = 1390936792567382089
 
 def load_json(file):
-    if not os.path.exists(file):
-        return {}
-    with open(file, "r") as f:
-        return json.load(f)
+    return read_json(file, {})
 
 def save_json(file, data):
-    os.makedirs(os.path.dirname(file), exist_ok=True)
-    with open(file, "w") as f:
-        json.dump(data, f, indent=4)
+    write_json(file, data)
 
 def get_rendered_page(url):
     options = Options()
@@ -43,9 +41,21 @@ def get_rendered_page(url):
     finally:
         driver.quit()
 
+async def fetch_mojang_profile(mc_username):
+    """Mojang profile dict for a username, or None if there's no such player."""
+    status, data = await request_json("GET", f"https://api.mojang.com/users/profiles/minecraft/{mc_username}")
+    if status != 200 or not isinstance(data, dict) or "id" not in data:
+        return None
+    return data
+
+MOJANG_DOWN_MSG = "⏳ Mojang's API is having trouble right now. Try again in a bit."
+
 class RewardsCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.store = get_store()
+        self.docs = get_document_cache()
+        self.io = get_io()
         self.check_playtime.start()
         pool_data = load_json(POOL_FILE)
         self.credit_pool_code = load_json(POOL_FILE).get("pool")
@@ -62,20 +72,18 @@ class RewardsCog(commands.Cog):
         online_players = ["BlkLine", "GhostFrame", "Toast"]  # Replace with real data pull when Exaroton key is in
         now = datetime.utcnow()
 
-        data = load_json(PLAYTIME_FILE)
-        for player in online_players:
-            if player not in data:
-                data[player] = {
-                    "total_minutes": 0,
-                    "last_seen": now.isoformat()
-                }
-            else:
-                last_seen = datetime.fromisoformat(data[player]["last_seen"])
-                elapsed = int((now - last_seen).total_seconds() / 60)
-                data[player]["total_minutes"] += elapsed
-                data[player]["last_seen"] = now.isoformat()
-
-        save_json(PLAYTIME_FILE, data)
+        async with self.docs.edit(PLAYTIME_FILE) as data:
+            for player in online_players:
+                if player not in data:
+                    data[player] = {
+                        "total_minutes": 0,
+                        "last_seen": now.isoformat()
+                    }
+                else:
+                    last_seen = datetime.fromisoformat(data[player]["last_seen"])
+                    elapsed = int((now - last_seen).total_seconds() / 60)
+                    data[player]["total_minutes"] += elapsed
+                    data[player]["last_seen"] = now.isoformat()
 
     @commands.command(name="forcecheck")
     async def forcecheck(self, ctx):
@@ -95,7 +103,7 @@ class RewardsCog(commands.Cog):
             return await ctx.send("<:beebo:1383282292478312519> No players online to check.")
     
         now = datetime.utcnow()
-        data = load_json(PLAYTIME_FILE)
+        data = await self.docs.get(PLAYTIME_FILE)
         results = []
     
         for player in online_players:
@@ -144,7 +152,7 @@ class RewardsCog(commands.Cog):
         await ctx.send(embed=embed)
     @commands.command(name="playtime", aliases=["mctime", "timeplayed"])
     async def playtime(self, ctx, player_name: str = None):
-        data = load_json(PLAYTIME_FILE)
+        data = await self.docs.get(PLAYTIME_FILE)
         player_name = player_name or ctx.author.display_name
         stats = data.get(player_name)
 
@@ -159,7 +167,7 @@ class RewardsCog(commands.Cog):
 
     @commands.command(name="topplaytime", aliases=["leaderboard", "tophours"])
     async def topplaytime(self, ctx):
-        data = load_json(PLAYTIME_FILE)
+        data = await self.docs.get(PLAYTIME_FILE)
         if not data:
             await ctx.send("🏜️ No playtime data available yet.")
             return
@@ -177,18 +185,15 @@ class RewardsCog(commands.Cog):
 
     @commands.command(name="unlinkmc")
     async def unlinkmc(self, ctx):
-        links = load_json(LINK_FILE)
         user_id = str(ctx.author.id)
-        if user_id in links:
-            del links[user_id]
-            save_json(LINK_FILE, links)
+        if await self.store.delete("links", user_id):
             await ctx.send("❎ Your Minecraft link has been removed.")
         else:
             await ctx.send("<:warning:1388586513000042516> You don't have a Minecraft account linked.")
 
     @commands.command(name="rewardhistory")
     async def rewardhistory(self, ctx):
-        history = load_json(REWARD_HISTORY_FILE)
+        history = await self.io.read_json(REWARD_HISTORY_FILE, {})
         user_id = str(ctx.author.id)
         entries = history.get(user_id, [])
         if not entries:
@@ -202,13 +207,15 @@ class RewardsCog(commands.Cog):
 
     @commands.command(name="checkuuid")
     async def checkuuid(self, ctx, mc_username: str):
-        url = f"https://api.mojang.com/users/profiles/minecraft/{mc_username}"
-        response = requests.get(url)
-        if response.status_code != 200:
+        try:
+            data = await fetch_mojang_profile(mc_username)
+        except UpstreamError:
+            await ctx.send(MOJANG_DOWN_MSG)
+            return
+        if data is None:
             await ctx.send(f"❌ No player found with name `{mc_username}`.")
             return
 
-        data = response.json()
         formatted_uuid = f"{data['id'][:8]}-{data['id'][8:12]}-{data['id'][12:16]}-{data['id'][16:20]}-{data['id'][20:]}"
         await ctx.send(f"🆔 UUID for `{mc_username}` is `{formatted_uuid}`.")
 
@@ -216,9 +223,8 @@ class RewardsCog(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def pooladd(self, ctx, amount: float):
         print(f"[POOLADD] Triggered by {ctx.author} from instance id: {id(self)}")
-        pool = load_json(POOL_FILE)
-        pool["credits"] = pool.get("credits", 0.0) + amount
-        save_json(POOL_FILE, pool)
+        async with self.io.edit_json(POOL_FILE) as pool:
+            pool["credits"] = pool.get("credits", 0.0) + amount
         await ctx.send(f"💸 Added **{amount:.2f}** credits. New pool balance: **{pool['credits']:.2f}**")
 
     @commands.command(name="linkmc", aliases=["uuidlink", "setuuid"])
@@ -242,42 +248,40 @@ class RewardsCog(commands.Cog):
             cooldowns[user_id] = now  # update
     
         # Mojang UUID request
-        url = f"https://api.mojang.com/users/profiles/minecraft/{mc_username}"
-        response = requests.get(url)
+        try:
+            data = await fetch_mojang_profile(mc_username)
+        except UpstreamError:
+            await ctx.send(MOJANG_DOWN_MSG)
+            return
     
-        if response.status_code != 200:
+        if data is None:
             await ctx.send(f"❌ Could not find Minecraft user `{mc_username}`.")
             return
     
-        data = response.json()
         uuid = data["id"]
         formatted_uuid = f"{uuid[:8]}-{uuid[8:12]}-{uuid[12:16]}-{uuid[16:20]}-{uuid[20:]}"
     
-        links = load_json(LINK_FILE)
-    
         # Check if MC username already linked or flagged
-        for linked_id, entry in links.items():
-            if entry.get("username", "").lower() == mc_username.lower():
-                await ctx.send("❌ That Minecraft username is already claimed or under review by another Discord account.")
-    
-                # Optional logging
-                log_channel = self.bot.get_channel(MC_LOG_CHANNEL_ID)
-                if log_channel:
-                    embed = discord.Embed(title="<:warning:1388586513000042516> Link Attempt Blocked", color=discord.Color.red())
-                    embed.add_field(name="Attempted Username", value=mc_username)
-                    embed.add_field(name="By", value=f"{ctx.author} ({ctx.author.id})", inline=False)
-                    embed.timestamp = datetime.utcnow()
-                    await log_channel.send(embed=embed)
-                return
+        if await self.store.find("links", "username", mc_username):
+            await ctx.send("❌ That Minecraft username is already claimed or under review by another Discord account.")
+
+            # Optional logging
+            log_channel = self.bot.get_channel(MC_LOG_CHANNEL_ID)
+            if log_channel:
+                embed = discord.Embed(title="<:warning:1388586513000042516> Link Attempt Blocked", color=discord.Color.red())
+                embed.add_field(name="Attempted Username", value=mc_username)
+                embed.add_field(name="By", value=f"{ctx.author} ({ctx.author.id})", inline=False)
+                embed.timestamp = datetime.utcnow()
+                await log_channel.send(embed=embed)
+            return
     
         # Flag as unverified until manually approved
-        links[str(user_id)] = {
+        await self.store.put("links", str(user_id), {
             "username": mc_username,
             "uuid": uuid,
             "verified": False,
             "link_channel": ctx.channel.id
-        }
-        save_json(LINK_FILE, links)
+        })
     
         await ctx.send(f"📝 Your account has been linked to **{mc_username}** and is pending verification.")
     
@@ -303,21 +307,30 @@ class RewardsCog(commands.Cog):
             await ctx.send("🚫 You don’t have permission to do this.")
             return
     
-        links = load_json(LINK_FILE)
         user_id = str(member.id)
+        found = {}
+
+        def verify(link):
+            # One atomic update: mark verified and drop link_channel, which is no longer needed
+            if link is None:
+                return None
+            found["was_verified"] = link.get("verified", False)
+            found["channel_id"] = link.pop("link_channel", None)
+            link["verified"] = True
+            return link
+
+        link = await self.store.update("links", user_id, verify)
     
-        if user_id not in links:
+        if not found:
             await ctx.send("❌ That user has no linked Minecraft account.")
             return
     
-        if links[user_id].get("verified", False):
+        if found["was_verified"]:
             await ctx.send("<:checkbox:1388586497984430160> This user is already verified.")
             return
     
-        links[user_id]["verified"] = True
-        save_json(LINK_FILE, links)
         # Ping the user in the channel where they linked (if possible)
-        channel_id = links[user_id].get("link_channel")
+        channel_id = found["channel_id"]
         link_channel = self.bot.get_channel(channel_id) if channel_id else None
 
         if link_channel:
@@ -326,10 +339,6 @@ class RewardsCog(commands.Cog):
             )
         else:
             await ctx.send(f"<:checkbox:1388586497984430160> {member.mention} has been verified, but I couldn't find the original link channel to ping them.")
-
-        # 🧼 Clean up the link_channel from their record — no longer needed
-        links[user_id].pop("link_channel", None)
-        save_json(LINK_FILE, links)
     
         await ctx.send(f"<:checkbox:1388586497984430160> Verified **{member.display_name}**'s Minecraft link.")
     
@@ -341,8 +350,8 @@ class RewardsCog(commands.Cog):
             )
             embed.add_field(name="Verified By", value=ctx.author.mention, inline=False)
             embed.add_field(name="User", value=member.mention, inline=False)
-            embed.add_field(name="Minecraft Username", value=links[user_id].get("username", "N/A"), inline=True)
-            embed.add_field(name="UUID", value=links[user_id].get("uuid", "N/A"), inline=False)
+            embed.add_field(name="Minecraft Username", value=link.get("username", "N/A"), inline=True)
+            embed.add_field(name="UUID", value=link.get("uuid", "N/A"), inline=False)
             embed.set_footer(text="Manual verification complete")
             embed.timestamp = datetime.utcnow()
             await log_channel.send(embed=embed)
@@ -354,15 +363,14 @@ class RewardsCog(commands.Cog):
             await ctx.send("🚫 You don’t have permission to do this.")
             return
     
-        links = load_json(LINK_FILE)
         user_id = str(member.id)
+        removed_entry = await self.store.get("links", user_id)
     
-        if user_id not in links:
+        if removed_entry is None:
             await ctx.send("❌ That user has no linked Minecraft account.")
             return
     
-        removed_entry = links.pop(user_id)
-        save_json(LINK_FILE, links)
+        await self.store.delete("links", user_id)
     
         await ctx.send(f"🗑️ Removed Minecraft link for **{member.display_name}**.")
     
@@ -387,19 +395,14 @@ class RewardsCog(commands.Cog):
             await ctx.send("🚫 You don’t have permission to do this.")
             return
     
-        links = load_json(LINK_FILE)
-        target_id = None
-        for uid, entry in links.items():
-            if entry.get("username", "").lower() == mc_username.lower():
-                target_id = uid
-                break
+        found = await self.store.find("links", "username", mc_username)
     
-        if not target_id:
+        if not found:
             await ctx.send(f"❌ No Discord account is linked to `{mc_username}`.")
             return
     
-        removed = links.pop(target_id)
-        save_json(LINK_FILE, links)
+        target_id, removed = found
+        await self.store.delete("links", target_id)
     
         await ctx.send(f"💥 Force-unlinked `{mc_username}` from <@{target_id}>.")
     
@@ -424,20 +427,21 @@ class RewardsCog(commands.Cog):
             await ctx.send("🚫 You don’t have permission to use this.")
             return
 
-        url = f"https://api.mojang.com/users/profiles/minecraft/{mc_username}"
-        response = requests.get(url)
-        if response.status_code != 200:
+        try:
+            data = await fetch_mojang_profile(mc_username)
+        except UpstreamError:
+            await ctx.send(MOJANG_DOWN_MSG)
+            return
+        if data is None:
             await ctx.send(f"❌ Minecraft user `{mc_username}` not found.")
             return
 
-        raw = response.json()["id"]
+        raw = data["id"]
         formatted_uuid = f"{raw[:8]}-{raw[8:12]}-{raw[12:16]}-{raw[16:20]}-{raw[20:]}"
-        links = load_json(LINK_FILE)
-        links[str(member.id)] = {
+        await self.store.put("links", str(member.id), {
             "username": mc_username,
             "uuid": raw
-        }
-        save_json(LINK_FILE, links)
+        })
 
         await ctx.send(f"🔧 Linked **{member.display_name}** to **{mc_username}**.")
         log_channel = self.bot.get_channel(MC_LOG_CHANNEL_ID)
@@ -453,7 +457,7 @@ class RewardsCog(commands.Cog):
     # -- Pool Credits Check --
     @commands.command(name="credpool", aliases=["creditpool", "donorpool"])
     async def show_cached_credits(self, ctx):
-        pool_code = getattr(self, "credit_pool_code", None) or load_json(POOL_FILE).get("pool")
+        pool_code = getattr(self, "credit_pool_code", None) or (await self.io.read_json(POOL_FILE, {})).get("pool")
         if not pool_code:
             await ctx.send("<:warning:1388586513000042516> No pool code has been set. Use `!setpool <code>`.")
             return
@@ -461,7 +465,9 @@ class RewardsCog(commands.Cog):
         try:
             url = f"https://exaroton.com/pools/{pool_code}"
             headers = {"User-Agent": "Mozilla/5.0"}
-            html = requests.get(url, headers=headers).text
+            status, html = await request_text("GET", url, headers=headers)
+            if status != 200:
+                raise ValueError(f"Pool page returned {status}")
             soup = BeautifulSoup(html, "html.parser")
             credit_element = soup.find("div", class_="credits")
 
@@ -480,7 +486,7 @@ class RewardsCog(commands.Cog):
     @commands.command(name="poolcached", aliases=["pooloffline", "poolbackup"])
     async def cached_pool(self, ctx):
         """Show the last saved pool balance from local JSON."""
-        pool_data = load_json(POOL_FILE)
+        pool_data = await self.io.read_json(POOL_FILE, {})
         credits = pool_data.get("credits", None)
         if credits is None:
             await ctx.send("📂 No cached credit balance found.")
@@ -498,7 +504,7 @@ class RewardsCog(commands.Cog):
 
         # Step 2: Check file
         try:
-            file_data = load_json(POOL_FILE)
+            file_data = await self.io.read_json(POOL_FILE, {})
             file_code = file_data.get("pool")
             cached_credits = file_data.get("credits")
             embed.add_field(name="File Pool Code", value=f"`{file_code}`" if file_code else "❌ None", inline=True)
@@ -541,8 +547,8 @@ class RewardsCog(commands.Cog):
                 embed.set_footer(text="No cached balance to compare.")
 
             # 🔄 Update local file
-            file_data["credits"] = live_credits
-            save_json(POOL_FILE, file_data)
+            async with self.io.edit_json(POOL_FILE) as current:
+                current["credits"] = live_credits
 
         except Exception as e:
             embed.add_field(name="Live Fetch Error", value=f"❌ `{e}`", inline=False)
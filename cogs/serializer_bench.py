@@ -0,0 +1,105 @@
+# cogs/serializer_bench.py
+# Compare data/ serializers on generated datasets shaped like the real files.
+# Usage: python -m cogs.serializer_bench [--pins N] [--players N] [--rounds N]
+
+import random
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from .serializers import JsonSerializer, available_formats, dumps_document, get_serializer, loads_document
+
+
+def make_pins(n):
+    """data/pins.json: {id: pin}"""
+    start = datetime(2025, 1, 1)
+    users = [str(random.randrange(10**17, 10**18)) for _ in range(12)]
+    pins = {}
+    for i in range(1, n + 1):
+        user = random.choice(users)
+        pins[str(i)] = {
+            "x": random.randint(-30000, 30000),
+            "y": random.choice([None, random.randint(-64, 320)]),
+            "z": random.randint(-30000, 30000),
+            "description": random.choice(["base", "village", "ancient city", "stronghold", "trial chamber"]) + f" #{i}",
+            "submitter_id": user,
+            "attributed_user_id": user,
+            "timestamp": (start + timedelta(minutes=37 * i)).isoformat(),
+        }
+    return pins
+
+
+def make_match_history(players, tournaments=6, matches=12):
+    """data/match_history.json: {slug: {uid: [match, ...]}}"""
+    uids = [str(random.randrange(10**17, 10**18)) for _ in range(players)]
+    history = {}
+    for t in range(tournaments):
+        slug = f"blkline_cup_{t}"
+        history[slug] = {}
+        for uid in uids:
+            history[slug][uid] = [{
+                "match_id": random.randrange(10**8, 10**9),
+                "opponent": random.choice(uids),
+                "result": random.choice(["Win", "Loss"]),
+            } for _ in range(matches)]
+    return history
+
+
+def make_playtime(players):
+    """data/playtime_rewards.json: {player: {total_minutes, last_seen}}"""
+    now = datetime(2025, 6, 1)
+    return {
+        f"Player{i:04d}": {
+            "total_minutes": random.randint(0, 40000),
+            "last_seen": (now - timedelta(minutes=random.randint(0, 90000))).isoformat(),
+        }
+        for i in range(players)
+    }
+
+
+def make_user_totals(players):
+    """int user ID → total, as some cogs build in memory before saving (json writes the keys as strings)"""
+    return {random.randrange(10**17, 10**18): round(random.uniform(0, 500), 2) for _ in range(players)}
+
+
+def _best(fn, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench(name, data, rounds):
+    print(f"\n{name}")
+    print(f"  {'format':<10} {'size':>10} {'save ms':>9} {'load ms':>9}")
+    for fmt in available_formats():
+        serializer = get_serializer(fmt)
+        if fmt == "json":
+            serializer = JsonSerializer(indent=4)  # what data/ holds today
+        raw = dumps_document(data, name, serializer)
+        assert loads_document(raw, name) == loads_document(dumps_document(data, name, JsonSerializer()), name)
+        save = _best(lambda: dumps_document(data, name, serializer), rounds)
+        if fmt == "json":
+            load = _best(lambda: serializer.loads(raw), rounds)  # stdlib, as the bot parses today
+        else:
+            load = _best(lambda: loads_document(raw, name), rounds)
+        print(f"  {fmt:<10} {len(raw):>10,} {save * 1000:>9.2f} {load * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pins", type=int, default=5000)
+    parser.add_argument("--players", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(0)
+    missing = [fmt for fmt in ("orjson", "msgpack") if fmt not in available_formats()]
+    if missing:
+        print(f"Skipping {', '.join(missing)} (not installed)")
+    bench("pins", make_pins(args.pins), args.rounds)
+    bench("match_history", make_match_history(args.players), args.rounds)
+    bench("playtime_rewards", make_playtime(args.players), args.rounds)
+    bench("donations", make_user_totals(args.players), args.rounds)
@@ -0,0 +1,215 @@
+# cogs/serializers.py
+
+import os
+import json
+import struct
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional: pip install msgpack
+    msgpack = None
+
+# ─── Configuration ────────────────────────────────────────────────
+# How data/ files are written: "json" (pretty, the default), "orjson" or "msgpack".
+# Reads detect the format, so switching back and forth needs no conversion step.
+DEFAULT_FORMAT = "json"
+
+# Compact files start with MAGIC, a format id byte and a big-endian u16 schema version
+MAGIC  = b"BLKD"
+HEADER = struct.Struct(">4sBH")
+
+# Current schema version per document kind (file name without extension).
+# Headerless JSON counts as version 1, the layout every file has today.
+SCHEMA_VERSIONS = {}
+LEGACY_VERSION  = 1
+
+_MIGRATIONS = {}  # (kind, from_version) → fn(data) → data at from_version + 1
+
+
+class SerializerError(ValueError):
+    pass
+
+
+class Serializer:
+    name = None
+    format_id = 0
+    compact = True
+
+    def dumps(self, data) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, raw: bytes):
+        raise NotImplementedError
+
+
+class JsonSerializer(Serializer):
+    """stdlib json. Pretty-printed and headerless: the human-readable format."""
+
+    name = "json"
+    format_id = 1
+    compact = False
+
+    def __init__(self, indent=4):
+        self.indent = indent
+
+    def dumps(self, data) -> bytes:
+        return json.dumps(data, indent=self.indent).encode("utf-8")
+
+    def loads(self, raw):
+        return json.loads(raw)
+
+
+class OrjsonSerializer(Serializer):
+    name = "orjson"
+    format_id = 2
+
+    def dumps(self, data) -> bytes:
+        # Non-str keys (e.g. int user IDs) are stringified, like json.dumps does
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, raw):
+        return orjson.loads(raw)
+
+
+class MsgpackSerializer(Serializer):
+    name = "msgpack"
+    format_id = 3
+
+    def dumps(self, data) -> bytes:
+        # msgpack would keep int keys as ints; stringify them so the document matches the json backends
+        return msgpack.packb(_str_keys(data), use_bin_type=True)
+
+    def loads(self, raw):
+        return msgpack.unpackb(raw, raw=False, strict_map_key=False)
+
+
+def _str_keys(obj):
+    """obj with every dict key turned into the string json.dumps would write for it."""
+    if isinstance(obj, dict):
+        out = {}
+        for key, value in obj.items():
+            if not isinstance(key, str):
+                if key is not None and not isinstance(key, (int, float)):
+                    raise SerializerError(f"Keys must be str, int, float, bool or None, not {type(key).__name__}")
+                key = json.dumps(key)
+            out[key] = _str_keys(value)
+        return out
+    if isinstance(obj, (list, tuple)):
+        return [_str_keys(item) for item in obj]
+    return obj
+
+
+_AVAILABLE = {"json": JsonSerializer}
+if orjson is not None:
+    _AVAILABLE["orjson"] = OrjsonSerializer
+if msgpack is not None:
+    _AVAILABLE["msgpack"] = MsgpackSerializer
+_BY_ID = {cls.format_id: cls for cls in _AVAILABLE.values()}
+_warned = set()
+
+
+def available_formats():
+    return list(_AVAILABLE)
+
+
+def get_serializer(name=None) -> Serializer:
+    """The named serializer, else BLKLINE_SERIALIZER's; falls back to json if its package is missing."""
+    name = (name or os.getenv("BLKLINE_SERIALIZER", DEFAULT_FORMAT)).lower()
+    cls = _AVAILABLE.get(name)
+    if cls is None:
+        if name not in _warned:
+            _warned.add(name)
+            print(f"[Serializers] '{name}' unavailable (not installed or unknown), using json")
+        cls = JsonSerializer
+    return cls()
+
+
+# ─── Schema versions ──────────────────────────────────────────────
+def migrates(kind, from_version):
+    """Register fn(data) upgrading a kind's documents from from_version to from_version + 1.
+
+    Bump SCHEMA_VERSIONS[kind] alongside it.
+    """
+    def register(fn):
+        _MIGRATIONS[(kind, from_version)] = fn
+        return fn
+    return register
+
+
+def migrate(kind, data, version):
+    current = SCHEMA_VERSIONS.get(kind, LEGACY_VERSION)
+    while version < current:
+        step = _MIGRATIONS.get((kind, version))
+        if step is None:
+            raise SerializerError(f"No migration for {kind} from v{version}")
+        data = step(data)
+        version += 1
+    if version > current:
+        raise SerializerError(f"{kind} is v{version}, newer than this bot understands (v{current})")
+    return data
+
+
+def kind_of(path) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+# ─── Documents ────────────────────────────────────────────────────
+def dumps_document(data, kind=None, serializer=None, indent=4) -> bytes:
+    serializer = serializer or get_serializer()
+    if not serializer.compact:
+        return JsonSerializer(indent).dumps(data)
+    version = SCHEMA_VERSIONS.get(kind, LEGACY_VERSION)
+    return HEADER.pack(MAGIC, serializer.format_id, version) + serializer.dumps(data)
+
+
+def loads_document(raw, kind=None):
+    """Decode any supported format and migrate it to the current schema."""
+    if isinstance(raw, str):
+        raw = raw.encode("utf-8")
+    if raw[:len(MAGIC)] == MAGIC:
+        _, format_id, version = HEADER.unpack_from(raw)
+        cls = _BY_ID.get(format_id)
+        if cls is None:
+            raise SerializerError(f"{kind or 'document'} needs serializer #{format_id}, which isn't installed")
+        data = cls().loads(raw[HEADER.size:])
+    else:
+        data = (OrjsonSerializer() if orjson is not None else JsonSerializer()).loads(raw)
+        version = LEGACY_VERSION
+    return migrate(kind, data, version) if kind else data
+
+
+def export_json(data, indent=2) -> str:
+    """Human-readable JSON, whatever format the data is stored in."""
+    return json.dumps(data, indent=indent)
+
+
+if __name__ == "__main__":
+    # python -m cogs.serializers convert <format>   rewrite data/*.json in another format
+    # python -m cogs.serializers export <dir>       pretty JSON copies of data/*.json
+    import sys
+    from .persistence import read_json, write_json
+
+    action, target = (sys.argv[1:3] + [None, None])[:2]
+    if action not in ("convert", "export") or not target:
+        sys.exit("usage: python -m cogs.serializers convert <format> | export <dir>")
+    if action == "convert":
+        if target not in _AVAILABLE:
+            sys.exit(f"{target} isn't available; installed: {', '.join(available_formats())}")
+        os.environ["BLKLINE_SERIALIZER"] = target
+    for name in sorted(os.listdir("data")):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join("data", name)
+        data = read_json(path)
+        if action == "convert":
+            write_json(path, data)
+        else:
+            os.makedirs(target, exist_ok=True)
+            with open(os.path.join(target, name), "w", encoding="utf-8") as f:
+                f.write(export_json(data))
+        print(f"{action}: {path}")
@@ -0,0 +1,217 @@
+# cogs/status_history.py
+
+import os
+import json
+import time
+import asyncio
+import datetime
+from collections import deque, OrderedDict
+from typing import NamedTuple
+
+from .io_executor import get_io
+
+# ─── Configuration ────────────────────────────────────────────────
+HISTORY_DIR       = "data/status_history"  # one append-only jsonl segment per month
+RING_SIZE         = 2000                   # recent rows kept in memory
+BUCKET_SECONDS    = 3600                   # aggregate granularity
+RETENTION_SECONDS = 31 * 86400             # buckets older than this are dropped
+MAX_GAP_SECONDS   = 2 * 3600               # longer silences (bot down) don't count as observed time
+
+WINDOWS = (("24h", 86400), ("7d", 7 * 86400), ("30d", 30 * 86400))
+
+
+class StatusRow(NamedTuple):
+    ts: float
+    online: bool
+    players: int
+    latency_ms: int
+    source: str
+
+    def to_json(self) -> str:
+        return json.dumps([round(self.ts, 1), int(self.online), self.players, self.latency_ms, self.source])
+
+    @classmethod
+    def from_json(cls, line: str) -> "StatusRow":
+        ts, online, players, latency_ms, source = json.loads(line)
+        return cls(float(ts), bool(online), int(players), int(latency_ms), str(source))
+
+
+class Bucket:
+    """Time-weighted totals for one BUCKET_SECONDS slice."""
+
+    __slots__ = ("observed", "online", "player_seconds", "outages", "samples")
+
+    def __init__(self):
+        self.observed = 0.0        # seconds we knew the state
+        self.online = 0.0          # of which the server was up
+        self.player_seconds = 0.0  # players × seconds, for the time-weighted average
+        self.outages = 0           # online → offline transitions
+        self.samples = 0
+
+
+class StatusHistory:
+    """Ring buffer + monthly segments of status rows, with hourly rollups.
+
+    Each row closes the interval since the previous one, crediting that time
+    to the previous state. Window summaries add up at most a month of hourly
+    buckets instead of rescanning rows.
+    """
+
+    def __init__(self, directory=HISTORY_DIR, ring_size=RING_SIZE, bucket_seconds=BUCKET_SECONDS):
+        self.directory = directory
+        self.bucket_seconds = bucket_seconds
+        self.rows = deque(maxlen=ring_size)
+        self.io = get_io()
+        self._buckets = OrderedDict()  # bucket start → Bucket, oldest first
+        self._last = None
+        self._loaded = False
+        self._writes = set()  # appends still in flight
+
+    # ─── Disk ───────────────────────────────────────────────────────
+    def _segment_path(self, ts) -> str:
+        month = datetime.datetime.fromtimestamp(ts, tz=datetime.timezone.utc).strftime("%Y-%m")
+        return os.path.join(self.directory, f"{month}.jsonl")
+
+    async def load(self):
+        """Read the retained segments off the loop and rebuild the rollups from them."""
+        if self._loaded:
+            return
+        self._loaded = True
+        cutoff = time.time() - RETENTION_SECONDS
+        saved = await self.io.run(_read_rows, self.directory, self._segment_path(cutoff), cutoff, op="history_load")
+        recorded = list(self.rows)  # rows recorded while the segments were being read
+        if recorded:
+            saved = [row for row in saved if row.ts < recorded[0].ts]
+            self.rows.clear()
+            self._buckets.clear()
+            self._last = None
+        for row in saved + recorded:
+            self._apply(row)
+
+    async def _append(self, row):
+        try:
+            await self.io.append_line(self._segment_path(row.ts), row.to_json())
+        except OSError as e:
+            print(f"[Status History] Couldn't write row: {e}")
+
+    # ─── Recording ──────────────────────────────────────────────────
+    def record(self, snapshot):
+        """Store a StatusSnapshot. Usable directly as a StatusService listener."""
+        row = StatusRow(
+            ts=snapshot.fetched_at,
+            online=bool(snapshot.online),
+            players=len(snapshot.players or []),
+            latency_ms=int(round((snapshot.latency or 0) * 1000)),
+            source=snapshot.source,
+        )
+        if self._last is not None and row.ts < self._last.ts:
+            return  # a slow probe finished after a newer observation
+        # Written in the background; the segment's lock keeps rows in order
+        task = asyncio.ensure_future(self._append(row))
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+        self._apply(row)
+
+    def _bucket(self, start) -> Bucket:
+        bucket = self._buckets.get(start)
+        if bucket is None:
+            bucket = self._buckets[start] = Bucket()
+        return bucket
+
+    def _credit(self, row, start, end):
+        """Credit [start, end) to row's state, split across bucket boundaries."""
+        while start < end:
+            bucket_start = start - (start % self.bucket_seconds)
+            chunk_end = min(end, bucket_start + self.bucket_seconds)
+            span = chunk_end - start
+            bucket = self._bucket(bucket_start)
+            bucket.observed += span
+            if row.online:
+                bucket.online += span
+                bucket.player_seconds += row.players * span
+            start = chunk_end
+
+    def _apply(self, row):
+        prev = self._last
+        if prev is not None:
+            self._credit(prev, prev.ts, min(row.ts, prev.ts + MAX_GAP_SECONDS))
+            if prev.online and not row.online:
+                self._bucket(row.ts - (row.ts % self.bucket_seconds)).outages += 1
+        self._bucket(row.ts - (row.ts % self.bucket_seconds)).samples += 1
+        self.rows.append(row)
+        self._last = row
+        self._prune(row.ts)
+
+    def _prune(self, now):
+        cutoff = now - RETENTION_SECONDS
+        while self._buckets:
+            start = next(iter(self._buckets))
+            if start + self.bucket_seconds > cutoff:
+                break
+            self._buckets.popitem(last=False)
+
+    # ─── Queries ────────────────────────────────────────────────────
+    def summary(self, window_seconds, now=None) -> dict:
+        """Uptime %, average players and outage count over the last window_seconds."""
+        now = now or time.time()
+        since = now - window_seconds
+        observed = online = player_seconds = 0.0
+        outages = samples = 0
+        for start, bucket in reversed(self._buckets.items()):
+            if start + self.bucket_seconds <= since:
+                break
+            observed += bucket.observed
+            online += bucket.online
+            player_seconds += bucket.player_seconds
+            outages += bucket.outages
+            samples += bucket.samples
+
+        # The current state has been true since the last row
+        last = self._last
+        if last is not None and since <= last.ts < now:
+            span = min(now - last.ts, MAX_GAP_SECONDS)
+            observed += span
+            if last.online:
+                online += span
+                player_seconds += last.players * span
+
+        return {
+            "observed": observed,
+            "uptime": (online / observed * 100) if observed else None,
+            "avg_players": (player_seconds / observed) if observed else None,
+            "outages": outages,
+            "samples": samples,
+        }
+
+    def summaries(self, now=None) -> dict:
+        return {label: self.summary(seconds, now) for label, seconds in WINDOWS}
+
+
+def _read_rows(directory, oldest, cutoff):
+    """Rows since cutoff from the segments at or after oldest."""
+    if not os.path.isdir(directory):
+        return []
+    rows = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if not name.endswith(".jsonl") or path < oldest:
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = StatusRow.from_json(line)
+                except (ValueError, TypeError):
+                    continue  # torn write at the end of a segment
+                if row.ts >= cutoff:
+                    rows.append(row)
+    return rows
+
+
+_history = None
+
+
+def get_status_history() -> StatusHistory:
+    global _history
+    if _history is None:
+        _history = StatusHistory()
+    return _history
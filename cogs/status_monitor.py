@@ -0,0 +1,159 @@
+# cogs/status_monitor.py
+
+import os
+import time
+import random
+import asyncio
+
+from .exaroton_client import (
+    get_client, ExarotonError,
+    STATUS_STARTING, STATUS_STOPPING, STATUS_RESTARTING, STATUS_SAVING,
+    STATUS_LOADING, STATUS_PENDING, STATUS_PREPARING,
+)
+from .status_service import get_status_service, StatusSnapshot
+
+# ─── Configuration ────────────────────────────────────────────────
+FAST_POLL_SECONDS         = float(os.getenv("STATUS_FAST_POLL", 10))    # while a transition is likely
+BASE_POLL_SECONDS         = float(os.getenv("STATUS_BASE_POLL", 60))    # right after things settle
+MAX_POLL_SECONDS          = float(os.getenv("STATUS_MAX_POLL", 1800))   # ceiling while stable
+BACKOFF_FACTOR            = 2
+POLL_JITTER               = 0.2    # ± fraction applied to every delay
+TRANSITION_WINDOW_SECONDS = 300    # how long expect_transition() keeps polling fast
+
+# The server is on its way somewhere; poll fast until it arrives
+TRANSITIONAL_STATUSES = {
+    STATUS_STARTING, STATUS_STOPPING, STATUS_RESTARTING, STATUS_SAVING,
+    STATUS_LOADING, STATUS_PENDING, STATUS_PREPARING,
+}
+
+
+class StatusMonitor:
+    """Adaptive status poller and the one owner of online/offline state.
+
+    Observations come from its own API polls and from anything else that
+    calls observe() (the websocket). Listeners registered with on_change()
+    get (old_state, new_state, snapshot) whenever the state flips.
+    """
+
+    def __init__(self, client=None, service=None, initial_state="offline",
+                 fast_interval=FAST_POLL_SECONDS, base_interval=BASE_POLL_SECONDS,
+                 max_interval=MAX_POLL_SECONDS, jitter=POLL_JITTER):
+        self.client = client or get_client()
+        self.service = service or get_status_service()
+        self.state = initial_state
+        self.status_code = None
+        self.fast_interval = fast_interval
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+
+        self.interval = base_interval
+        self._fast_until = 0.0
+        self._next_due = 0.0
+        self._listeners = []
+        self._tick_lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task = None
+        self._running = False
+
+    def on_change(self, handler):
+        self._listeners.append(handler)
+        return handler
+
+    # ─── Lifecycle ──────────────────────────────────────────────────
+    def start(self):
+        if self._task is None or self._task.done():
+            self._running = True
+            self._next_due = time.monotonic()
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        # wait_for can swallow a cancel that lands as the wake event fires, so flag it too
+        self._running = False
+        self._wake.set()
+        if self._task and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    # ─── Scheduling ─────────────────────────────────────────────────
+    @property
+    def fast(self) -> bool:
+        return time.monotonic() < self._fast_until or self.status_code in TRANSITIONAL_STATUSES
+
+    def expect_transition(self, window=TRANSITION_WINDOW_SECONDS):
+        """Poll fast for the next window seconds, starting now (e.g. after !startserver)."""
+        self._fast_until = time.monotonic() + window
+        self.interval = self.fast_interval
+        self._next_due = time.monotonic()
+        self._wake.set()
+
+    def _schedule(self, delay):
+        delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        self._next_due = time.monotonic() + delay
+        self._wake.set()
+
+    def _backoff(self):
+        self.interval = min(self.max_interval, max(self.base_interval, self.interval * BACKOFF_FACTOR))
+        self._schedule(self.interval)
+
+    def seconds_until_next(self) -> float:
+        return max(0.0, self._next_due - time.monotonic())
+
+    async def _run(self):
+        while self._running:
+            wait = self._next_due - time.monotonic()
+            if wait > 0:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue  # the deadline may have moved while we slept
+            try:
+                await self.tick()
+            except Exception as e:
+                # Anything tick() doesn't expect (a malformed payload, say) mustn't end polling
+                print(f"[Status Monitor] Poll crashed: {type(e).__name__}: {e}")
+                self._backoff()
+
+    # ─── Observations ───────────────────────────────────────────────
+    async def tick(self):
+        """Poll the API once. Concurrent callers share the one in progress."""
+        if self._tick_lock.locked():
+            async with self._tick_lock:
+                return
+        async with self._tick_lock:
+            try:
+                info = await self.client.get_server()
+            except ExarotonError as e:
+                print(f"[Status Monitor] Poll failed: {e}")
+                self._backoff()
+                return
+            await self.observe(StatusSnapshot.from_server_info(info, source="API"), info.status)
+
+    async def observe(self, snapshot, status_code=None):
+        """Record a status observation and reschedule the next poll around it."""
+        self.service.publish(snapshot)
+        if status_code is not None:
+            self.status_code = status_code
+
+        new_state = "online" if snapshot.online else "offline"
+        old_state = self.state
+        changed = new_state != old_state
+
+        if self.fast or changed:
+            self.interval = self.fast_interval if self.fast else self.base_interval
+        else:
+            self.interval = min(self.max_interval, max(self.base_interval, self.interval * BACKOFF_FACTOR))
+        self._schedule(self.interval)
+
+        if changed:
+            self.state = new_state
+            if status_code is None or status_code not in TRANSITIONAL_STATUSES:
+                self._fast_until = 0.0  # arrived
+            for handler in list(self._listeners):
+                try:
+                    await handler(old_state, new_state, snapshot)
+                except Exception as e:
+                    print(f"[Status Monitor] Listener failed: {e}")
@@ -0,0 +1,210 @@
+# cogs/status_service.py
+
+import os
+import time
+import asyncio
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from .exaroton_client import get_client, ExarotonError
+from .exaroton_scraper_playwright import get_live_status_playwright
+from .mc_probe import get_probe, describe_motd, sample_names, ProbeError
+
+# ─── Configuration ────────────────────────────────────────────────
+STATUS_TTL_SECONDS     = float(os.getenv("STATUS_TTL_SECONDS", 30))  # how long a snapshot counts as fresh
+HEDGE_DELAY_SECONDS    = float(os.getenv("STATUS_HEDGE_DELAY", 4))    # head start for the cheap probes before the scraper
+DEFAULT_SERVER_ADDRESS = "obscura.exaroton.me"
+
+
+@dataclass
+class StatusSnapshot:
+    motd: str = "Unknown MOTD"
+    players: List[str] = field(default_factory=list)
+    online: bool = False
+    status_text: str = "Offline"
+    max_players: object = "?"
+    source: str = "None"
+    latency: float = 0.0  # seconds the winning probe took to answer
+    fetched_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_server_info(cls, info, source="API") -> "StatusSnapshot":
+        return cls(
+            motd=info.motd or "Unknown MOTD",
+            players=list(info.players),
+            online=info.is_online,
+            status_text=info.status_text,
+            max_players=info.max_players or "?",
+            source=source,
+        )
+
+    @property
+    def age(self) -> float:
+        return max(0.0, time.time() - self.fetched_at)
+
+    def as_tuple(self):
+        """Legacy (motd, players, online, status_text, max_players, source) shape."""
+        return self.motd.strip(), self.players, self.online, self.status_text, self.max_players, self.source
+
+
+class StatusService:
+    """Caches the latest server status and collapses concurrent probes into one."""
+
+    def __init__(self, ttl=STATUS_TTL_SECONDS, server_address=None, hedge_delay=HEDGE_DELAY_SECONDS):
+        self.ttl = ttl
+        self.hedge_delay = hedge_delay
+        self.server_address = server_address
+        self._snapshot: Optional[StatusSnapshot] = None
+        self._inflight: Optional[asyncio.Future] = None
+        self._listeners = []
+
+    @property
+    def snapshot(self) -> Optional[StatusSnapshot]:
+        return self._snapshot
+
+    def is_fresh(self, max_age=None) -> bool:
+        limit = self.ttl if max_age is None else max_age
+        return self._snapshot is not None and self._snapshot.age <= limit
+
+    async def get(self, max_age=None, force=False) -> StatusSnapshot:
+        """Return a snapshot no older than max_age (defaults to the TTL).
+
+        Callers that arrive while a probe is running await that probe instead
+        of starting their own.
+        """
+        if not force and self.is_fresh(max_age):
+            return self._snapshot
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._refresh())
+        # shield so one impatient caller can't cancel the probe for everyone
+        return await asyncio.shield(self._inflight)
+
+    def on_publish(self, handler):
+        """Call handler(snapshot) for every snapshot stored, probed or pushed."""
+        if handler not in self._listeners:
+            self._listeners.append(handler)
+        return handler
+
+    def publish(self, snapshot: StatusSnapshot):
+        """Store a snapshot that was observed somewhere other than probe()."""
+        self._snapshot = snapshot
+        for handler in list(self._listeners):
+            try:
+                handler(snapshot)
+            except Exception as e:
+                print(f"[Status Service] Listener failed: {e}")
+
+    async def _refresh(self) -> StatusSnapshot:
+        snapshot = await self.probe()
+        self.publish(snapshot)
+        return snapshot
+
+    async def probe(self) -> StatusSnapshot:
+        """Race the probes and keep the first authoritative answer.
+
+        mcstatus and the API start together; the scraper joins after
+        hedge_delay, or straight away once both cheap probes have failed.
+        Whatever is still running when a winner arrives gets cancelled.
+        """
+        server_address = self.server_address or os.getenv("SERVER_ADDRESS") or DEFAULT_SERVER_ADDRESS
+        started = time.monotonic()
+        cheap_failed = asyncio.Event()
+
+        tasks = {
+            asyncio.ensure_future(self._probe_mcstatus(server_address)): "mcstatus",
+            asyncio.ensure_future(self._probe_api()): "API",
+            asyncio.ensure_future(self._probe_scraper(cheap_failed)): "Scraper",
+        }
+        pending = set(tasks)
+        tentative = None  # an offline answer, kept until mcstatus has had its say
+        winner = None
+
+        try:
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    snap = task.result()
+                    if snap is None:
+                        continue
+                    if snap.online or snap.players:
+                        winner = snap
+                        break
+                    tentative = tentative or snap
+
+                cheap_pending = [t for t in pending if tasks[t] != "Scraper"]
+                if winner is None and not cheap_pending:
+                    if tentative is not None:
+                        # Nobody could reach the server and the API says it's down
+                        winner = tentative
+                    else:
+                        cheap_failed.set()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        snap = winner or StatusSnapshot()
+        snap.status_text = snap.status_text or "Unknown"
+        snap.latency = time.monotonic() - started
+        snap.fetched_at = time.time()
+        print(f"[Final Status Source]: {snap.source} | Players: {snap.players} | {snap.latency * 1000:.0f}ms")
+        return snap
+
+    async def _probe_mcstatus(self, server_address) -> Optional[StatusSnapshot]:
+        try:
+            status = await get_probe().status(server_address, retries=0)
+        except ProbeError as e:
+            print(f"[mcstatus FAIL]: {e}")
+            return None
+        print("[mcstatus SUCCESS]")
+        return StatusSnapshot(
+            motd=describe_motd(status),
+            players=sample_names(status),
+            online=True,
+            status_text="Online",
+            max_players=status.players.max,
+            source="mcstatus",
+        )
+
+    async def _probe_api(self) -> Optional[StatusSnapshot]:
+        try:
+            info = await get_client().get_server(timeout=10)
+        except ExarotonError as e:
+            print(f"[Exaroton API FAIL]: {e}")
+            return None
+        print("[API probe SUCCESS]")
+        # Same reading as the monitor and the websocket, so !status and announcements agree
+        return StatusSnapshot.from_server_info(info, source="API")
+
+    async def _probe_scraper(self, cheap_failed) -> Optional[StatusSnapshot]:
+        try:
+            await asyncio.wait_for(cheap_failed.wait(), timeout=self.hedge_delay)
+        except asyncio.TimeoutError:
+            pass  # hedge delay elapsed with no answer yet
+
+        try:
+            scraped = await get_live_status_playwright()
+            print("SCRAPER RESULT:", scraped)
+        except Exception as e:
+            print(f"[SCRAPER FAIL]: {e}")
+            return None
+
+        if "error" in scraped:
+            return None
+        scraped_status = scraped.get("status", "")
+        return StatusSnapshot(
+            motd=scraped.get("motd", "Unknown MOTD"),
+            players=scraped.get("players", []),
+            online="online" in scraped_status.lower(),
+            status_text=scraped_status or "Unknown",
+            source="Scraper",
+        )
+
+
+_service = None
+
+
+def get_status_service() -> StatusService:
+    global _service
+    if _service is None:
+        _service = StatusService()
+    return _service
@@ -6,38 +6,20 @@ import time
 import discord
 from discord import app_commands
 from discord.ext import commands
+from .datastore import get_store
+from .persistence import write_json
 
 # ─── Configuration ────────────────────────────────────────────────
 DEV_USER_IDS  = {448896936481652777, 777345438495277076}
 SYNC_COOLDOWN = 60  # seconds between allowed syncs
 _last_sync    = 0
-VAULT_FILE    = "data/vault.json"
 
 def _update_sync_time():
     global _last_sync
     _last_sync = time.time()
 
-def _ensure_vault():
-    os.makedirs(os.path.dirname(VAULT_FILE), exist_ok=True)
-    if not os.path.exists(VAULT_FILE):
-        with open(VAULT_FILE, "w") as f:
-            json.dump({}, f)
-
-def _load_vault():
-    _ensure_vault()
-    with open(VAULT_FILE, "r") as f:
-        return json.load(f)
-
-def _save_vault(data):
-    _ensure_vault()
-    with open(VAULT_FILE, "w") as f:
-        json.dump(data, f, indent=2)
-
 def save_json(file, data):
-    import os, json
-    os.makedirs(os.path.dirname(file), exist_ok=True)
-    with open(file, "w") as f:
-        json.dump(data, f, indent=4)
+    write_json(file, data)
 
 
 class UtilityCog(commands.Cog):
@@ -45,6 +27,7 @@ class UtilityCog(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.vault = get_store()
 
     # ─── Hybrid sync ────────────────────────────────────────────────
     @commands.hybrid_command(
@@ -71,18 +54,16 @@ class UtilityCog(commands.Cog):
     @commands.command(name="store")
     async def store(self, ctx: commands.Context, key: str, *, value: str):
         """Store a value under a given key."""
-        vault = _load_vault()
-        vault[key] = value
-        _save_vault(vault)
+        await self.vault.put("vault", key, value)
         await ctx.send(f"🔒 Stored key `{key}`.")
 
     @commands.command(name="get")
     async def get(self, ctx: commands.Context, key: str):
         """Retrieve the value for a given key."""
-        vault = _load_vault()
-        if key not in vault:
+        value = await self.vault.get("vault", key)
+        if value is None:
             return await ctx.send("❌ No such key.")
-        await ctx.send(f"🔓 `{key}` = {vault[key]}")
+        await ctx.send(f"🔓 `{key}` = {value}")
 
     # ─── Dispatch helper ────────────────────────────────────────────
     @commands.command(name="dispatch")
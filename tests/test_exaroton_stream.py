@@ -0,0 +1,156 @@
+# tests/test_exaroton_stream.py
+#
+# Runs ExarotonStream and StatusMonitor against a local stand-in for the
+# exaroton websocket. Needs aiohttp (already a bot requirement).
+
+import asyncio
+import unittest
+
+import aiohttp
+from aiohttp import web
+
+from cogs.exaroton_client import ServerInfo
+from cogs.exaroton_stream import ExarotonStream
+from cogs.status_monitor import StatusMonitor
+from cogs.status_service import StatusSnapshot
+
+ONLINE = {"id": "srv", "name": "test", "address": "test.exaroton.me", "status": 1,
+          "host": {"online": True}, "players": {"max": 20, "count": 0, "list": []}}
+
+
+class FakeClient:
+    """The bits of ExarotonClient the stream and the monitor use."""
+
+    server_id = "srv"
+    base_url = "http://127.0.0.1"
+
+    def __init__(self, payload=ONLINE):
+        self.payload = payload
+        self.polls = 0
+        self._session = None
+
+    async def session(self):
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    async def get_server(self):
+        self.polls += 1
+        return ServerInfo.from_payload(self.payload)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+
+class FakeService:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, snapshot):
+        self.published.append(snapshot)
+
+
+async def wait_for(predicate, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("timed out waiting")
+        await asyncio.sleep(0.01)
+
+
+class StandIn:
+    """Serves `ready` then one status frame, and records the stream starts it's sent."""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.received = []
+        self.runner = None
+        self.url = None
+
+    async def handler(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        for frame in self.frames:
+            await ws.send_json(frame)
+        async for msg in ws:
+            if msg.type == aiohttp.WSMsgType.TEXT:
+                self.received.append(msg.json())
+        return ws
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/websocket", self.handler)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/websocket"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+class ExarotonStreamTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.client = FakeClient()
+        self.monitor = StatusMonitor(client=self.client, service=FakeService(),
+                                     fast_interval=0.05, base_interval=0.05, max_interval=0.05)
+        self.pushed = []
+
+    async def asyncTearDown(self):
+        await self.monitor.stop()
+        await self.client.close()
+
+    def _stream(self, url):
+        stream = ExarotonStream(client=self.client, url=url, streams=["console"], min_backoff=0.05, max_backoff=0.1)
+
+        async def on_status(info, source):
+            # What the Exaroton cog does with a push
+            self.pushed.append((info, source))
+            await self.monitor.observe(StatusSnapshot.from_server_info(info, source=source), info.status)
+
+        stream.on("status", on_status)
+        return stream
+
+    async def test_status_frame_is_published(self):
+        server = StandIn([{"type": "ready"}, {"stream": "status", "type": "status", "data": ONLINE}])
+        await server.start()
+        stream = self._stream(server.url)
+        try:
+            stream.start()
+            await wait_for(lambda: self.pushed)
+            info, source = self.pushed[0]
+            self.assertEqual(source, "WebSocket")
+            self.assertTrue(info.is_online)
+            self.assertTrue(stream.connected)
+            self.assertIs(stream.last_info, info)
+            self.assertEqual(self.monitor.state, "online")
+            self.assertEqual(self.client.polls, 0)  # the push arrived without a REST poll
+            start = {"stream": "console", "type": "start", "data": {"tail": 0}}
+            await wait_for(lambda: start in server.received)
+            await asyncio.sleep(0.1)
+            self.assertEqual(server.received.count(start), 1)  # ready and the first status don't both start it
+        finally:
+            await stream.stop()
+            await server.stop()
+
+    async def test_rest_polls_while_socket_is_down(self):
+        server = StandIn([])
+        await server.start()
+        stream = self._stream(server.url.replace("/websocket", "/missing"))  # every connect fails
+        try:
+            stream.start()
+            self.monitor.start()
+            await wait_for(lambda: self.client.polls >= 2)
+            self.assertFalse(stream.connected)
+            self.assertEqual(self.pushed, [])
+            self.assertEqual(self.monitor.state, "online")
+        finally:
+            await stream.stop()
+            await server.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()